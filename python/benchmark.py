@@ -0,0 +1,942 @@
+import argparse
+import operator
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+from collections import defaultdict, deque
+from dataclasses import field, fields, make_dataclass
+from typing import Mapping, Optional
+from uwapi import *
+from uwapi import interop, world
+from uwapi.map import Vector3
+from uwapi.interop import uw_interop, UwForeignPolicyEnum, UwUnitStateFlags
+from uwapi.columns import COMPONENT_BITS, EntityColumns
+from uwapi.entity_update_components import entities_update_components
+
+COMPONENTS = [f.name for f in fields(Entity) if f.name[0].isupper()]
+
+
+class Benchmark:
+    def __init__(self, ticks: int):
+        self.ticks = ticks
+        self.tick = 0
+        uw_events.on_update(self._update)
+
+    def measure(self) -> None:
+        pass
+
+    def report(self) -> None:
+        pass
+
+    def _update(self, stepping: bool) -> None:
+        if not stepping or self.tick >= self.ticks:
+            return
+        self.measure()
+        self.tick += 1
+        if self.tick == self.ticks:
+            self.report()
+            uw_game.disconnect()
+
+    def run(self) -> None:
+        if not uw_game.try_reconnect():
+            uw_game.set_connect_start_gui(True, "--observer 2")
+            if not uw_game.connect_environment():
+                uw_game.connect_new_server()
+
+
+def _report_per_entity(name: str, samples: list[float], entities: int) -> None:
+    per_entity = sum(samples) / max(entities, 1) * 1e6
+    print(
+        f"{name:>10}: {per_entity:8.2f} us/entity, tick median {statistics.median(samples) * 1e3:8.3f} ms"
+    )
+
+
+class SyncBenchmark(Benchmark):
+    """Component synchronization of modified entities: per-entity fetches (before) vs. the bulk path (after)."""
+
+    def __init__(self, ticks: int):
+        super().__init__(ticks)
+        self.entities = 0
+        self.before: list[float] = []
+        self.after: list[float] = []
+
+    def measure(self) -> None:
+        modified = [uw_world.entity(i) for i in uw_world._modified_ids()]
+        self.entities += len(modified)
+        fetchers = [
+            (name, getattr(uw_interop, "uwFetch" + name + "Component"))
+            for name in COMPONENTS
+        ]
+
+        t = time.perf_counter()
+        for e in modified:
+            ptr = uw_interop.uwEntityPointer(e.id)
+            for name, fetch in fetchers:
+                c = fetch(ptr)
+                setattr(e, name, c[1] if c[0] else None)
+        self.before.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        entities_update_components(modified)
+        self.after.append(time.perf_counter() - t)
+
+    def report(self) -> None:
+        print(f"synchronized {self.entities} modified entities over {self.ticks} ticks")
+        _report_per_entity("before", self.before, self.entities)
+        _report_per_entity("after", self.after, self.entities)
+
+
+UNUSED_COMPONENTS = ["Ping", "PlayerAiConfig", "DiplomacyProposal", "LogisticsTimestamp", "RecipeStatistics"]
+
+
+class SelectionBenchmark(Benchmark):
+    """Synchronization throughput of modified entities with all components (before) vs. selected components (after)."""
+
+    def __init__(self, ticks: int):
+        super().__init__(ticks)
+        self.entities = 0
+        unused = sum(COMPONENT_BITS[c] for c in UNUSED_COMPONENTS)
+        typical = sum(COMPONENT_BITS[c] for c in TYPICAL_UNIT)
+        self.selections: dict[str, Optional[Mapping[int, int]]] = {
+            "all": None,
+            "used": defaultdict(lambda: ~unused),
+            "unit": defaultdict(lambda: typical),
+        }
+        self.samples: dict[str, list[float]] = {name: [] for name in self.selections}
+
+    def measure(self) -> None:
+        modified = [uw_world.entity(i) for i in uw_world._modified_ids()]
+        self.entities += len(modified)
+        for name, selection in self.selections.items():
+            t = time.perf_counter()
+            entities_update_components(modified, selection)
+            self.samples[name].append(time.perf_counter() - t)
+        entities_update_components(modified, uw_world._selection)
+
+    def report(self) -> None:
+        print(f"synchronized {self.entities} modified entities over {self.ticks} ticks")
+        for name, samples in self.samples.items():
+            print(f"{name:>10}: {self.entities / sum(samples):10.0f} entities/s")
+
+
+STARTUP_BACKENDS = ["compiled", "abi-cached", "abi"]
+
+
+def startup(args) -> None:
+    """Library loading time and per-call latency of the compiled (api mode) and dlopen (abi mode) backends."""
+    for backend in STARTUP_BACKENDS:
+        subprocess.run(
+            [sys.executable]
+            + ([] if __debug__ else ["-O"])
+            + [os.path.abspath(__file__), "startup-backend", "--backend", backend, "--calls", str(args.calls)],
+            check=False,
+        )
+
+
+def startup_backend(args) -> None:
+    library = UwapiLibrary()
+    steam_path = os.path.expanduser(library.library_path())
+    os.chdir(steam_path)
+
+    t = time.perf_counter()
+    if args.backend == "compiled":
+        loaded = library._load_compiled()
+    elif args.backend == "abi-cached":
+        loaded = library._load_abi(steam_path) if library._load_abi_cached() else None
+    else:
+        loaded = library._load_abi(steam_path, cached=False)
+    load = time.perf_counter() - t
+    if loaded is None:
+        print(f"{args.backend:>10}: not available, run compile_uwapi.py", flush=True)
+        return
+
+    ffi, api = loaded
+    uw_interop.initialize(ffi, api)
+    uw_interop.uwInitialize(api.UW_VERSION)
+
+    def latency(call) -> float:
+        t = time.perf_counter()
+        for _ in range(args.calls):
+            call()
+        return (time.perf_counter() - t) / args.calls * 1e9
+
+    raw = latency(lambda: api.uwEntityExists(1))
+    wrapped = latency(lambda: uw_interop.uwEntityExists(1))
+    print(
+        f"{args.backend:>10}: load {load * 1e3:8.2f} ms, uwEntityExists raw {raw:6.0f} ns/call, through Interop {wrapped:6.0f} ns/call",
+        flush=True,
+    )
+    uw_interop.uwDeinitialize()
+    os._exit(0)
+
+
+TYPICAL_UNIT = ["Proto", "Owner", "Position", "Unit", "Life", "Move", "Priority"]
+
+
+def _unslotted(cls):
+    return make_dataclass(
+        cls.__name__,
+        [
+            (f.name, f.type, field(default=f.default, default_factory=f.default_factory))
+            for f in fields(cls)
+        ],
+    )
+
+
+def _zeroed(cls):
+    return lambda: cls(*[0] * len(fields(cls)))
+
+
+def _allocated(count: int, make) -> float:
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    keep = [make() for _ in range(count)]
+    total = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del keep
+    return total / count
+
+
+def memory(args) -> None:
+    """Bytes per entity (typical unit components) and per map tile, plain dataclasses (before) vs. slotted (after)."""
+    count = args.calls // 10
+    for name, slotted in (("before", False), ("after", True)):
+        entity = Entity if slotted else _unslotted(Entity)
+        vector = Vector3 if slotted else _unslotted(Vector3)
+        components = []
+        for c in TYPICAL_UNIT:
+            cls = getattr(interop, "Uw" + c + "Component")
+            components.append((c, _zeroed(cls if slotted else _unslotted(cls))))
+
+        def make_entity():
+            e = entity(0)
+            for c, make in components:
+                setattr(e, c, make())
+            return e
+
+        def make_tile():
+            return (vector(1.0, 2.0, 3.0), vector(0.0, 0.0, 1.0), list(range(8)))
+
+        print(
+            f"{name:>10}: {_allocated(count, make_entity):8.1f} bytes/entity, {_allocated(count, make_tile):8.1f} bytes/tile"
+        )
+
+
+def removal(args) -> None:
+    """Detection of removed entities, per tick: set of all entities (before) vs. destroyed among the modified, then counting (after)."""
+    original = uw_world._update_removed
+
+    for entities in (1000, 10000, 50000):
+        for churn in (0.0, 0.002):
+            before: list[float] = []
+            after: list[float] = []
+            removed = [0]
+
+            def update_removed() -> list[Entity]:
+                t = time.perf_counter()
+                all_ids = set(uw_world._all_ids())
+                legacy = [eid for eid in uw_world._entities if eid not in all_ids]
+                before.append(time.perf_counter() - t)
+                t = time.perf_counter()
+                # the destroyed are found by the entity pointers, which the synchronization of the modified needs anyway
+                result = original()
+                after.append(time.perf_counter() - t)
+                removed[0] += len(legacy)
+                return result
+
+            uw_world._update_removed = update_removed  # type: ignore
+            backend = SyntheticLibrary(
+                tiles=args.tiles,
+                entities=entities,
+                ticks=args.ticks,
+                damaged=0.02 if churn else 0,
+                churn=churn,
+            )
+            with UwapiLibrary(backend=backend):
+                uw_game.connect_new_server()
+            ticks = len(before)
+            print(
+                f"{entities} entities, {removed[0] / ticks:.1f} removed per tick: "
+                f"before {statistics.median(before) * 1e3:.3f} ms, after {statistics.median(after) * 1e3:.3f} ms (median per tick)"
+            )
+    uw_world._update_removed = original  # type: ignore
+
+
+def policies(args) -> None:
+    """Maintenance of the foreign policies, per tick: rebuilt from all entities (before) vs. from the modified and removed (after)."""
+    original = uw_world._update_policies
+    before: list[float] = []
+    after: list[float] = []
+    modified_count: list[int] = []
+
+    def update_policies(modified: list[Entity], removed: list[Entity]) -> None:
+        t = time.perf_counter()
+        legacy: dict[int, UwForeignPolicyEnum] = {}
+        my = uw_world.my_force_id()
+        for e in uw_world.entities().values():
+            fp = e.ForeignPolicy
+            if not fp:
+                continue
+            if fp.forces[0] == my:
+                legacy[fp.forces[1]] = fp.policy
+            if fp.forces[1] == my:
+                legacy[fp.forces[0]] = fp.policy
+        before.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        original(modified, removed)
+        after.append(time.perf_counter() - t)
+        modified_count.append(len(modified))
+        if legacy != uw_world._policies:
+            raise Exception("foreign policies differ")
+
+    uw_world._update_policies = update_policies  # type: ignore
+    backend = SyntheticLibrary(tiles=args.tiles, entities=args.entities, ticks=args.ticks, moving=0.1, churn=0.002)
+    with UwapiLibrary(backend=backend):
+        uw_game.connect_new_server()
+    uw_world._update_policies = original  # type: ignore
+    # the first tick synchronizes all entities
+    print(f"{len(uw_world.entities())} entities, {statistics.median(modified_count):.0f} modified per tick (median)")
+    print(f"    before: {statistics.median(before) * 1e3:8.3f} ms per tick (median)")
+    print(f"     after: {statistics.median(after) * 1e3:8.3f} ms per tick (median)")
+
+
+def columns(args) -> None:
+    """Filtering own units with life below half: loop over entities (before) vs. numpy masks over the columns (after)."""
+    for entities in (1000, 10000, 50000):
+        before: list[float] = []
+        after: list[float] = []
+
+        def update(stepping: bool) -> None:
+            if not stepping:
+                return
+            force = uw_world.my_force_id()
+            t = time.perf_counter()
+            legacy = [
+                x
+                for x in uw_world.entities().values()
+                if x.Unit is not None and x.own() and x.Life is not None and x.Life.life < 50
+            ]
+            before.append(time.perf_counter() - t)
+            t = time.perf_counter()
+            c = uw_world.columns()
+            selected = c.select(c.has("Unit", "Life") & (c.forces() == force) & (c.lives() < 50))
+            after.append(time.perf_counter() - t)
+            assert len(selected) == len(legacy)
+
+        uw_events.on_update(update)
+        backend = SyntheticLibrary(tiles=args.tiles, entities=entities, ticks=args.ticks, damaged=0.05)
+        with UwapiLibrary(backend=backend):
+            uw_game.connect_new_server()
+        uw_events._update_listeners.remove(update)
+        print(
+            f"{entities} entities: before {statistics.median(before) * 1e3:.3f} ms, after {statistics.median(after) * 1e3:.3f} ms (median per tick)"
+        )
+
+
+def changes(args) -> None:
+    """Reacting to changes of Life, per tick: polling all entities (before) vs. component change listeners (after)."""
+    for mode in ("before", "after"):
+        # each in its own process, so that the second does not start with the world of the first
+        subprocess.run(
+            [sys.executable]
+            + ([] if __debug__ else ["-O"])
+            + [os.path.abspath(__file__), "changes-mode", "--mode", mode]
+            + ["--ticks", str(args.ticks), "--entities", str(args.entities), "--tiles", str(args.tiles)],
+            check=False,
+        )
+
+
+def changes_mode(args) -> None:
+    sync: list[float] = []
+    reaction: list[float] = []
+    reacted = [0]
+    last: dict[int, int] = {}
+
+    def timed(name: str, samples: list[float]) -> None:
+        original = getattr(uw_world, name)
+
+        def function(*a):
+            t = time.perf_counter()
+            result = original(*a)
+            samples.append(time.perf_counter() - t)
+            return result
+
+        setattr(uw_world, name, function)
+
+    def react(entity: Entity, old, new) -> None:
+        reacted[0] += 1
+
+    def poll(stepping: bool) -> None:
+        t = time.perf_counter()
+        for e in uw_world.entities().values():
+            life = e.Life.life if e.Life is not None else 0
+            if last.get(e.id, life) != life:
+                reacted[0] += 1
+            last[e.id] = life
+        reaction.append(time.perf_counter() - t)
+
+    timed("_update_modified", sync)
+    if args.mode == "before":
+        uw_events.on_update(poll)
+    else:
+        timed("_dispatch_changes", reaction)
+        uw_world.on_component_changed("Life", react)
+    backend = SyntheticLibrary(tiles=args.tiles, entities=args.entities, ticks=args.ticks, damaged=0.02)
+    with UwapiLibrary(backend=backend):
+        uw_game.connect_new_server()
+    print(
+        f"{args.mode:>10}: {reacted[0] / len(reaction):.0f} changes per tick, "
+        f"synchronization {statistics.median(sync) * 1e3:.3f} ms, reaction {statistics.median(reaction) * 1e3:.3f} ms (median per tick)",
+        flush=True,
+    )
+
+
+def arenas(args) -> None:
+    """Synchronization of modified entities, rebuilding all components (before) vs. only those whose raw bytes changed (after)."""
+    for mode in ("before", "after"):
+        # each in its own process, so that the second does not start with the world of the first
+        subprocess.run(
+            [sys.executable]
+            + ([] if __debug__ else ["-O"])
+            + [os.path.abspath(__file__), "arenas-mode", "--mode", mode]
+            + ["--ticks", str(args.ticks), "--entities", str(args.entities), "--tiles", str(args.tiles)],
+            check=False,
+        )
+
+
+class _StandInApi:
+    # builtin functions in place of the library, the python side of the synchronization costs the same,
+    # while the fetches of the synthetic library are python functions, which would dominate the measurement
+    def __init__(self, moving: float):
+        self.tick = 0
+        self.moving = int(moving * 100)
+        self.uwEntityPointer = int
+        for c in COMPONENTS:
+            setattr(self, "uwFetch" + c + "Component", operator.is_not if c in TYPICAL_UNIT else operator.is_)
+
+    def uwFetchPositionComponent(self, entity: int, data) -> bool:
+        data.position = entity + self.tick if entity % 100 < self.moving else entity
+        return True
+
+    def uwFetchUnitComponent(self, entity: int, data) -> bool:
+        data.state = UwUnitStateFlags.Shooting
+        return True
+
+
+def _arenas_stand_in(mode: str, count: int) -> float:
+    # us per entity, of typical units, of which a fifth move each tick
+    api = _StandInApi(moving=0.2)
+    original = uw_interop._api
+    uw_interop._api = api
+    try:
+        entities = [Entity(i) for i in range(count)]
+        columns = EntityColumns({})
+        columns._add(entities)
+        samples = []
+        for tick in range(10):
+            api.tick = tick
+            t = time.perf_counter()
+            table = entities_update_components(entities, None, 0, lambda e, c: None, columns if mode == "after" else None)
+            samples.append(time.perf_counter() - t)
+            columns._update(entities, table)
+        # the first tick builds all components in both modes
+        return statistics.median(samples[1:]) / count * 1e6
+    finally:
+        uw_interop._api = original
+
+
+def arenas_mode(args) -> None:
+    samples: list[float] = []
+    counts = [0, 0]  # synchronized entities, rebuilt components
+    original = world.entities_update_components
+
+    def synchronize(entities, selection, watched, changed, columns):
+        previous = [[getattr(e, c) for c in COMPONENTS] for e in entities]
+        t = time.perf_counter()
+        result = original(entities, selection, watched, changed, columns if args.mode == "after" else None)
+        samples.append(time.perf_counter() - t)
+        counts[0] += len(entities)
+        for e, p in zip(entities, previous):
+            counts[1] += sum(1 for c, v in zip(COMPONENTS, p) if getattr(e, c) is not v and getattr(e, c) is not None)
+        return result
+
+    world.entities_update_components = synchronize  # type: ignore
+    backend = SyntheticLibrary(tiles=args.tiles, entities=args.entities, ticks=args.ticks, moving=0.2, damaged=0.02)
+    with UwapiLibrary(backend=backend):
+        uw_game.connect_new_server()
+        stand_in = _arenas_stand_in(args.mode, args.entities)
+    memory = ""
+    if args.mode == "after":
+        columns = uw_world.columns()
+        arena = columns._arena()[0]
+        memory = (
+            f", arena {columns.arena_bytes_per_entity()} bytes per entity, "
+            f"{arena.nbytes / len(columns):.0f} bytes per entity allocated, with the spare capacity"
+        )
+    print(
+        f"{args.mode:>10}: {counts[1] / counts[0]:.2f} components rebuilt per modified entity, "
+        f"synchronization {statistics.median(samples) * 1e3:.3f} ms (median per tick), "
+        f"{stand_in:.2f} us/entity with builtin fetches{memory}",
+        flush=True,
+    )
+
+
+def lazy(args) -> None:
+    """Bot reading Proto, Owner and Position of all entities, per tick: all components synchronized (before) vs. the rest fetched lazily (after)."""
+    for mode in ("before", "after"):
+        # each in its own process, the mode is chosen before the entities are created
+        subprocess.run(
+            [sys.executable]
+            + ([] if __debug__ else ["-O"])
+            + [os.path.abspath(__file__), "lazy-mode", "--mode", mode]
+            + ["--ticks", str(args.ticks), "--entities", str(args.entities), "--tiles", str(args.tiles)],
+            check=False,
+        )
+
+
+def lazy_mode(args) -> None:
+    samples: list[float] = []
+
+    def read(stepping: bool) -> None:
+        t = time.perf_counter()
+        for e in uw_world.entities().values():
+            if e.Proto is not None and e.Owner is not None and e.Position is not None:
+                pass
+        samples.append(time.perf_counter() - t)
+
+    timed = uw_world._update_modified
+
+    def update_modified():
+        t = time.perf_counter()
+        result = timed()
+        samples.append(time.perf_counter() - t)
+        return result
+
+    uw_world._update_modified = update_modified  # type: ignore
+    uw_events.on_update(read)
+    if args.mode == "after":
+        # Owner is synchronized for the force indexes, Position is fetched on read, while entities are created and removed
+        uw_world.set_lazy_components()
+        uw_world.select_components(["Owner"])
+    uw_instrumentation.enable()
+    backend = SyntheticLibrary(
+        tiles=args.tiles, entities=args.entities, ticks=args.ticks, moving=0.2, damaged=0.02, churn=0.01
+    )
+    with UwapiLibrary(backend=backend):
+        uw_game.connect_new_server()
+    fetches = sum(s.calls for name, s in uw_instrumentation.statistics().items() if name.startswith("uwFetch"))
+    own = len(uw_world.entities_of_force(uw_world.my_force_id()))
+    print(
+        f"{args.mode:>10}: {fetches / args.ticks:.0f} component fetches per tick, {own} own entities, "
+        f"synchronization and reading {sum(samples) / args.ticks * 1e3:.3f} ms per tick",
+        flush=True,
+    )
+
+
+def history(args) -> None:
+    """Life loss rates over the last 20 ticks, per tick: dicts of deques per entity (before) vs. the history ring buffers (after)."""
+    span = 20
+    for mode in ("before", "after"):
+        samples: list[float] = []
+        lives: dict[int, deque] = {}
+
+        def before(stepping: bool) -> None:
+            t = time.perf_counter()
+            rates = {}
+            for e in uw_world.entities().values():
+                h = lives.get(e.id)
+                if h is None:
+                    h = lives[e.id] = deque(maxlen=span + 1)
+                h.append(e.Life.life if e.Life is not None else 0)
+                if len(h) > span:
+                    rates[e.id] = (h[0] - h[-1]) / span
+            for eid in [eid for eid in lives if eid not in uw_world.entities()]:
+                del lives[eid]
+            samples.append(time.perf_counter() - t)
+
+        def after(stepping: bool) -> None:
+            t = time.perf_counter()
+            if uw_history.ticks() > span:
+                uw_history.life_loss_rates(span)
+            samples.append(time.perf_counter() - t)
+
+        record = uw_history._record
+
+        def timed_record() -> None:
+            t = time.perf_counter()
+            record()
+            samples.append(time.perf_counter() - t)
+
+        if mode == "after":
+            uw_history.enable(span + 1)
+            uw_history._record = timed_record  # type: ignore
+        listener = before if mode == "before" else after
+        uw_events.on_update(listener)
+        backend = SyntheticLibrary(tiles=args.tiles, entities=args.entities, ticks=args.ticks, moving=0.2, damaged=0.02)
+        with UwapiLibrary(backend=backend):
+            uw_game.connect_new_server()
+        uw_events._update_listeners.remove(listener)
+        if mode == "after":
+            uw_history.disable()
+            del uw_history._record  # type: ignore
+        print(f"{mode:>10}: {sum(samples) / args.ticks * 1e3:.3f} ms per tick")
+
+
+def _army_spread(state, force: int) -> float:
+    # mean distance between all pairs of entities of the force, stands in for heavier analysis
+    positions = state["positions"][(state["forces"] == force) & (state["positions"] != INVALID)]
+    points = state["tiles_positions"][positions[:1000]]
+    return float(np.linalg.norm(points[:, None, :] - points[None, :, :], axis=2).mean()) if len(points) else 0.0
+
+
+def snapshots(args) -> None:
+    """Time spent on the main thread per tick with an analysis every 10 ticks: in the update (before) vs. in worker processes (after)."""
+    every = 10
+    for mode in ("before", "after"):
+        samples: list[float] = []
+        results: list[float] = []
+        errors: list[BaseException] = []
+        workers = SnapshotWorkers(2) if mode == "after" else None
+
+        def analyse(stepping: bool) -> None:
+            t = time.perf_counter()
+            columns = uw_world.columns()
+            if len(columns) == 0:
+                return
+            force = int(columns.forces()[0])
+            if workers is None:
+                if uw_world.update_index() % every == 0:
+                    state = {
+                        "forces": columns.forces(),
+                        "positions": columns.positions(),
+                        "tiles_positions": uw_map.positions_array(),
+                    }
+                    results.append(_army_spread(state, force))
+            else:
+                if uw_world.update_index() % every == 0:
+                    workers.submit(_army_spread, force)
+                drained, failed = workers.drain()
+                results.extend(drained)
+                errors.extend(failed)
+            samples.append(time.perf_counter() - t)
+
+        publish = uw_snapshots.publish
+
+        def timed_publish():
+            t = time.perf_counter()
+            result = publish()
+            samples.append(time.perf_counter() - t)
+            return result
+
+        if workers is not None:
+            uw_snapshots.enable(every)
+            uw_snapshots.publish = timed_publish  # type: ignore
+        uw_events.on_update(analyse)
+        backend = SyntheticLibrary(tiles=args.tiles, entities=args.entities, ticks=args.ticks, forces=2, moving=0.2)
+        with UwapiLibrary(backend=backend):
+            uw_game.connect_new_server()
+        uw_events._update_listeners.remove(analyse)
+        late = 0
+        if workers is not None:
+            # the first tasks wait for the workers to start, collect those that did not finish during the game
+            deadline = time.perf_counter() + 60
+            while workers.pending() and time.perf_counter() < deadline:
+                time.sleep(0.01)
+                drained, failed = workers.drain()
+                late += len(drained)
+                results.extend(drained)
+                errors.extend(failed)
+            workers.close()
+            uw_snapshots.disable()
+            del uw_snapshots.publish  # type: ignore
+        print(
+            f"{mode:>10}: {len(results)} analyses ({late} after the game, {len(errors)} failed), "
+            f"main thread {sum(samples) / args.ticks * 1e3:.3f} ms per tick, worst tick {max(samples) * 1e3:.3f} ms"
+        )
+
+
+def dispatcher(args) -> None:
+    """Update callback duration per tick with analysis of every tick: in the update (before) vs. in 2 threads submitting orders (after)."""
+    import threading
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"python {sys.version.split()[0]}, gil {'enabled' if gil else 'disabled'}")
+    for mode in ("before", "after"):
+        samples: list[float] = []
+        analyses = [0]
+        latest: list[dict] = []
+        stop = threading.Event()
+
+        def analyse(state) -> None:
+            force = int(state["forces"][0])
+            _army_spread(state, force)
+            for unit in state["ids"][:10].tolist():
+                if mode == "before":
+                    uw_commands.order(unit, uw_commands.stop())
+                else:
+                    uw_dispatcher.order(unit, uw_commands.stop())
+            analyses[0] += 1
+
+        def state() -> dict:
+            columns = uw_world.columns()
+            return {
+                "ids": columns.ids().copy(),
+                "forces": columns.forces().copy(),
+                "positions": columns.positions().copy(),
+                "tiles_positions": uw_map.positions_array(),
+            }
+
+        def update(stepping: bool) -> None:
+            if len(uw_world.columns()) == 0:
+                return
+            if mode == "before":
+                analyse(state())
+            else:
+                latest[:] = [state()]
+                if not threads[0].is_alive():
+                    for thread in threads:
+                        thread.start()
+
+        def work() -> None:
+            while not stop.is_set():
+                if latest:
+                    analyse(latest[0])
+                else:
+                    time.sleep(0.001)
+
+        threads = [threading.Thread(target=work) for _ in range(2)]
+        callback = uw_events._update_callback
+
+        def timed_callback(stepping: bool) -> None:
+            t = time.perf_counter()
+            callback(stepping)
+            samples.append(time.perf_counter() - t)
+
+        uw_events._update_callback = timed_callback  # type: ignore
+        uw_events.on_update(update)
+        if mode == "after":
+            uw_dispatcher.enable()
+        backend = SyntheticLibrary(tiles=args.tiles, entities=args.entities, ticks=args.ticks, forces=2, moving=0.2)
+        with UwapiLibrary(backend=backend):
+            uw_game.connect_new_server()
+        stop.set()
+        for thread in threads:
+            if thread.is_alive():
+                thread.join()
+        uw_dispatcher.disable()
+        uw_events._update_listeners.remove(update)
+        del uw_events._update_callback  # type: ignore
+        print(
+            f"{mode:>10}: {analyses[0]} analyses, update callback median {statistics.median(samples) * 1e3:.3f} ms, "
+            f"p99 {sorted(samples)[int(len(samples) * 0.99)] * 1e3:.3f} ms"
+        )
+
+
+def tick_cache(args) -> None:
+    """Repeated queries of own units within each tick (upgrades, orders, path state, shooting): direct calls (before) vs. the tick cache (after)."""
+    for mode in ("before", "after"):
+        samples: list[float] = []
+
+        def query(stepping: bool) -> None:
+            units = uw_world.columns().ids()[:500].tolist()
+            if not units:
+                return
+            t = time.perf_counter()
+            for _ in range(3):  # eg. targeting, movement and economy logic, each asking again
+                for unit in units:
+                    uw_world.unit_upgrades(unit)
+                    uw_commands.orders(unit)
+                    uw_world.unit_path_state(unit)
+                    uw_world.test_shooting(unit, units[0])
+            samples.append(time.perf_counter() - t)
+
+        if mode == "before":
+            uw_tick_cache.disable()
+        else:
+            uw_tick_cache.enable()
+            uw_tick_cache.reset()
+        uw_instrumentation.reset()
+        uw_instrumentation.enable()
+        uw_events.on_update(query)
+        backend = SyntheticLibrary(tiles=args.tiles, entities=args.entities, ticks=args.ticks)
+        with UwapiLibrary(backend=backend):
+            uw_game.connect_new_server()
+        uw_events._update_listeners.remove(query)
+        uw_instrumentation.disable()
+        calls = sum(
+            s.calls
+            for name, s in uw_instrumentation.statistics().items()
+            if name in ("uwUnitUpgrades", "uwOrders", "uwUnitPathState", "uwTestShootingEntities")
+        )
+        print(
+            f"{mode:>10}: {calls / len(samples):.0f} library calls per tick, queries {statistics.median(samples) * 1e3:.3f} ms (median per tick)"
+        )
+    print(uw_tick_cache.report())
+
+
+def geometry(args) -> None:
+    """Map geometry queries around own units in two games on the same map: direct calls (before) vs. the persisted geometry cache (after)."""
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+    for mode in ("before", "after"):
+        if mode == "before":
+            uw_geometry_cache.disable()
+        else:
+            uw_geometry_cache.enable(directory=directory)
+        for game in range(2):
+            samples: list[float] = []
+
+            def query(stepping: bool) -> None:
+                positions = [p for p in uw_world.columns().positions()[:300].tolist() if p != INVALID]
+                t = time.perf_counter()
+                for position in positions:
+                    uw_map.area_neighborhood(position, 10)
+                    uw_map.distance_estimate(position, positions[0])
+                    uw_map.yaw(position, positions[0])
+                samples.append(time.perf_counter() - t)
+
+            uw_events.on_update(query)
+            backend = SyntheticLibrary(tiles=args.tiles, entities=args.entities, ticks=args.ticks, moving=0.2)
+            with UwapiLibrary(backend=backend):
+                uw_game.connect_new_server()
+            uw_events._update_listeners.remove(query)
+            print(f"{mode:>10}: game {game + 1}, queries {sum(samples) * 1e3:.1f} ms in total")
+    print(f"geometry cache: {uw_geometry_cache.statistics().hit_rate():.1%} hit rate")
+
+
+def map_load(args) -> None:
+    """Map loading time and memory: Vector3 and lists per tile (before) vs. numpy arrays filled from raw tile structs (after)."""
+    for mode in ("before", "after"):
+        # each in its own process, for comparable timings
+        subprocess.run(
+            [sys.executable]
+            + ([] if __debug__ else ["-O"])
+            + [os.path.abspath(__file__), "map-load-mode", "--mode", mode]
+            + ["--entities", "10", "--tiles", str(args.tiles)],
+            check=False,
+        )
+
+
+def _load_lists() -> list:
+    # the map as it was stored before the arrays
+    tiles: list = [[], [], [], [], []]
+    for i in range(uw_interop.uwTilesCount()):
+        tile = uw_interop.uwTile(i)
+        tiles[0].append(Vector3(tile.position[0], tile.position[1], tile.position[2]))
+        tiles[1].append(Vector3(tile.up[0], tile.up[1], tile.up[2]))
+        tiles[2].append(tile.neighborsIndices)
+        tiles[3].append(tile.terrain)
+        tiles[4].append(tile.clusterIndex)
+    clusters: list = [[], []]
+    for i in range(uw_interop.uwClustersCount()):
+        cluster = uw_interop.uwCluster(i)
+        clusters[0].append(cluster.neighborsIndices)
+        clusters[1].append(cluster.centerTileIndex)
+    return [tiles, clusters]
+
+
+def map_load_mode(args) -> None:
+    measured: dict[str, float] = {}
+    kept = []
+    load = uw_map._load
+
+    def timed_load() -> None:
+        t = time.perf_counter()
+        if args.mode == "before":
+            kept.append(_load_lists())
+        else:
+            load()
+        measured["load"] = time.perf_counter() - t
+        # memory in a second load, traced allocations (including numpy) that stay referenced, and the peak while loading
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        if args.mode == "before":
+            kept[0] = _load_lists()
+        else:
+            load()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        measured["memory"] = current - base
+        measured["peak"] = peak - base
+        # the library calls alone, the same in both modes
+        ffi = uw_interop._ffi
+        tile = ffi.new("UwTile *")
+        measured["tiles"] = uw_interop.uwTilesCount()
+        t = time.perf_counter()
+        for i in range(uw_interop.uwTilesCount()):
+            uw_interop._api.uwTile(i, tile)
+        measured["calls"] = time.perf_counter() - t
+
+    uw_map._load = timed_load  # type: ignore
+    backend = SyntheticLibrary(tiles=args.tiles, entities=args.entities, ticks=1)
+    with UwapiLibrary(backend=backend):
+        uw_game.connect_new_server()
+    tiles = int(measured["tiles"])
+    print(
+        f"{args.mode:>10}: {tiles} tiles, load {measured['load'] * 1e3:8.1f} ms "
+        f"(library calls {measured['calls'] * 1e3:.1f} ms), memory {measured['memory'] / 2**20:.1f} MiB "
+        f"({measured['memory'] / max(tiles, 1):.0f} bytes/tile, peak {measured['peak'] / max(tiles, 1):.0f} bytes/tile)",
+        flush=True,
+    )
+
+
+def in_game(benchmark):
+    def run(args) -> None:
+        if args.instrument:
+            uw_instrumentation.enable()
+        backend = None
+        if args.synthetic:
+            backend = SyntheticLibrary(
+                tiles=args.tiles, entities=args.entities, ticks=args.ticks + 1
+            )
+        with UwapiLibrary(backend=backend):
+            benchmark(args.ticks).run()
+            if args.instrument:
+                print(uw_instrumentation.report())
+
+    return run
+
+
+BENCHMARKS = {
+    "sync": in_game(SyncBenchmark),
+    "selection": in_game(SelectionBenchmark),
+    "startup": startup,
+    "memory": memory,
+    "removal": removal,
+    "policies": policies,
+    "columns": columns,
+    "changes": changes,
+    "arenas": arenas,
+    "lazy": lazy,
+    "history": history,
+    "snapshots": snapshots,
+    "dispatcher": dispatcher,
+    "tick-cache": tick_cache,
+    "geometry": geometry,
+    "map-load": map_load,
+    "lazy-mode": lazy_mode,
+    "changes-mode": changes_mode,
+    "arenas-mode": arenas_mode,
+    "map-load-mode": map_load_mode,
+    "startup-backend": startup_backend,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="uwapi python performance benchmarks")
+    parser.add_argument("benchmark", choices=BENCHMARKS.keys())
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--instrument", action="store_true", help="report interop call statistics")
+    parser.add_argument("--synthetic", action="store_true", help="run against generated world instead of the game")
+    parser.add_argument("--entities", type=int, default=10000, help="synthetic world size")
+    parser.add_argument("--tiles", type=int, default=100000, help="synthetic world size")
+    parser.add_argument("--backend", choices=STARTUP_BACKENDS, default="compiled")
+    parser.add_argument("--mode", choices=["before", "after"], default="after")
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
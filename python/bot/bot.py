@@ -3,7 +3,8 @@ import random
 import time
 from uwapi import *
 import json
-from uwapi.interop import UwPriorityEnum
+import numpy as np
+from uwapi.interop import UwForeignPolicyEnum, UwPriorityEnum, UwPrototypeTypeEnum
 
 with open("bot/prototypes.json") as f:
     PROTOTYPES = json.load(f)
@@ -83,12 +84,21 @@ def _force(force):
 
 
 def _own_entities(force=None):
-    f = _force(force)
-    for e in uw_world.entities().values():
-        if e.Owner is not None and e.Owner.force == f and e.Proto is not None:
+    entities = uw_world.entities()
+    for eid in uw_world.entities_of_force(_force(force)):
+        e = entities[eid]
+        if e.Proto is not None:
             yield e
 
 
+def _entities_of_protos(protos, force=None):
+    f = _force(force)
+    entities = uw_world.entities()
+    for pid in protos:
+        for eid in uw_world.entities_of_proto(int(pid), f):
+            yield entities[eid]
+
+
 def get_race_id():
     for race_id, race_data in PROTOTYPES["Race"].items():
         if race_data["name"] == RACE_NAME:
@@ -703,26 +713,27 @@ def _as_int_id(val):
 def get_buildings(force=None, recipe_proto: int | None = None):
     res = {}
     rid = int(recipe_proto) if recipe_proto is not None else None
-    for e in _own_entities(force):
-        pid = int(e.Proto.proto)
-        if pid in STATIC_BUILDINGS:
-            if rid is not None and recipe_id_of(e) != rid:
-                continue
-            res[e.id] = e
+    for e in _entities_of_protos(STATIC_BUILDINGS, force):
+        if rid is not None and recipe_id_of(e) != rid:
+            continue
+        res[e.id] = e
     return res
 
 
 def get_constructions(force=None, construction_proto: int | None = None, recipe_proto: int | None = None):
-    target = int(construction_proto) if construction_proto is not None else None
     rid = int(recipe_proto) if recipe_proto is not None else None
-    construction_ids = {int(k) for k in PROTOTYPES["Construction"].keys()}
+    if construction_proto is not None:
+        if str(int(construction_proto)) not in PROTOTYPES["Construction"]:
+            return {}
+        constructions = _entities_of_protos((construction_proto,), force)
+    else:
+        entities = uw_world.entities()
+        constructions = (
+            entities[eid]
+            for eid in uw_world.entities_of_type(UwPrototypeTypeEnum.Construction, _force(force))
+        )
     res = {}
-    for e in _own_entities(force):
-        pid = int(e.Proto.proto)
-        if pid not in construction_ids:
-            continue
-        if target is not None and pid != target:
-            continue
+    for e in constructions:
         if rid is not None and recipe_id_of(e) != rid:
             continue
         res[e.id] = e
@@ -770,22 +781,16 @@ def get_combat(force=None):
 
 
 def get_atv(force=None):
-    force = uw_world.my_force_id() if force in (None, -1) else int(force)
-    res = {}
-    for e in uw_world.entities().values():
-        if e.Owner is None or e.Unit is None or e.Proto is None:
-            continue
-        if e.Owner.force != force:
-            continue
-        if int(e.Proto.proto) == ATV_PROTO_ID:
-            res[e.id] = e
-    return res
+    return {e.id: e for e in _entities_of_protos((ATV_PROTO_ID,), force) if e.Unit is not None}
 
 
 def get_buildings_by_id(building_proto_id: int, *, recipe_proto: int | None = None, force=None):
     target_id = int(building_proto_id)
-    return {eid: e for eid, e in get_buildings(force=force, recipe_proto=recipe_proto).items() if
-            int(e.Proto.proto) == target_id}
+    if target_id not in STATIC_BUILDINGS:
+        return {}
+    rid = int(recipe_proto) if recipe_proto is not None else None
+    return {e.id: e for e in _entities_of_protos((target_id,), force) if
+            rid is None or recipe_id_of(e) == rid}
 
 
 def get_buildings_by_name(name: str, *, recipe_proto: int | None = None, force=None):
@@ -798,9 +803,8 @@ def get_buildings_by_name(name: str, *, recipe_proto: int | None = None, force=N
 def buildings_with_recipe(recipe_proto: int, force=None):
     rid = int(recipe_proto)
     res = {}
-    for e in _own_entities(force):
-        pid = int(e.Proto.proto)
-        if pid in STATIC_BUILDINGS and rid in e.proto().data.get("recipes", []):
+    for e in _entities_of_protos(STATIC_BUILDINGS, force):
+        if rid in e.proto().data.get("recipes", []):
             res[e.id] = e
     return res
 
@@ -878,20 +882,14 @@ def building_ask(construction_proto: int, near_entity_id: int, *, recipe_proto:
 
 
 def _count_structures_for_construction(construction_proto: int, force=None) -> int:
-    force = uw_world.my_force_id() if force in (None, -1) else int(force)
+    force = _force(force)
     c_proto = PROTOTYPES["Construction"].get(str(int(construction_proto)))
     if not c_proto:
         return 0
     building_proto = int(c_proto.get("output", 0))
-    count = 0
-    for e in uw_world.entities().values():
-        if e.Owner is None or e.Proto is None:
-            continue
-        if e.Owner.force != force:
-            continue
-        p = int(e.Proto.proto)
-        if p == building_proto or p == int(construction_proto):
-            count += 1
+    count = len(uw_world.entities_of_proto(int(construction_proto), force))
+    if building_proto != int(construction_proto):
+        count += len(uw_world.entities_of_proto(building_proto, force))
     return count
 
 
@@ -912,25 +910,31 @@ class Bot:
         uw_events.on_update(self.on_update)
 
     def attack_nearest_enemies(self):
-        own_units = [
-            x
-            for x in uw_world.entities().values()
-            if x.own() and x.Unit is not None and x.proto().data.get("dps", 0) > 0
+        c = uw_world.columns()
+        units = c.has("Unit")
+        own = units & (c.forces() == uw_world.my_force_id())
+        armed = [
+            p
+            for p in np.unique(c.protos()[own]).tolist()
+            if uw_prototypes.get(p).data.get("dps", 0) > 0
         ]
+        own_units = c.select(own & np.isin(c.protos(), armed))
         if not own_units:
             return
-        enemy_units = [
-            x for x in uw_world.entities().values() if x.enemy() and x.Unit is not None
-        ]
-        if not enemy_units:
+        enemy_forces = uw_world.forces_with_policy(UwForeignPolicyEnum.Enemy)
+        if not np.any(units & c.has("Owner") & np.isin(c.forces(), list(enemy_forces))):
             return
+
+        def unit(x):
+            return x.Unit is not None
+
         for own in own_units:
             if len(uw_commands.orders(own.id)) == 0:
-                enemy = min(
-                    enemy_units,
-                    key=lambda x: uw_map.distance_estimate(own.pos(), x.pos()),
+                nearest = uw_world.entities_nearest(
+                    own.pos(), 1, unit, forces=enemy_forces, distance=uw_map.distance_estimate
                 )
-                uw_commands.order(own.id, uw_commands.fight_to_entity(enemy.id))
+                if nearest:
+                    uw_commands.order(own.id, uw_commands.fight_to_entity(nearest[0].id))
 
     def assign_random_recipes(self):
         for own in uw_world.entities().values():
@@ -0,0 +1,51 @@
+import os
+import shutil
+import sys
+from cffi import FFI
+from uwapi import UwapiLibrary
+
+# Generates prebuilt cffi modules next to the uwapi package:
+#   uwapi/_uwapi_abi.py - out-of-line ABI mode, the parsed bots.h, no compiler needed
+#   uwapi/_uwapi*.so/pyd - out-of-line API mode, compiled against the uw library
+# UwapiLibrary picks them up automatically, and falls back to parsing bots.h when missing.
+
+ROOT = os.path.split(os.path.abspath(__file__))[0]
+HEADER = os.path.join(ROOT, "uwapi", "bots.h")
+
+
+def compile_abi(api_def: str) -> None:
+    builder = FFI()
+    builder.cdef(api_def)
+    builder.set_source("uwapi._uwapi_abi", None)
+    builder.compile(tmpdir=ROOT, verbose=True)
+
+
+def compile_api(api_def: str, library_path: str, library_name: str, module: str) -> None:
+    builder = FFI()
+    builder.cdef(api_def)
+    builder.set_source(
+        module,
+        "#include <stdint.h>\n#include <stdbool.h>\n" + api_def,
+        libraries=[library_name],
+        library_dirs=[library_path],
+        extra_link_args=[] if sys.platform == "win32" else ["-Wl,-rpath," + library_path],
+    )
+    output = builder.compile(tmpdir=os.path.join(ROOT, "build"), verbose=True)
+    shutil.copy(output, os.path.join(ROOT, "uwapi"))
+
+
+if __name__ == "__main__":
+    api_def = open(HEADER, "r").read()
+    compile_abi(api_def)
+
+    library = UwapiLibrary()
+    library_path = os.path.expanduser(library.library_path())
+    for hard in (True, False):
+        name = library.library_name(hard)
+        if not os.path.exists(os.path.join(library_path, name)):
+            print("skipping compiled module, library not found: " + name)
+            continue
+        library_name = os.path.splitext(name)[0]
+        if sys.platform != "win32":
+            library_name = library_name[3:]  # strip lib prefix
+        compile_api(api_def, library_path, library_name, library.compiled_module(hard))
@@ -1,16 +1,23 @@
 
-# THIS FILE IS GENERATED BY SCRIPT
-# DO NOT MODIFY
+# Originally generated, now maintained by hand, do not regenerate over it.
+# New modules add their singletons to the imports and to __all__.
 
 from .interop import *
 from .admin import uw_admin
+from .cache import uw_tick_cache, uw_geometry_cache
 from .commands import uw_commands
+from .dispatcher import uw_dispatcher
 from .entity import Entity
 from .events import uw_events
 from .game import uw_game
+from .history import uw_history
+from .instrumentation import uw_instrumentation
 from .library import UwapiLibrary
 from .map import uw_map
 from .prototypes import uw_prototypes
+from .replay import Replay
+from .snapshot import uw_snapshots, Snapshot, SnapshotWorkers
+from .synthetic import SyntheticLibrary
 from .world import uw_world
 
-__all__ = ["uw_admin","uw_commands","Entity","INVALID","uw_events","uw_game","UwapiLibrary","uw_map","uw_prototypes","uw_world","Severity","LogCallback","ConnectionState","MyPlayer","AssistConfig","PerformanceStatistics","OrderType","OrderPriority","Order","Orders","Ids","Priority","Ping","PathState","ForeignPolicy","ChatTarget","ProtoComponent","OwnerComponent","ControllerComponent","PositionComponent","UnitState","UnitComponent","LifeComponent","ManaComponent","MoveComponent","AimComponent","RecipeComponent","RecipeStatisticsComponent","LogisticsTimestampComponent","PriorityComponent","AmountComponent","AttachmentComponent","PingComponent","PlayerState","PlayerConnectionClass","PlayerComponent","PlayerAiConfigComponent","ForceState","ForceComponent","ForceDetailsComponent","ForeignPolicyComponent","DiplomacyProposalComponent","GameConfig","GameState","ShootingEvent","ShootingsArray","TaskType","MapState","MapInfo","MapStartingPosition","MapStartingPositionsArray","Tile","Cluster","ClustersDistancesQuery","ClustersDistancesResult","PrototypeType","MyForceStatistics","UnitUpgrades","Overview","OverviewExtract","UnitPathfindingQuery","UnitPathfindingResult"]
+__all__ = ["uw_admin","uw_tick_cache","uw_geometry_cache","uw_commands","uw_dispatcher","Entity","INVALID","uw_events","uw_game","uw_history","uw_instrumentation","UwapiLibrary","uw_map","uw_prototypes","Replay","uw_snapshots","Snapshot","SnapshotWorkers","SyntheticLibrary","uw_world","Severity","LogCallback","ConnectionState","MyPlayer","AssistConfig","PerformanceStatistics","OrderType","OrderPriority","Order","Orders","Ids","Priority","Ping","PathState","ForeignPolicy","ChatTarget","ProtoComponent","OwnerComponent","ControllerComponent","PositionComponent","UnitState","UnitComponent","LifeComponent","ManaComponent","MoveComponent","AimComponent","RecipeComponent","RecipeStatisticsComponent","LogisticsTimestampComponent","PriorityComponent","AmountComponent","AttachmentComponent","PingComponent","PlayerState","PlayerConnectionClass","PlayerComponent","PlayerAiConfigComponent","ForceState","ForceComponent","ForceDetailsComponent","ForeignPolicyComponent","DiplomacyProposalComponent","GameConfig","GameState","ShootingEvent","ShootingsArray","TaskType","MapState","MapInfo","MapStartingPosition","MapStartingPositionsArray","Tile","Cluster","ClustersDistancesQuery","ClustersDistancesResult","PrototypeType","MyForceStatistics","UnitUpgrades","Overview","OverviewExtract","UnitPathfindingQuery","UnitPathfindingResult"]
@@ -0,0 +1,300 @@
+import os
+import sys
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+import numpy as np
+
+# TickCache: results of read-only queries into the uw library, kept until the next update.
+# The events invalidate it before calling any update listener, and on changes of the game or map state.
+# The library changes its state only between the updates, so repeated calls with the same arguments return the same results.
+#
+# GeometryCache: results of queries that depend on the map geometry only, kept for the whole game, up to a memory bound.
+# Optionally saved to a file per map guid, so that the next game on the same map starts with them.
+
+
+@dataclass(slots=True)
+class CacheStatistics:
+    hits: int = 0
+    misses: int = 0
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class TickCache:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        self._enabled = True
+        self._caches: Dict[str, Tuple[Dict[Any, Any], CacheStatistics]] = {}
+
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self) -> None:
+        self._enabled = True
+
+    def disable(self) -> None:
+        self._enabled = False
+        self._invalidate()
+
+    def cached(self, name: str, function: Callable[..., Any], *args: Any) -> Any:
+        # result of function(*args), called at most once per update for the same arguments
+        if not self._enabled:
+            return function(*args)
+        cache = self._caches.get(name)
+        if cache is None:
+            cache = self._caches[name] = ({}, CacheStatistics())
+        entries, stats = cache
+        try:
+            result = entries[args]
+            stats.hits += 1
+            return result
+        except KeyError:
+            pass
+        stats.misses += 1
+        result = entries[args] = function(*args)
+        return result
+
+    def forget(self, name: str, *args: Any) -> None:
+        # drops the result after a command that changes it within the update
+        cache = self._caches.get(name)
+        if cache is not None:
+            cache[0].pop(args, None)
+
+    def statistics(self) -> Dict[str, CacheStatistics]:
+        return {name: stats for name, (_, stats) in self._caches.items()}
+
+    def reset(self) -> None:
+        for _, stats in self._caches.values():
+            stats.hits = 0
+            stats.misses = 0
+
+    def report(self) -> str:
+        lines = [f"{'query':<20} {'hits':>10} {'misses':>10} {'hit rate':>9}"]
+        for name, s in sorted(self.statistics().items()):
+            lines.append(f"{name:<20} {s.hits:>10} {s.misses:>10} {s.hit_rate():>9.1%}")
+        return "\n".join(lines)
+
+    def _invalidate(self) -> None:
+        for entries, _ in self._caches.values():
+            entries.clear()
+
+
+_GEOMETRY_FILE_VERSION = 2
+# kinds of cached values in the file
+_IDS = 0
+_FLOAT = 1
+_BOOL = 2
+
+
+def _entry_size(key: tuple, value: Any) -> int:
+    # approximate bytes held by an entry
+    size = 200 + 24 * len(key)
+    if isinstance(value, array):
+        size += value.itemsize * len(value)
+    return size
+
+
+def _save_entries(path: str, header: list[int], guid: str, entries: list[tuple[tuple, Any]]) -> None:
+    # plain numeric and string arrays, the file is loaded without pickle
+    names: dict[str, int] = {}
+    name_indices = []
+    arg_counts = []
+    args: list[float] = []
+    kinds = []
+    scalars = []
+    ids_counts = []
+    ids = array("I")
+    for key, value in entries:
+        name_indices.append(names.setdefault(key[0], len(names)))
+        arg_counts.append(len(key) - 1)
+        args.extend(key[1:])
+        if isinstance(value, array):
+            kinds.append(_IDS)
+            scalars.append(0.0)
+            ids_counts.append(len(value))
+            ids.extend(value)
+        else:
+            kinds.append(_BOOL if isinstance(value, bool) else _FLOAT)
+            scalars.append(float(value))
+            ids_counts.append(0)
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            header=np.array(header, dtype=np.int64),
+            guid=np.array(guid, dtype=str),
+            names=np.array(list(names), dtype=str),
+            name_indices=np.array(name_indices, dtype=np.uint32),
+            arg_counts=np.array(arg_counts, dtype=np.uint32),
+            args=np.array(args, dtype=np.float64),
+            kinds=np.array(kinds, dtype=np.uint8),
+            scalars=np.array(scalars, dtype=np.float64),
+            ids_counts=np.array(ids_counts, dtype=np.uint32),
+            ids=np.frombuffer(ids, dtype=np.uint32),
+        )
+
+
+def _load_entries(path: str, header: list[int], guid: str) -> list[tuple[tuple, Any]]:
+    # empty when the file is for another map or version
+    with np.load(path, allow_pickle=False) as data:
+        if data["header"].tolist() != header or str(data["guid"]) != guid:
+            return []
+        names = data["names"].tolist()
+        name_indices = data["name_indices"].tolist()
+        arg_counts = data["arg_counts"]
+        args = data["args"].tolist()
+        kinds = data["kinds"].tolist()
+        scalars = data["scalars"].tolist()
+        ids_counts = data["ids_counts"]
+        ids = data["ids"].astype(np.uint32, copy=False)
+    count = len(kinds)
+    if not len(name_indices) == len(arg_counts) == len(scalars) == len(ids_counts) == count:
+        raise Exception("inconsistent entries")
+    if int(arg_counts.sum()) != len(args) or int(ids_counts.sum()) != len(ids):
+        raise Exception("inconsistent entries")
+    entries: list[tuple[tuple, Any]] = []
+    a = 0
+    b = 0
+    for name, n, kind, scalar, m in zip(name_indices, arg_counts.tolist(), kinds, scalars, ids_counts.tolist()):
+        key = (names[name],) + tuple(args[a : a + n])
+        a += n
+        value: Any
+        if kind == _IDS:
+            value = array("I")
+            value.frombytes(ids[b : b + m].tobytes())
+            b += m
+        elif kind == _BOOL:
+            value = bool(scalar)
+        else:
+            value = scalar
+        entries.append((key, value))
+    return entries
+
+
+class GeometryCache:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        self._enabled = True
+        self._max_bytes = 64 << 20
+        self._bytes = 0
+        self._entries: OrderedDict[tuple, Any] = OrderedDict()  # least recently used first
+        self._guid = ""  # of the loaded map, empty when no map is loaded
+        self._directory: Optional[str] = None
+        self._modified = False
+        self._library_version = 0
+        self._statistics = CacheStatistics()
+
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self, max_bytes: int = 64 << 20, directory: Optional[str] = None) -> None:
+        # when directory is given, the entries are saved there when the game finishes, when the map is unloaded,
+        # and when the library is disposed, and loaded with the map
+        self._enabled = True
+        self._max_bytes = max_bytes
+        self._directory = directory
+        self._evict()
+
+    def disable(self) -> None:
+        self._enabled = False
+        self._clear()
+
+    def bytes(self) -> int:
+        return self._bytes
+
+    def statistics(self) -> CacheStatistics:
+        return self._statistics
+
+    def ids(self, name: str, function: Callable[..., memoryview], *args: Any) -> array:
+        # ids returned by a view function of the interop, do not modify
+        def fetch(*args: Any) -> array:
+            ids = array("I")
+            ids.frombytes(function(*args).cast("B"))
+            return ids
+
+        return self.cached(name, fetch, *args)
+
+    def cached(self, name: str, function: Callable[..., Any], *args: Any) -> Any:
+        if not self._enabled or not self._guid:
+            return function(*args)
+        key = (name,) + args
+        entries = self._entries
+        try:
+            result = entries[key]
+            entries.move_to_end(key)
+            self._statistics.hits += 1
+            return result
+        except KeyError:
+            pass
+        self._statistics.misses += 1
+        result = entries[key] = function(*args)
+        self._bytes += _entry_size(key, result)
+        self._modified = True
+        self._evict()
+        return result
+
+    def _evict(self) -> None:
+        entries = self._entries
+        while self._bytes > self._max_bytes and entries:
+            key, value = entries.popitem(last=False)
+            self._bytes -= _entry_size(key, value)
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+        self._modified = False
+
+    def _path(self) -> Optional[str]:
+        if self._directory is None or not self._guid:
+            return None
+        return os.path.join(self._directory, "".join(c if c.isalnum() or c in "-_" else "_" for c in self._guid) + ".geometry")
+
+    def _map_loaded(self, guid: str, library_version: int) -> None:
+        self._map_unloaded()
+        self._guid = guid
+        self._library_version = library_version
+        path = self._path()
+        if not self._enabled or path is None or not os.path.exists(path):
+            return
+        try:
+            entries = _load_entries(path, [_GEOMETRY_FILE_VERSION, library_version], guid)
+        except Exception as e:
+            print(f"ignoring geometry cache {path}: {e}", file=sys.stderr)
+            return
+        for key, value in entries:
+            self._entries[key] = value
+            self._bytes += _entry_size(key, value)
+        self._evict()
+
+    def _save(self) -> None:
+        path = self._path()
+        if path is not None and self._modified:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            header = [_GEOMETRY_FILE_VERSION, self._library_version]
+            _save_entries(path + ".tmp", header, self._guid, list(self._entries.items()))
+            os.replace(path + ".tmp", path)
+            self._modified = False
+
+    def _map_unloaded(self) -> None:
+        self._save()
+        self._guid = ""
+        self._clear()
+
+
+uw_tick_cache = TickCache()
+uw_geometry_cache = GeometryCache()
@@ -0,0 +1,203 @@
+from dataclasses import fields
+from typing import Iterable
+import numpy as np
+from .interop import *
+from .entity import Entity
+
+# Columnar copy of the most used entity data, one row per entity, for vectorized filtering with numpy.
+# Each entity keeps its row for its lifetime, except that removals compact the table by moving the last rows into the holes.
+# The arrays returned are read-only views, valid until the next world update.
+
+COMPONENTS: tuple[str, ...] = tuple(f.name for f in fields(Entity) if f.name[0].isupper())
+COMPONENT_BITS: dict[str, int] = {name: 1 << i for i, name in enumerate(COMPONENTS)}
+
+_COLUMNS = (
+    # name, dtype, value when the component is missing
+    ("ids", np.uint32, 0),
+    ("protos", np.uint32, 0),
+    ("forces", np.uint32, 0),
+    ("positions", np.uint32, INVALID),
+    ("lives", np.int32, 0),
+    ("unit_states", np.uint32, 0),
+    ("components", np.uint32, 0),
+)
+# in the order of the columns of the table produced by entities_update_components
+_UPDATED = ("components", "protos", "forces", "positions", "lives", "unit_states")
+# columns whose changes are reported to the world indexes
+_TRACKED = ("protos", "forces", "positions")
+
+
+class EntityColumns:
+    def __init__(self, entities: dict[int, Entity], capacity: int = 1024):
+        self._entities = entities
+        self._rows: dict[int, int] = {}
+        self._count = 0
+        self._updated = np.zeros(0, dtype=np.intp)
+        self._previous: dict[str, np.ndarray] = {}
+        self._arrays: dict[str, np.ndarray] = {
+            name: np.full(capacity, missing, dtype=dtype)
+            for name, dtype, missing in _COLUMNS
+        }
+        self._attached: dict[str, tuple[np.ndarray, int]] = {}
+        self._arena_offsets = np.zeros(0, dtype=np.intp)
+
+    def _attach(self, name: str, dtype: type, missing: int, width: int = 0) -> np.ndarray:
+        # additional per row array (of width values per row, when non zero), kept in step with the rows of the table
+        # the returned array is replaced when the table grows, fetch it again after each update
+        shape = (len(self._arrays["ids"]),) + ((width,) if width else ())
+        a: np.ndarray = np.full(shape, missing, dtype=dtype)
+        self._attached[name] = (a, missing)
+        return a
+
+    def _arena(self) -> tuple[np.ndarray, np.ndarray]:
+        # raw bytes of all components of each row, as of their latest synchronization, and the offsets of the components
+        # bytes of components missing in the row are stale, see the components column
+        if "arena" not in self._attached:
+            sizes = [uw_interop._ffi.sizeof("Uw" + name + "Component") for name in COMPONENTS]
+            self._attach("arena", np.uint8, 0, sum(sizes))
+            self._arena_offsets = np.cumsum([0] + sizes[:-1])
+        return self._attachment("arena"), self._arena_offsets
+
+    def arena_bytes_per_entity(self) -> int:
+        # memory of the raw bytes of components kept for each entity, to rebuild only the changed components
+        return self._arena()[0].shape[1]
+
+    def _detach(self, name: str) -> None:
+        self._attached.pop(name, None)
+
+    def _attachment(self, name: str) -> np.ndarray:
+        return self._attached[name][0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _view(self, name: str) -> np.ndarray:
+        v = self._arrays[name][: self._count]
+        v.flags.writeable = False
+        return v
+
+    def ids(self) -> np.ndarray:
+        return self._view("ids")
+
+    def protos(self) -> np.ndarray:
+        return self._view("protos")
+
+    def forces(self) -> np.ndarray:
+        return self._view("forces")
+
+    def positions(self) -> np.ndarray:
+        return self._view("positions")
+
+    def lives(self) -> np.ndarray:
+        return self._view("lives")
+
+    def unit_states(self) -> np.ndarray:
+        return self._view("unit_states")
+
+    def components(self) -> np.ndarray:
+        return self._view("components")
+
+    def has(self, *components: str) -> np.ndarray:
+        # mask of rows of entities that have all the components
+        bits = 0
+        for c in components:
+            bits |= COMPONENT_BITS[c]
+        return (self.components() & bits) == bits
+
+    def row(self, entity_id: int) -> int:
+        return self._rows[entity_id]
+
+    def select(self, mask: np.ndarray) -> list[Entity]:
+        entities = self._entities
+        return [entities[i] for i in self.ids()[mask].tolist()]
+
+    def _grow(self, count: int) -> None:
+        capacity = len(self._arrays["ids"])
+        if count <= capacity:
+            return
+        while capacity < count:
+            capacity *= 2
+        for name, dtype, missing in _COLUMNS:
+            a = np.full(capacity, missing, dtype=dtype)
+            a[: self._count] = self._arrays[name][: self._count]
+            self._arrays[name] = a
+        for name, (a, missing) in self._attached.items():
+            b = np.full((capacity,) + a.shape[1:], missing, dtype=a.dtype)
+            b[: self._count] = a[: self._count]
+            self._attached[name] = (b, missing)
+
+    def _add(self, created: list[Entity]) -> None:
+        # new rows at the end, before the entities are synchronized
+        rows = self._rows
+        start = self._count
+        count = start + len(created)
+        self._grow(count)
+        for i, e in enumerate(created, start):
+            rows[e.id] = i
+        self._count = count
+        self._arrays["ids"][start:count] = [e.id for e in created]
+
+    def _indices(self, entities: Iterable[Entity]) -> np.ndarray:
+        rows = self._rows
+        return np.array([rows[e.id] for e in entities], dtype=np.intp)
+
+    def _update(self, entities: list[Entity], table: np.ndarray) -> None:
+        a = self._arrays
+        indices = self._indices(entities)
+        self._updated = indices
+        self._previous = {name: a[name][indices] for name in _TRACKED}
+        for i, name in enumerate(_UPDATED):
+            a[name][indices] = table[:, i]
+
+    def _values(self, entities: Iterable[Entity], *names: str) -> list[list[int]]:
+        # values of the named columns at the rows of the entities
+        indices = self._indices(entities)
+        return [self._arrays[name][indices].tolist() for name in names]
+
+    def _changed(self, *names: str) -> list[tuple[int, ...]]:
+        # (id, previous values, values) of entities in the latest update, whose any of the named columns changed
+        indices = self._updated
+        previous = [self._previous[name] for name in names]
+        current = [self._arrays[name][indices] for name in names]
+        mask = np.zeros(len(indices), dtype=bool)
+        for p, c in zip(previous, current):
+            mask |= p != c
+        changed = np.flatnonzero(mask)
+        if len(changed) == 0:
+            return []
+        return list(
+            zip(
+                self._arrays["ids"][indices[changed]].tolist(),
+                *[p[changed].tolist() for p in previous],
+                *[c[changed].tolist() for c in current],
+            )
+        )
+
+    def _remove(self, entities: Iterable[Entity]) -> None:
+        rows = self._rows
+        holes = [rows.pop(e.id) for e in entities]
+        if not holes:
+            return
+        count = self._count - len(holes)
+        # rows past the new end that stay, move into the holes before the new end
+        tail = np.ones(self._count - count, dtype=bool)
+        below = []
+        for h in holes:
+            if h >= count:
+                tail[h - count] = False
+            else:
+                below.append(h)
+        if below:
+            src = np.flatnonzero(tail) + count
+            dst = np.array(below, dtype=np.intp)
+            for a in self._arrays.values():
+                a[dst] = a[src]
+            for a, _ in self._attached.values():
+                a[dst] = a[src]
+            for eid, r in zip(self._arrays["ids"][dst].tolist(), below):
+                rows[eid] = r
+        for name, dtype, missing in _COLUMNS:
+            self._arrays[name][count : self._count] = missing
+        for a, missing in self._attached.values():
+            a[count : self._count] = missing
+        self._count = count
@@ -1,4 +1,5 @@
 from .interop import *
+from .cache import uw_tick_cache
 
 
 class Commands:
@@ -10,10 +11,12 @@ class Commands:
         return cls._instance
 
     def orders(self, unit_id: int) -> list[UwOrder]:
-        return uw_interop.uwOrders(unit_id).orders
+        # do not modify the returned list, it is shared until the next update or order
+        return uw_tick_cache.cached("orders", self._orders, unit_id)
 
     def order(self, unit_id: int, order: UwOrder) -> None:
         uw_interop.uwOrder(unit_id, order)
+        uw_tick_cache.forget("orders", unit_id)
 
     def stop(self) -> UwOrder:
         o = self._default_order()
@@ -69,21 +72,30 @@ class Commands:
 
     def load(self, unit_id: int, resource_proto: int) -> None:
         uw_interop.uwCommandLoad(unit_id, resource_proto)
+        uw_tick_cache.forget("orders", unit_id)
 
     def unload(self, unit_id: int) -> None:
         uw_interop.uwCommandUnload(unit_id)
+        uw_tick_cache.forget("orders", unit_id)
 
     def move(self, unit_id: int, position: int, yaw: float = 0) -> None:
         uw_interop.uwCommandMove(unit_id, position, yaw)
+        uw_tick_cache.forget("orders", unit_id)
 
     def aim(self, unit_id: int, target_id: int) -> None:
         uw_interop.uwCommandAim(unit_id, target_id)
+        uw_tick_cache.forget("orders", unit_id)
 
     def renounce_control(self, entity_id: int) -> None:
         uw_interop.uwCommandRenounceControl(entity_id)
+        uw_tick_cache.forget("orders", entity_id)
 
     def self_destruct(self, entity_id: int) -> None:
         uw_interop.uwCommandSelfDestruct(entity_id)
+        uw_tick_cache.forget("orders", entity_id)
+
+    def _orders(self, unit_id: int) -> list[UwOrder]:
+        return uw_interop.uwOrders(unit_id).orders
 
     def _default_order(self) -> UwOrder:
         return UwOrder(
@@ -0,0 +1,141 @@
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque
+from .interop import *
+from .events import uw_events
+from .commands import uw_commands
+
+# Calls into the uw library from other threads, executed by the thread that owns the library, in its next update.
+# The owner is the thread that enables the dispatcher, and then connects and runs the updates.
+# Other threads submit calls and receive futures, eg. threads doing analysis on a free-threaded python.
+# The queue is a deque, whose append and popleft are atomic, so neither side takes a lock in python code.
+
+
+class _OwnedApi:
+    # stands in place of the cffi library object, rejecting calls from other threads than the owner
+    def __init__(self, api: Any):
+        self._api = api
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._api, name)
+        if name.startswith("uw") and callable(value):
+            value = self._wrap(name, value)
+        setattr(self, name, value)  # resolve each name once
+        return value
+
+    def _wrap(self, name: str, function: Callable) -> Callable:
+        def owned(*args):
+            if threading.get_ident() != uw_dispatcher._owner:
+                raise Exception(f"{name} called outside of the uwapi thread")
+            return function(*args)
+
+        return owned
+
+
+class Dispatcher:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            uw_events.on_game_state(cls._instance._game_state)
+        return cls._instance
+
+    def __init__(self):
+        self._owner = 0  # thread ident, 0 when disabled
+        self._strict = False
+        self._calls: Deque[tuple[Future, Callable, tuple]] = deque()
+        self._executed = 0
+
+    def enabled(self) -> bool:
+        return self._owner != 0
+
+    def enable(self, strict: bool = False) -> None:
+        # the calling thread becomes the owner of the uw library
+        # strict rejects all direct calls into the library from other threads
+        self._owner = threading.get_ident()
+        self._strict = strict
+        self._attach()
+
+    def disable(self) -> None:
+        self._cancel()
+        self._owner = 0
+        uw_interop._unwrap(_OwnedApi)
+
+    def owner(self) -> bool:
+        # whether the calling thread may call into the uw library
+        return threading.get_ident() == self._owner
+
+    def _attach(self) -> None:
+        if not self._strict or uw_interop._api is None:
+            return
+        if not uw_interop._wrapped(_OwnedApi):
+            uw_interop._api = _OwnedApi(uw_interop._api)
+
+    def call(self, function: Callable[..., Any], *args: Any) -> Future:
+        # runs the function in the next update, or right away when called by the owner
+        if self._owner == 0:
+            raise Exception("dispatcher is not enabled")
+        future: Future = Future()
+        if threading.get_ident() == self._owner:
+            self._execute(future, function, args)
+        else:
+            self._calls.append((future, function, args))
+        return future
+
+    def pending(self) -> int:
+        return len(self._calls)
+
+    def executed(self) -> int:
+        return self._executed
+
+    # ---------------------
+
+    def order(self, unit_id: int, order: UwOrder) -> Future:
+        return self.call(uw_commands.order, unit_id, order)
+
+    def place_construction(
+        self,
+        construction_proto: int,
+        position: int,
+        yaw: float = 0,
+        recipe_proto: int = 0,
+        priority: UwPriorityEnum = UwPriorityEnum.Normal,
+    ) -> Future:
+        return self.call(uw_commands.place_construction, construction_proto, position, yaw, recipe_proto, priority)
+
+    def find_construction_placement(self, construction_proto: int, position: int, recipe_proto: int = 0) -> Future:
+        from .world import uw_world
+
+        return self.call(uw_world.find_construction_placement, construction_proto, position, recipe_proto)
+
+    # ---------------------
+
+    def _execute(self, future: Future, function: Callable, args: tuple) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        self._executed += 1
+        try:
+            future.set_result(function(*args))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _update(self, stepping: bool) -> None:
+        calls = self._calls
+        # calls submitted meanwhile wait for the next update
+        for _ in range(len(calls)):
+            future, function, args = calls.popleft()
+            self._execute(future, function, args)
+
+    def _cancel(self) -> None:
+        calls = self._calls
+        while calls:
+            calls.popleft()[0].cancel()
+
+    def _game_state(self, state: UwGameStateEnum) -> None:
+        if state == UwGameStateEnum.Finish:
+            self._cancel()
+
+
+uw_dispatcher = Dispatcher()
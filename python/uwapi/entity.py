@@ -1,5 +1,6 @@
-from dataclasses import dataclass
-from typing import Optional
+import threading
+from dataclasses import dataclass, fields
+from typing import Any, Optional
 from .interop import *
 from .prototypes import uw_prototypes, Prototype
 
@@ -8,10 +9,11 @@ def _make_empty_UwUnitUpgrades() -> UwUnitUpgrades:
     return UwUnitUpgrades(0, 0, 0, 0, 0, 0, 0)
 
 
-@dataclass
+@dataclass(slots=True)
 class Entity:
     id: int
     fresh: bool = True
+    created: int = 0  # index of the world update that created this entity
     destroyed: bool = False
 
     Proto: Optional[UwProtoComponent] = None
@@ -84,3 +86,38 @@ class Entity:
 
     def tagged(self, tag: int) -> bool:
         return self.proto().tagged(tag)
+
+
+class LazyEntity(Entity):
+    # components that were not synchronized in the latest update of the entity are fetched on their first read
+    # and kept until the entity is modified again, see World.set_lazy_components
+    __slots__ = ("_loaded",)
+    _thread: int = 0  # the thread that runs the world updates, the only one allowed to fetch
+
+    def __init__(self, id: int, fresh: bool = True, created: int = 0):
+        self._loaded = -1  # bitmask of components that hold their current value
+        Entity.__init__(self, id, fresh, created)
+
+
+def _lazy_component(index: int, name: str) -> property:
+    slot: Any = Entity.__dict__[name]
+    bit = 1 << index
+    fetch = "uwFetch" + name + "Component"
+
+    def get(self: LazyEntity) -> Any:
+        if not self._loaded & bit and not self.destroyed:
+            if threading.get_ident() != LazyEntity._thread:
+                raise Exception(f"component {name} of entity {self.id} read outside of the uwapi thread")
+            ok, value = getattr(uw_interop, fetch)(uw_interop.uwEntityPointer(self.id))
+            slot.__set__(self, value if ok else None)
+            self._loaded |= bit
+        return slot.__get__(self, LazyEntity)
+
+    def set(self: LazyEntity, value: Any) -> None:
+        slot.__set__(self, value)
+
+    return property(get, set)
+
+
+for _index, _name in enumerate(f.name for f in fields(Entity) if f.name[0].isupper()):
+    setattr(LazyEntity, _name, _lazy_component(_index, _name))
@@ -1,141 +1,254 @@
-
-# THIS FILE IS GENERATED BY SCRIPT
-# DO NOT MODIFY
-
+# Originally generated from bots.h, now maintained by hand, do not regenerate over it.
+# The components are unrolled in the order of the fields of Entity (see COMPONENTS in columns.py),
+# a component added to bots.h needs its fetch here, and its field in Entity.
+# All modified entities are synchronized in one pass, fetching into preallocated batches, one slot per entity,
+# then the batches are compared with the raw bytes of the previous synchronization, kept in the columns,
+# and only the components whose bytes differ are rebuilt, the others keep their python objects.
+# Hand written beyond the fetches:
+# - the selection of components per proto (World.select_components), the others are not fetched and read None
+# - the change callback of watched components (World.on_component_changed), called before their objects are rebuilt
+# - the comparison with the raw bytes (EntityColumns._arena), and the columnar values computed from the batches
+
+from typing import Any, Callable, Mapping, Optional, Sequence
+import numpy as np
 from .interop import *
 from .entity import Entity
-
-def entity_update_components(e: Entity):
-    ptr = uw_interop.uwEntityPointer(e.id)
-
-    c_Proto = uw_interop.uwFetchProtoComponent(ptr)
-    if c_Proto[0]:
-        e.Proto = c_Proto[1]
-    else:
-        e.Proto = None
-
-    c_Owner = uw_interop.uwFetchOwnerComponent(ptr)
-    if c_Owner[0]:
-        e.Owner = c_Owner[1]
-    else:
-        e.Owner = None
-
-    c_Controller = uw_interop.uwFetchControllerComponent(ptr)
-    if c_Controller[0]:
-        e.Controller = c_Controller[1]
-    else:
-        e.Controller = None
-
-    c_Position = uw_interop.uwFetchPositionComponent(ptr)
-    if c_Position[0]:
-        e.Position = c_Position[1]
-    else:
-        e.Position = None
-
-    c_Unit = uw_interop.uwFetchUnitComponent(ptr)
-    if c_Unit[0]:
-        e.Unit = c_Unit[1]
-    else:
-        e.Unit = None
-
-    c_Life = uw_interop.uwFetchLifeComponent(ptr)
-    if c_Life[0]:
-        e.Life = c_Life[1]
-    else:
-        e.Life = None
-
-    c_Mana = uw_interop.uwFetchManaComponent(ptr)
-    if c_Mana[0]:
-        e.Mana = c_Mana[1]
-    else:
-        e.Mana = None
-
-    c_Move = uw_interop.uwFetchMoveComponent(ptr)
-    if c_Move[0]:
-        e.Move = c_Move[1]
-    else:
-        e.Move = None
-
-    c_Aim = uw_interop.uwFetchAimComponent(ptr)
-    if c_Aim[0]:
-        e.Aim = c_Aim[1]
-    else:
-        e.Aim = None
-
-    c_Recipe = uw_interop.uwFetchRecipeComponent(ptr)
-    if c_Recipe[0]:
-        e.Recipe = c_Recipe[1]
-    else:
-        e.Recipe = None
-
-    c_RecipeStatistics = uw_interop.uwFetchRecipeStatisticsComponent(ptr)
-    if c_RecipeStatistics[0]:
-        e.RecipeStatistics = c_RecipeStatistics[1]
-    else:
-        e.RecipeStatistics = None
-
-    c_LogisticsTimestamp = uw_interop.uwFetchLogisticsTimestampComponent(ptr)
-    if c_LogisticsTimestamp[0]:
-        e.LogisticsTimestamp = c_LogisticsTimestamp[1]
-    else:
-        e.LogisticsTimestamp = None
-
-    c_Priority = uw_interop.uwFetchPriorityComponent(ptr)
-    if c_Priority[0]:
-        e.Priority = c_Priority[1]
-    else:
-        e.Priority = None
-
-    c_Amount = uw_interop.uwFetchAmountComponent(ptr)
-    if c_Amount[0]:
-        e.Amount = c_Amount[1]
-    else:
-        e.Amount = None
-
-    c_Attachment = uw_interop.uwFetchAttachmentComponent(ptr)
-    if c_Attachment[0]:
-        e.Attachment = c_Attachment[1]
-    else:
-        e.Attachment = None
-
-    c_Ping = uw_interop.uwFetchPingComponent(ptr)
-    if c_Ping[0]:
-        e.Ping = c_Ping[1]
-    else:
-        e.Ping = None
-
-    c_Player = uw_interop.uwFetchPlayerComponent(ptr)
-    if c_Player[0]:
-        e.Player = c_Player[1]
-    else:
-        e.Player = None
-
-    c_PlayerAiConfig = uw_interop.uwFetchPlayerAiConfigComponent(ptr)
-    if c_PlayerAiConfig[0]:
-        e.PlayerAiConfig = c_PlayerAiConfig[1]
-    else:
-        e.PlayerAiConfig = None
-
-    c_Force = uw_interop.uwFetchForceComponent(ptr)
-    if c_Force[0]:
-        e.Force = c_Force[1]
-    else:
-        e.Force = None
-
-    c_ForceDetails = uw_interop.uwFetchForceDetailsComponent(ptr)
-    if c_ForceDetails[0]:
-        e.ForceDetails = c_ForceDetails[1]
-    else:
-        e.ForceDetails = None
-
-    c_ForeignPolicy = uw_interop.uwFetchForeignPolicyComponent(ptr)
-    if c_ForeignPolicy[0]:
-        e.ForeignPolicy = c_ForeignPolicy[1]
-    else:
-        e.ForeignPolicy = None
-
-    c_DiplomacyProposal = uw_interop.uwFetchDiplomacyProposalComponent(ptr)
-    if c_DiplomacyProposal[0]:
-        e.DiplomacyProposal = c_DiplomacyProposal[1]
-    else:
-        e.DiplomacyProposal = None
+from .columns import EntityColumns, COMPONENTS
+
+
+def _batch(name: str, count: int) -> tuple[Any, np.ndarray]:
+    # preallocated array of the component, for at least count entities, and the same memory as rows of raw bytes
+    ctype = "Uw" + name + "Component"
+    p = uw_interop._array(ctype, count)
+    raw = np.frombuffer(uw_interop._ffi.buffer(p), dtype=np.uint8).reshape(len(p), -1)
+    return p, raw
+
+
+def entities_update_components(
+    entities: Sequence[Entity],
+    selection: Optional[Mapping[int, int]] = None,
+    watched: int = 0,
+    changed: Callable[[Entity, int], None] = lambda e, component: None,
+    columns: Optional[EntityColumns] = None,
+    entity_pointers: Optional[Sequence[Any]] = None,
+) -> np.ndarray:
+    # selection maps proto ids (0 for entities without proto) to bitmasks of components to fetch, others are set to None
+    # with columns, components whose raw bytes equal those of the previous synchronization keep their objects,
+    # without, all fetched components are rebuilt
+    # for watched components (bitmask), changed(entity, component index) is called before the entity is updated
+    # entity_pointers of the entities, when the caller already has them
+    # returns the columnar values of the entities, one row per entity, see EntityColumns
+    count = len(entities)
+    api = uw_interop._api
+    if entity_pointers is None:
+        entity_pointers = [api.uwEntityPointer(e.id) for e in entities]
+    f_Proto = api.uwFetchProtoComponent
+    p_Proto, r_Proto = _batch("Proto", count)
+    f_Owner = api.uwFetchOwnerComponent
+    p_Owner, r_Owner = _batch("Owner", count)
+    f_Controller = api.uwFetchControllerComponent
+    p_Controller, r_Controller = _batch("Controller", count)
+    f_Position = api.uwFetchPositionComponent
+    p_Position, r_Position = _batch("Position", count)
+    f_Unit = api.uwFetchUnitComponent
+    p_Unit, r_Unit = _batch("Unit", count)
+    f_Life = api.uwFetchLifeComponent
+    p_Life, r_Life = _batch("Life", count)
+    f_Mana = api.uwFetchManaComponent
+    p_Mana, r_Mana = _batch("Mana", count)
+    f_Move = api.uwFetchMoveComponent
+    p_Move, r_Move = _batch("Move", count)
+    f_Aim = api.uwFetchAimComponent
+    p_Aim, r_Aim = _batch("Aim", count)
+    f_Recipe = api.uwFetchRecipeComponent
+    p_Recipe, r_Recipe = _batch("Recipe", count)
+    f_RecipeStatistics = api.uwFetchRecipeStatisticsComponent
+    p_RecipeStatistics, r_RecipeStatistics = _batch("RecipeStatistics", count)
+    f_LogisticsTimestamp = api.uwFetchLogisticsTimestampComponent
+    p_LogisticsTimestamp, r_LogisticsTimestamp = _batch("LogisticsTimestamp", count)
+    f_Priority = api.uwFetchPriorityComponent
+    p_Priority, r_Priority = _batch("Priority", count)
+    f_Amount = api.uwFetchAmountComponent
+    p_Amount, r_Amount = _batch("Amount", count)
+    f_Attachment = api.uwFetchAttachmentComponent
+    p_Attachment, r_Attachment = _batch("Attachment", count)
+    f_Ping = api.uwFetchPingComponent
+    p_Ping, r_Ping = _batch("Ping", count)
+    f_Player = api.uwFetchPlayerComponent
+    p_Player, r_Player = _batch("Player", count)
+    f_PlayerAiConfig = api.uwFetchPlayerAiConfigComponent
+    p_PlayerAiConfig, r_PlayerAiConfig = _batch("PlayerAiConfig", count)
+    f_Force = api.uwFetchForceComponent
+    p_Force, r_Force = _batch("Force", count)
+    f_ForceDetails = api.uwFetchForceDetailsComponent
+    p_ForceDetails, r_ForceDetails = _batch("ForceDetails", count)
+    f_ForeignPolicy = api.uwFetchForeignPolicyComponent
+    p_ForeignPolicy, r_ForeignPolicy = _batch("ForeignPolicy", count)
+    f_DiplomacyProposal = api.uwFetchDiplomacyProposalComponent
+    p_DiplomacyProposal, r_DiplomacyProposal = _batch("DiplomacyProposal", count)
+
+    bits: list[int] = []
+    for i, ptr in enumerate(entity_pointers):
+        if f_Proto(ptr, p_Proto + i):
+            m = 1
+            w = -1 if selection is None else selection[p_Proto[i].proto]
+        else:
+            m = 0
+            w = -1 if selection is None else selection[0]
+        if w & (1 << 1) and f_Owner(ptr, p_Owner + i):
+            m |= 1 << 1
+        if w & (1 << 2) and f_Controller(ptr, p_Controller + i):
+            m |= 1 << 2
+        if w & (1 << 3) and f_Position(ptr, p_Position + i):
+            m |= 1 << 3
+        if w & (1 << 4) and f_Unit(ptr, p_Unit + i):
+            m |= 1 << 4
+        if w & (1 << 5) and f_Life(ptr, p_Life + i):
+            m |= 1 << 5
+        if w & (1 << 6) and f_Mana(ptr, p_Mana + i):
+            m |= 1 << 6
+        if w & (1 << 7) and f_Move(ptr, p_Move + i):
+            m |= 1 << 7
+        if w & (1 << 8) and f_Aim(ptr, p_Aim + i):
+            m |= 1 << 8
+        if w & (1 << 9) and f_Recipe(ptr, p_Recipe + i):
+            m |= 1 << 9
+        if w & (1 << 10) and f_RecipeStatistics(ptr, p_RecipeStatistics + i):
+            m |= 1 << 10
+        if w & (1 << 11) and f_LogisticsTimestamp(ptr, p_LogisticsTimestamp + i):
+            m |= 1 << 11
+        if w & (1 << 12) and f_Priority(ptr, p_Priority + i):
+            m |= 1 << 12
+        if w & (1 << 13) and f_Amount(ptr, p_Amount + i):
+            m |= 1 << 13
+        if w & (1 << 14) and f_Attachment(ptr, p_Attachment + i):
+            m |= 1 << 14
+        if w & (1 << 15) and f_Ping(ptr, p_Ping + i):
+            m |= 1 << 15
+        if w & (1 << 16) and f_Player(ptr, p_Player + i):
+            m |= 1 << 16
+        if w & (1 << 17) and f_PlayerAiConfig(ptr, p_PlayerAiConfig + i):
+            m |= 1 << 17
+        if w & (1 << 18) and f_Force(ptr, p_Force + i):
+            m |= 1 << 18
+        if w & (1 << 19) and f_ForceDetails(ptr, p_ForceDetails + i):
+            m |= 1 << 19
+        if w & (1 << 20) and f_ForeignPolicy(ptr, p_ForeignPolicy + i):
+            m |= 1 << 20
+        if w & (1 << 21) and f_DiplomacyProposal(ptr, p_DiplomacyProposal + i):
+            m |= 1 << 21
+        bits.append(m)
+
+    masks = np.array(bits, dtype=np.uint32)
+    raw = [
+        r_Proto,
+        r_Owner,
+        r_Controller,
+        r_Position,
+        r_Unit,
+        r_Life,
+        r_Mana,
+        r_Move,
+        r_Aim,
+        r_Recipe,
+        r_RecipeStatistics,
+        r_LogisticsTimestamp,
+        r_Priority,
+        r_Amount,
+        r_Attachment,
+        r_Ping,
+        r_Player,
+        r_PlayerAiConfig,
+        r_Force,
+        r_ForceDetails,
+        r_ForeignPolicy,
+        r_DiplomacyProposal,
+    ]
+    present = (masks[:, None] >> np.arange(len(COMPONENTS), dtype=np.uint32)) & 1 != 0
+    if columns is None:
+        build = present
+        gone = ~present
+    else:
+        rows = columns._indices(entities)
+        previous = columns._arrays["components"][rows]
+        before = (previous[:, None] >> np.arange(len(COMPONENTS), dtype=np.uint32)) & 1 != 0
+        arena, offsets = columns._arena()
+        batch = np.concatenate([r[:count] for r in raw], axis=1)
+        same = np.logical_and.reduceat(arena[rows] == batch, offsets, axis=1)
+        # bytes of components not fetched are stored too, but never compared, the component was missing before
+        arena[rows] = batch
+        build = present & ~(before & same)
+        gone = before & ~present
+    pointers = (
+        p_Proto,
+        p_Owner,
+        p_Controller,
+        p_Position,
+        p_Unit,
+        p_Life,
+        p_Mana,
+        p_Move,
+        p_Aim,
+        p_Recipe,
+        p_RecipeStatistics,
+        p_LogisticsTimestamp,
+        p_Priority,
+        p_Amount,
+        p_Attachment,
+        p_Ping,
+        p_Player,
+        p_PlayerAiConfig,
+        p_Force,
+        p_ForceDetails,
+        p_ForeignPolicy,
+        p_DiplomacyProposal,
+    )
+    ctopys = (
+        uw_interop._UwProtoComponent_ctopy,
+        uw_interop._UwOwnerComponent_ctopy,
+        uw_interop._UwControllerComponent_ctopy,
+        uw_interop._UwPositionComponent_ctopy,
+        uw_interop._UwUnitComponent_ctopy,
+        uw_interop._UwLifeComponent_ctopy,
+        uw_interop._UwManaComponent_ctopy,
+        uw_interop._UwMoveComponent_ctopy,
+        uw_interop._UwAimComponent_ctopy,
+        uw_interop._UwRecipeComponent_ctopy,
+        uw_interop._UwRecipeStatisticsComponent_ctopy,
+        uw_interop._UwLogisticsTimestampComponent_ctopy,
+        uw_interop._UwPriorityComponent_ctopy,
+        uw_interop._UwAmountComponent_ctopy,
+        uw_interop._UwAttachmentComponent_ctopy,
+        uw_interop._UwPingComponent_ctopy,
+        uw_interop._UwPlayerComponent_ctopy,
+        uw_interop._UwPlayerAiConfigComponent_ctopy,
+        uw_interop._UwForceComponent_ctopy,
+        uw_interop._UwForceDetailsComponent_ctopy,
+        uw_interop._UwForeignPolicyComponent_ctopy,
+        uw_interop._UwDiplomacyProposalComponent_ctopy,
+    )
+    # component by component, so that the change callback of the others sees the new proto
+    for c in np.flatnonzero((build | gone).any(axis=0)).tolist():
+        name = COMPONENTS[c]
+        ctopy = ctopys[c]
+        p = pointers[c]
+        if watched >> c & 1:
+            for i in np.flatnonzero(build[:, c] | gone[:, c]).tolist():
+                changed(entities[i], c)
+        for i in np.flatnonzero(build[:, c]).tolist():
+            setattr(entities[i], name, ctopy(p[i]))
+        for i in np.flatnonzero(gone[:, c]).tolist():
+            setattr(entities[i], name, None)
+
+    table = np.zeros((count, 6), dtype=np.int64)
+    table[:, 0] = masks
+    table[:, 1] = np.where(present[:, 0], r_Proto[:count].view(np.uint32)[:, 0], 0)
+    table[:, 2] = np.where(present[:, 1], r_Owner[:count].view(np.uint32)[:, 0], 0)
+    table[:, 3] = np.where(present[:, 3], r_Position[:count].view(np.uint32)[:, 0], INVALID)
+    table[:, 4] = np.where(present[:, 5], r_Life[:count].view(np.int32)[:, 0], 0)
+    table[:, 5] = np.where(present[:, 4], r_Unit[:count].view(np.uint32)[:, 0], 0)
+    return table
+
+
+def entity_update_components(e: Entity) -> None:
+    entities_update_components([e])
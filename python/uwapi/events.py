@@ -2,9 +2,11 @@ from dataclasses import field
 from tarfile import NUL
 from typing import Callable, List, Dict, Any
 from .interop import *
+from .interop import _UwShootingEventEnum_lookup
+from .cache import uw_tick_cache
 
 
-@dataclass
+@dataclass(slots=True)
 class ShootingControlData:
     type: UwShootingEventEnum
     count: int
@@ -66,7 +68,7 @@ class Events:
     def shooting_control_data(self, id: int) -> ShootingControlData:
         low = id & 0xFFFF
         high = (id >> 16) & 0xFFFF
-        return ShootingControlData(UwShootingEventEnum(low), high)
+        return ShootingControlData(_UwShootingEventEnum_lookup[low], high)
 
     # ---------------------
 
@@ -79,14 +81,18 @@ class Events:
             listener(state)
 
     def _game_state_callback(self, state: UwGameStateEnum) -> None:
+        uw_tick_cache._invalidate()
         for listener in self._game_state_listeners:
             listener(state)
 
     def _map_state_callback(self, state: UwMapStateEnum) -> None:
+        uw_tick_cache._invalidate()
         for listener in self._map_state_listeners:
             listener(state)
 
     def _update_callback(self, stepping: bool) -> None:
+        # before any listener, the cached results belong to the previous update
+        uw_tick_cache._invalidate()
         for listener in self._update_listeners:
             listener(stepping)
 
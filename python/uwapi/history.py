@@ -0,0 +1,144 @@
+from typing import Optional
+import numpy as np
+from .interop import *
+from .columns import EntityColumns
+from .map import uw_map
+
+# Recent history of positions, life and unit state of all entities, in ring buffers of fixed size.
+# Rows of the history follow the rows of the entity columns (uw_world.columns()), and so do the arrays returned by the queries.
+# Time is measured in ticks, one for each world update that steps the game.
+
+_FIELDS = (
+    # name of the column, dtype, value when the component is missing
+    ("positions", np.uint32, INVALID),
+    ("lives", np.int32, 0),
+    ("unit_states", np.uint32, 0),
+)
+
+
+class History:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        self._length = 0  # ticks kept, 0 when disabled
+        self._tick = 0  # ticks recorded
+        self._columns: Optional[EntityColumns] = None
+
+    def enabled(self) -> bool:
+        return self._length > 0
+
+    def enable(self, ticks: int = 100) -> None:
+        # may be called before or after connecting, entities existing at that time start their history with the next tick
+        from .world import uw_world
+
+        self.disable()
+        columns = uw_world.columns()
+        for name, dtype, missing in _FIELDS:
+            columns._attach("history_" + name, dtype, missing, ticks)
+        columns._attach("history_since", np.int64, -1)  # first tick recorded for the row
+        columns._attach("history_changed", np.int64, -1)  # last tick in which the unit state changed
+        self._columns = columns
+        self._length = ticks
+        self._tick = 0
+
+    def disable(self) -> None:
+        if self._columns is not None:
+            for name, _, _ in _FIELDS:
+                self._columns._detach("history_" + name)
+            self._columns._detach("history_since")
+            self._columns._detach("history_changed")
+        self._columns = None
+        self._length = 0
+
+    def length(self) -> int:
+        return self._length
+
+    def ticks(self) -> int:
+        return self._tick
+
+    def recorded(self, ago: int) -> np.ndarray:
+        # mask of rows with history reaching ago ticks before the latest tick
+        since = self._attachment("history_since")
+        return (since >= 0) & (since <= self._tick - 1 - self._index_check(ago))
+
+    def positions(self, ago: int = 0) -> np.ndarray:
+        return self._field("positions", ago)
+
+    def lives(self, ago: int = 0) -> np.ndarray:
+        return self._field("lives", ago)
+
+    def unit_states(self, ago: int = 0) -> np.ndarray:
+        return self._field("unit_states", ago)
+
+    def velocities(self, ticks: int = 1) -> np.ndarray:
+        # straight-line movement per tick over the last ticks, one row of x, y, z per entity, nan without position or history
+        # the line cuts through obstacles and the curvature of the map, see speeds for distances along the map
+        positions = uw_map.positions_array()
+        then = self.positions(ticks)
+        now = self.positions()
+        valid = self.recorded(ticks) & (then != INVALID) & (now != INVALID)
+        result = np.full((len(now), 3), np.nan)
+        result[valid] = (positions[now[valid]] - positions[then[valid]]) / ticks
+        return result
+
+    def speeds(self, ticks: int = 1) -> np.ndarray:
+        # distance per tick over the last ticks, estimated along the map by uw_map.distance_estimate between the recorded tiles
+        # nan without position or history, only the entities that changed their tile are estimated
+        then = self.positions(ticks)
+        now = self.positions()
+        valid = self.recorded(ticks) & (then != INVALID) & (now != INVALID)
+        result = np.where(valid, 0.0, np.nan)
+        moved = np.flatnonzero(valid & (then != now))
+        estimate = uw_map.distance_estimate
+        result[moved] = [estimate(a, b) for a, b in zip(then[moved].tolist(), now[moved].tolist())]
+        return result / ticks
+
+    def life_loss_rates(self, ticks: int = 1) -> np.ndarray:
+        # life lost per tick over the last ticks, negative when healing, nan without history
+        result = (self.lives(ticks) - self.lives().astype(float)) / ticks
+        result[~self.recorded(ticks)] = np.nan
+        return result
+
+    def since_state_change(self) -> np.ndarray:
+        # ticks since the latest change of the unit state, or since the start of the history of the entity
+        changed = self._attachment("history_changed")
+        return np.where(changed >= 0, self._tick - 1 - changed, 0)
+
+    def _attachment(self, name: str) -> np.ndarray:
+        if self._columns is None:
+            raise Exception("history is not enabled")
+        return self._columns._attachment(name)[: len(self._columns)]
+
+    def _index_check(self, ago: int) -> int:
+        if not 0 <= ago < self._length:
+            raise Exception(f"history keeps {self._length} ticks")
+        return ago
+
+    def _field(self, name: str, ago: int) -> np.ndarray:
+        # values of all rows ago ticks before the latest tick, do not modify
+        buffer = self._attachment("history_" + name)
+        return buffer[:, (self._tick - 1 - self._index_check(ago)) % self._length]
+
+    def _record(self) -> None:
+        columns = self._columns
+        assert columns is not None
+        tick = self._tick
+        i = tick % self._length
+        count = len(columns)
+        since = self._attachment("history_since")
+        since[since < 0] = tick
+        states = columns.unit_states()
+        changed = self._attachment("history_changed")
+        previous = self._attachment("history_unit_states")[:, (tick - 1) % self._length]
+        changed[(states != previous) | (changed < 0)] = tick
+        for name, _, _ in _FIELDS:
+            columns._attachment("history_" + name)[:count, i] = getattr(columns, name)()
+        self._tick = tick + 1
+
+
+uw_history = History()
@@ -0,0 +1,152 @@
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from .interop import *
+from .events import uw_events
+
+HISTOGRAM_BUCKETS = 48  # bucket i counts calls that took [2^(i-1), 2^i) nanoseconds
+
+
+@dataclass(slots=True)
+class CallStatistics:
+    calls: int = 0
+    total_ns: int = 0
+    histogram: List[int] = field(default_factory=lambda: [0] * HISTOGRAM_BUCKETS)
+
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
+
+    def percentile_ns(self, p: float) -> int:
+        # upper bound of the histogram bucket containing the percentile
+        remaining = self.calls * p
+        for i, count in enumerate(self.histogram):
+            remaining -= count
+            if remaining <= 0:
+                return 1 << i
+        return 1 << (HISTOGRAM_BUCKETS - 1)
+
+    def _reset(self) -> None:
+        self.calls = 0
+        self.total_ns = 0
+        for i in range(HISTOGRAM_BUCKETS):
+            self.histogram[i] = 0
+
+
+class _InstrumentedApi:
+    # stands in place of the cffi library object, timing every uw* function
+    def __init__(self, api: Any, statistics: Dict[str, CallStatistics]):
+        self._api = api
+        self._statistics = statistics
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._api, name)
+        if name.startswith("uw") and callable(value):
+            value = self._wrap(name, value)
+        setattr(self, name, value)  # resolve each name once
+        return value
+
+    def _wrap(self, name: str, function: Callable) -> Callable:
+        stats = self._statistics.setdefault(name, CallStatistics())
+        histogram = stats.histogram
+        clock = time.perf_counter_ns
+        last = HISTOGRAM_BUCKETS - 1
+
+        def timed(*args):
+            start = clock()
+            try:
+                return function(*args)
+            finally:
+                elapsed = clock() - start
+                stats.calls += 1
+                stats.total_ns += elapsed
+                histogram[min(elapsed.bit_length(), last)] += 1
+
+        return timed
+
+
+class Instrumentation:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        self._enabled = False
+        self._dump_directory: Optional[str] = None
+        self._games = 0
+        self._statistics: Dict[str, CallStatistics] = {}
+        self._listening = False
+
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def enable(self, dump_directory: Optional[str] = None) -> None:
+        # may be called before or after the library is initialized
+        # when dump_directory is given, statistics are written there and reset at the end of each game
+        self._enabled = True
+        self._dump_directory = dump_directory
+        if not self._listening:
+            uw_events.on_game_state(self._game_state)
+            self._listening = True
+        self._attach()
+
+    def disable(self) -> None:
+        self._enabled = False
+        uw_interop._unwrap(_InstrumentedApi)
+
+    def _attach(self) -> None:
+        if not self._enabled or uw_interop._api is None:
+            return
+        if not uw_interop._wrapped(_InstrumentedApi):
+            uw_interop._api = _InstrumentedApi(uw_interop._api, self._statistics)
+
+    def statistics(self) -> Dict[str, CallStatistics]:
+        return {k: v for k, v in self._statistics.items() if v.calls > 0}
+
+    def reset(self) -> None:
+        for stats in self._statistics.values():
+            stats._reset()
+
+    def report(self, limit: int = 30) -> str:
+        lines = [
+            f"{'function':<40} {'calls':>10} {'total ms':>10} {'mean ns':>9} {'p50 ns':>9} {'p99 ns':>9}"
+        ]
+        items = sorted(self.statistics().items(), key=lambda kv: -kv[1].total_ns)
+        for name, s in items[:limit]:
+            lines.append(
+                f"{name:<40} {s.calls:>10} {s.total_ns / 1e6:>10.2f} {s.mean_ns():>9.0f} {s.percentile_ns(0.5):>9} {s.percentile_ns(0.99):>9}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, path: str) -> None:
+        data = {
+            name: {
+                "calls": s.calls,
+                "total_ns": s.total_ns,
+                "histogram": s.histogram,
+            }
+            for name, s in self.statistics().items()
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=1)
+
+    def _game_state(self, state: UwGameStateEnum) -> None:
+        if state != UwGameStateEnum.Finish or not self._enabled:
+            return
+        self._games += 1
+        if self._dump_directory is not None:
+            os.makedirs(self._dump_directory, exist_ok=True)
+            self.dump(
+                os.path.join(
+                    self._dump_directory,
+                    f"interop-{os.getpid()}-{self._games}.json",
+                )
+            )
+            self.reset()
+
+
+uw_instrumentation = Instrumentation()
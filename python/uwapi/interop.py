@@ -1,12 +1,14 @@
 
-# THIS FILE IS GENERATED BY SCRIPT
-# DO NOT MODIFY
+# Originally generated from bots.h, now maintained by hand, do not regenerate over it.
+# Changes in bots.h must be applied here by hand.
+# Beyond the generated bindings, it holds the lookup tables of enums and flags, the slotted dataclasses,
+# the *View variants returning memoryviews, and the preallocated output buffers.
 
 # pyright: reportOptionalMemberAccess=false
 
 from enum import Enum, IntFlag
 from dataclasses import dataclass
-from typing import Callable, Tuple, List
+from typing import Callable, Dict, Literal, Tuple, List, TypeVar
 from cffi import FFI
 
 INVALID: int = 0xFFFFFFFF
@@ -158,26 +160,62 @@ class UwOverviewFlags(IntFlag):
     Unit = MobileUnit | StaticUnit
 
 
-@dataclass
+_F = TypeVar("_F", bound=IntFlag)
+
+
+# conversions from c values: enums are tuples indexed by value, flags are memoized on first use
+class _FlagsLookup(dict[int, _F]):
+    def __init__(self, flags: type[_F]):
+        super().__init__()
+        self._flags = flags
+
+    def __missing__(self, value: int) -> _F:
+        flag = self._flags(value)
+        self[value] = flag
+        return flag
+
+
+_UwSeverityEnum_lookup: Tuple[UwSeverityEnum, ...] = tuple(UwSeverityEnum)
+_UwConnectionStateEnum_lookup: Tuple[UwConnectionStateEnum, ...] = tuple(UwConnectionStateEnum)
+_UwOrderTypeEnum_lookup: Tuple[UwOrderTypeEnum, ...] = tuple(UwOrderTypeEnum)
+_UwPriorityEnum_lookup: Tuple[UwPriorityEnum, ...] = tuple(UwPriorityEnum)
+_UwPingEnum_lookup: Tuple[UwPingEnum, ...] = tuple(UwPingEnum)
+_UwPathStateEnum_lookup: Tuple[UwPathStateEnum, ...] = tuple(UwPathStateEnum)
+_UwForeignPolicyEnum_lookup: Tuple[UwForeignPolicyEnum, ...] = tuple(UwForeignPolicyEnum)
+_UwChatTargetEnum_lookup: Tuple[UwChatTargetEnum, ...] = tuple(UwChatTargetEnum)
+_UwPlayerConnectionClassEnum_lookup: Tuple[UwPlayerConnectionClassEnum, ...] = tuple(UwPlayerConnectionClassEnum)
+_UwGameStateEnum_lookup: Tuple[UwGameStateEnum, ...] = tuple(UwGameStateEnum)
+_UwShootingEventEnum_lookup: Tuple[UwShootingEventEnum, ...] = tuple(UwShootingEventEnum)
+_UwTaskTypeEnum_lookup: Tuple[UwTaskTypeEnum, ...] = tuple(UwTaskTypeEnum)
+_UwMapStateEnum_lookup: Tuple[UwMapStateEnum, ...] = tuple(UwMapStateEnum)
+_UwPrototypeTypeEnum_lookup: Tuple[UwPrototypeTypeEnum, ...] = tuple(UwPrototypeTypeEnum)
+_UwOrderPriorityFlags_lookup: _FlagsLookup[UwOrderPriorityFlags] = _FlagsLookup(UwOrderPriorityFlags)
+_UwUnitStateFlags_lookup: _FlagsLookup[UwUnitStateFlags] = _FlagsLookup(UwUnitStateFlags)
+_UwPlayerStateFlags_lookup: _FlagsLookup[UwPlayerStateFlags] = _FlagsLookup(UwPlayerStateFlags)
+_UwForceStateFlags_lookup: _FlagsLookup[UwForceStateFlags] = _FlagsLookup(UwForceStateFlags)
+_UwOverviewFlags_lookup: _FlagsLookup[UwOverviewFlags] = _FlagsLookup(UwOverviewFlags)
+
+
+@dataclass(slots=True)
 class UwLogCallback:
     message: str
     component: str
     severity: UwSeverityEnum
 
-@dataclass
+@dataclass(slots=True)
 class UwMyPlayer:
     playerEntityId: int
     forceEntityId: int
     primaryController: bool
     admin: bool
 
-@dataclass
+@dataclass(slots=True)
 class UwAssistConfig:
     logistics: bool
     aiming: bool
     fighting: bool
 
-@dataclass
+@dataclass(slots=True)
 class UwPerformanceStatistics:
     gameSpeed: float
     mainThreadUtilization: float
@@ -185,92 +223,92 @@ class UwPerformanceStatistics:
     networkUp: int
     networkDown: int
 
-@dataclass
+@dataclass(slots=True)
 class UwOrder:
     entity: int
     position: int
     order: UwOrderTypeEnum
     priority: UwOrderPriorityFlags
 
-@dataclass
+@dataclass(slots=True)
 class UwOrders:
     orders: list[UwOrder]
     count: int
 
-@dataclass
+@dataclass(slots=True)
 class UwIds:
     ids: list[int]
     count: int
 
-@dataclass
+@dataclass(slots=True)
 class UwProtoComponent:
     proto: int
 
-@dataclass
+@dataclass(slots=True)
 class UwOwnerComponent:
     force: int
 
-@dataclass
+@dataclass(slots=True)
 class UwControllerComponent:
     player: int
     timestamp: int
 
-@dataclass
+@dataclass(slots=True)
 class UwPositionComponent:
     position: int
     yaw: float
 
-@dataclass
+@dataclass(slots=True)
 class UwUnitComponent:
     state: UwUnitStateFlags
     killCount: int
 
-@dataclass
+@dataclass(slots=True)
 class UwLifeComponent:
     life: int
 
-@dataclass
+@dataclass(slots=True)
 class UwManaComponent:
     mana: int
 
-@dataclass
+@dataclass(slots=True)
 class UwMoveComponent:
     timestamp: int
 
-@dataclass
+@dataclass(slots=True)
 class UwAimComponent:
     target: int
 
-@dataclass
+@dataclass(slots=True)
 class UwRecipeComponent:
     recipe: int
 
-@dataclass
+@dataclass(slots=True)
 class UwRecipeStatisticsComponent:
     timestamps: list[int]
     completed: int
 
-@dataclass
+@dataclass(slots=True)
 class UwLogisticsTimestampComponent:
     timestamp: int
 
-@dataclass
+@dataclass(slots=True)
 class UwPriorityComponent:
     priority: UwPriorityEnum
 
-@dataclass
+@dataclass(slots=True)
 class UwAmountComponent:
     amount: int
 
-@dataclass
+@dataclass(slots=True)
 class UwAttachmentComponent:
     target: int
 
-@dataclass
+@dataclass(slots=True)
 class UwPingComponent:
     ping: UwPingEnum
 
-@dataclass
+@dataclass(slots=True)
 class UwPlayerComponent:
     name: str
     nameLength: int
@@ -281,14 +319,14 @@ class UwPlayerComponent:
     state: UwPlayerStateFlags
     playerConnectionClass: UwPlayerConnectionClassEnum
 
-@dataclass
+@dataclass(slots=True)
 class UwPlayerAiConfigComponent:
     difficulty: float
     aggressive: float
     stretching: float
     expansive: float
 
-@dataclass
+@dataclass(slots=True)
 class UwForceComponent:
     color: list[float]
     score: int
@@ -299,55 +337,55 @@ class UwForceComponent:
     intendedRace: int
     state: UwForceStateFlags
 
-@dataclass
+@dataclass(slots=True)
 class UwForceDetailsComponent:
     killValue: int
     lossValue: int
     startingPosition: int
     race: int
 
-@dataclass
+@dataclass(slots=True)
 class UwForeignPolicyComponent:
     forces: list[int]
     policy: UwForeignPolicyEnum
 
-@dataclass
+@dataclass(slots=True)
 class UwDiplomacyProposalComponent:
     offeror: int
     offeree: int
     proposal: UwForeignPolicyEnum
 
-@dataclass
+@dataclass(slots=True)
 class UwGameConfig:
     ranked: bool
     diplomacy: bool
     lockedSpeed: bool
     cheats: bool
 
-@dataclass
+@dataclass(slots=True)
 class UwShootingsArray:
     data: list[int]
     count: int
 
-@dataclass
+@dataclass(slots=True)
 class UwMapInfo:
     name: str
     guid: str
     path: str
     maxPlayers: int
 
-@dataclass
+@dataclass(slots=True)
 class UwMapStartingPosition:
     position: int
     minForces: int
     maxForces: int
 
-@dataclass
+@dataclass(slots=True)
 class UwMapStartingPositionsArray:
     data: list[UwMapStartingPosition]
     count: int
 
-@dataclass
+@dataclass(slots=True)
 class UwTile:
     position: list[float]
     up: list[float]
@@ -357,24 +395,24 @@ class UwTile:
     terrain: int
     border: bool
 
-@dataclass
+@dataclass(slots=True)
 class UwCluster:
     neighborsIndices: list[int]
     neighborsCount: int
     centerTileIndex: int
 
-@dataclass
+@dataclass(slots=True)
 class UwClustersDistancesQuery:
     taskUserData: int
     startingCluster: int
     unitPrototype: int
     allowImpassableTerrain: bool
 
-@dataclass
+@dataclass(slots=True)
 class UwClustersDistancesResult:
     distances: UwIds
 
-@dataclass
+@dataclass(slots=True)
 class UwMyForceStatistics:
     logisticsUnitsIdle: int
     logisticsUnitsTotal: int
@@ -383,7 +421,7 @@ class UwMyForceStatistics:
     closestDangerPosition: int
     closestDangerDistance: float
 
-@dataclass
+@dataclass(slots=True)
 class UwUnitUpgrades:
     damage: float
     shootingRange: float
@@ -393,12 +431,12 @@ class UwUnitUpgrades:
     movementSpeed: float
     processingSpeed: float
 
-@dataclass
+@dataclass(slots=True)
 class UwOverviewExtract:
     flags: list[UwOverviewFlags]
     count: int
 
-@dataclass
+@dataclass(slots=True)
 class UwUnitPathfindingQuery:
     taskUserData: int
     startingPosition: int
@@ -407,7 +445,7 @@ class UwUnitPathfindingQuery:
     maxIterations: int
     allowNearbyPosition: bool
 
-@dataclass
+@dataclass(slots=True)
 class UwUnitPathfindingResult:
     path: UwIds
     state: UwPathStateEnum
@@ -486,6 +524,9 @@ UwChatCallbackType = Callable[[int, str, UwChatTargetEnum], None]
 UwTaskCompletedCallbackType = Callable[[int, UwTaskTypeEnum], None]
 UwMapStateCallbackType = Callable[[UwMapStateEnum], None]
 
+# unsigned item formats of the memoryviews, by the size of the c type
+_VIEW_FORMATS: Dict[int, Literal["B", "H", "I", "Q"]] = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
 class Interop:
     _instance = None
 
@@ -497,10 +538,65 @@ class Interop:
     def __init__(self):
         self._ffi = None
         self._api = None
+        self._buffers = {}
+        self._arrays = {}
 
     def initialize(self, ffi, api):
         self._ffi = ffi
         self._api = api
+        self._buffers = {}
+        self._arrays = {}
+
+    def _wrapped(self, kind: type) -> bool:
+        # whether a wrapper of the kind stands anywhere in the chain in place of the cffi library object
+        api = self._api
+        while api is not None:
+            if isinstance(api, kind):
+                return True
+            api = api.__dict__.get("_api") if hasattr(api, "__dict__") else None
+        return False
+
+    def _unwrap(self, kind: type) -> None:
+        # removes the wrapper of the kind from the chain, wherever it stands
+        # the wrappers above it drop the functions they resolved through it
+        outer: list = []
+        api = self._api
+        while api is not None and not isinstance(api, kind):
+            outer.append(api)
+            api = api.__dict__.get("_api") if hasattr(api, "__dict__") else None
+        if api is None:
+            return
+        inner = getattr(api, "_api")
+        if outer:
+            outer[-1]._api = inner
+        else:
+            self._api = inner
+        for wrapper in outer:
+            for name in [n for n in wrapper.__dict__ if n.startswith("uw")]:
+                delattr(wrapper, name)
+
+    def _buffer(self, ctype: str):
+        # preallocated output struct, reused by bulk operations
+        b = self._buffers.get(ctype)
+        if b is None:
+            b = self._ffi.new(ctype + " *")
+            self._buffers[ctype] = b
+        return b
+
+    def _array(self, ctype: str, count: int):
+        # preallocated output array of at least count structs, reused by bulk operations, grows by doubling
+        a = self._arrays.get(ctype)
+        if a is None or len(a) < count:
+            a = self._ffi.new(ctype + "[]", max(count, 2 * len(a) if a is not None else 1024))
+            self._arrays[ctype] = a
+        return a
+
+    def _array_ctoview(self, pointer, count: int) -> memoryview:
+        # single copy of the array, the library memory is valid only until the next call
+        size = self._ffi.sizeof(self._ffi.typeof(pointer).item)
+        if count == 0:
+            return memoryview(b"").cast(_VIEW_FORMATS[size])
+        return memoryview(bytearray(self._ffi.buffer(pointer, count * size))).cast(_VIEW_FORMATS[size])
 
     def _str_pytoc(self, s: str) -> bytes:
         return bytes(s, encoding="utf-8")
@@ -628,14 +724,14 @@ class Interop:
     def uwSetConnectionStateCallback(self, callback: UwConnectionStateCallbackType) -> None:
         @self._ffi.callback("UwConnectionStateCallbackType")
         def c_callback(state):
-            state = UwConnectionStateEnum(state)
+            state = _UwConnectionStateEnum_lookup[state]
             callback(state)
         self._uwSetConnectionStateCallback_callback = c_callback
         self._api.uwSetConnectionStateCallback(c_callback)
 
     def uwConnectionState(self) -> UwConnectionStateEnum:
         ret = self._api.uwConnectionState()
-        ret = UwConnectionStateEnum(ret)
+        ret = _UwConnectionStateEnum_lookup[ret]
         return ret
 
     def uwSetConnectStartGui(self, enabled: bool, extraCmdParams: str) -> None:
@@ -774,12 +870,29 @@ class Interop:
         data_ = self._UwIds_ctopy(data)
         return data_
 
+    def uwModifiedEntitiesView(self) -> memoryview:
+        data = self._ffi.new("UwIds *")
+        self._api.uwModifiedEntities(data)
+        data_ = self._UwIds_ctoview(data)
+        return data_
+
     def uwAllEntities(self) -> UwIds:
         data = self._ffi.new("UwIds *")
         self._api.uwAllEntities(data)
         data_ = self._UwIds_ctopy(data)
         return data_
 
+    def uwAllEntitiesView(self) -> memoryview:
+        data = self._ffi.new("UwIds *")
+        self._api.uwAllEntities(data)
+        data_ = self._UwIds_ctoview(data)
+        return data_
+
+    def uwAllEntitiesCount(self) -> int:
+        data = self._buffer("UwIds")
+        self._api.uwAllEntities(data)
+        return int(data.count)
+
     def uwEntityExists(self, id: int) -> bool:
         ret = self._api.uwEntityExists(id)
         ret = bool(ret)
@@ -954,14 +1067,14 @@ class Interop:
     def uwSetGameStateCallback(self, callback: UwGameStateCallbackType) -> None:
         @self._ffi.callback("UwGameStateCallbackType")
         def c_callback(state):
-            state = UwGameStateEnum(state)
+            state = _UwGameStateEnum_lookup[state]
             callback(state)
         self._uwSetGameStateCallback_callback = c_callback
         self._api.uwSetGameStateCallback(c_callback)
 
     def uwGameState(self) -> UwGameStateEnum:
         ret = self._api.uwGameState()
-        ret = UwGameStateEnum(ret)
+        ret = _UwGameStateEnum_lookup[ret]
         return ret
 
     def uwGameTick(self) -> int:
@@ -998,7 +1111,7 @@ class Interop:
         def c_callback(sender, message, target):
             sender = int(sender)
             message = self._str_ctopy(message)
-            target = UwChatTargetEnum(target)
+            target = _UwChatTargetEnum_lookup[target]
             callback(sender, message, target)
         self._uwSetChatCallback_callback = c_callback
         self._api.uwSetChatCallback(c_callback)
@@ -1007,7 +1120,7 @@ class Interop:
         @self._ffi.callback("UwTaskCompletedCallbackType")
         def c_callback(taskUserData, type):
             taskUserData = int(taskUserData)
-            type = UwTaskTypeEnum(type)
+            type = _UwTaskTypeEnum_lookup[type]
             callback(taskUserData, type)
         self._uwSetTaskCompletedCallback_callback = c_callback
         self._api.uwSetTaskCompletedCallback(c_callback)
@@ -1015,14 +1128,14 @@ class Interop:
     def uwSetMapStateCallback(self, callback: UwMapStateCallbackType) -> None:
         @self._ffi.callback("UwMapStateCallbackType")
         def c_callback(state):
-            state = UwMapStateEnum(state)
+            state = _UwMapStateEnum_lookup[state]
             callback(state)
         self._uwSetMapStateCallback_callback = c_callback
         self._api.uwSetMapStateCallback(c_callback)
 
     def uwMapState(self) -> UwMapStateEnum:
         ret = self._api.uwMapState()
-        ret = UwMapStateEnum(ret)
+        ret = _UwMapStateEnum_lookup[ret]
         return ret
 
     def uwMapInfo(self) -> Tuple[bool, UwMapInfo]:
@@ -1066,24 +1179,48 @@ class Interop:
         data_ = self._UwIds_ctopy(data)
         return data_
 
+    def uwAreaRangeView(self, x: float, y: float, z: float, radius: float) -> memoryview:
+        data = self._ffi.new("UwIds *")
+        self._api.uwAreaRange(x, y, z, radius, data)
+        data_ = self._UwIds_ctoview(data)
+        return data_
+
     def uwAreaConnected(self, position: int, radius: float) -> UwIds:
         data = self._ffi.new("UwIds *")
         self._api.uwAreaConnected(position, radius, data)
         data_ = self._UwIds_ctopy(data)
         return data_
 
+    def uwAreaConnectedView(self, position: int, radius: float) -> memoryview:
+        data = self._ffi.new("UwIds *")
+        self._api.uwAreaConnected(position, radius, data)
+        data_ = self._UwIds_ctoview(data)
+        return data_
+
     def uwAreaNeighborhood(self, position: int, radius: float) -> UwIds:
         data = self._ffi.new("UwIds *")
         self._api.uwAreaNeighborhood(position, radius, data)
         data_ = self._UwIds_ctopy(data)
         return data_
 
+    def uwAreaNeighborhoodView(self, position: int, radius: float) -> memoryview:
+        data = self._ffi.new("UwIds *")
+        self._api.uwAreaNeighborhood(position, radius, data)
+        data_ = self._UwIds_ctoview(data)
+        return data_
+
     def uwAreaExtended(self, position: int, radius: float) -> UwIds:
         data = self._ffi.new("UwIds *")
         self._api.uwAreaExtended(position, radius, data)
         data_ = self._UwIds_ctopy(data)
         return data_
 
+    def uwAreaExtendedView(self, position: int, radius: float) -> memoryview:
+        data = self._ffi.new("UwIds *")
+        self._api.uwAreaExtended(position, radius, data)
+        data_ = self._UwIds_ctoview(data)
+        return data_
+
     def uwTestVisible(self, x1: float, y1: float, z1: float, x2: float, y2: float, z2: float) -> bool:
         ret = self._api.uwTestVisible(x1, y1, z1, x2, y2, z2)
         ret = bool(ret)
@@ -1119,6 +1256,12 @@ class Interop:
         data_ = self._UwClustersDistancesResult_ctopy(data)
         return data_
 
+    def uwRetrieveClustersDistancesView(self) -> memoryview:
+        data = self._ffi.new("UwClustersDistancesResult *")
+        self._api.uwRetrieveClustersDistances(data)
+        data_ = self._UwIds_ctoview(data.distances)
+        return data_
+
     def uwAllPrototypes(self) -> UwIds:
         data = self._ffi.new("UwIds *")
         self._api.uwAllPrototypes(data)
@@ -1127,7 +1270,7 @@ class Interop:
 
     def uwPrototypeType(self, prototypeId: int) -> UwPrototypeTypeEnum:
         ret = self._api.uwPrototypeType(prototypeId)
-        ret = UwPrototypeTypeEnum(ret)
+        ret = _UwPrototypeTypeEnum_lookup[ret]
         return ret
 
     def uwPrototypeJson(self, prototypeId: int) -> str:
@@ -1154,7 +1297,7 @@ class Interop:
 
     def uwUnitPathState(self, unitId: int) -> UwPathStateEnum:
         ret = self._api.uwUnitPathState(unitId)
-        ret = UwPathStateEnum(ret)
+        ret = _UwPathStateEnum_lookup[ret]
         return ret
 
     def uwUnitUpgrades(self, unit: int) -> UwUnitUpgrades:
@@ -1184,7 +1327,7 @@ class Interop:
 
     def uwOverviewFlags(self, position: int) -> UwOverviewFlags:
         ret = self._api.uwOverviewFlags(position)
-        ret = UwOverviewFlags(ret)
+        ret = _UwOverviewFlags_lookup[ret]
         return ret
 
     def uwOverviewIds(self, position: int) -> UwIds:
@@ -1193,12 +1336,24 @@ class Interop:
         data_ = self._UwIds_ctopy(data)
         return data_
 
+    def uwOverviewIdsView(self, position: int) -> memoryview:
+        data = self._ffi.new("UwIds *")
+        self._api.uwOverviewIds(position, data)
+        data_ = self._UwIds_ctoview(data)
+        return data_
+
     def uwOverviewExtract(self) -> UwOverviewExtract:
         data = self._ffi.new("UwOverviewExtract *")
         self._api.uwOverviewExtract(data)
         data_ = self._UwOverviewExtract_ctopy(data)
         return data_
 
+    def uwOverviewExtractView(self) -> memoryview:
+        data = self._ffi.new("UwOverviewExtract *")
+        self._api.uwOverviewExtract(data)
+        data_ = self._UwOverviewExtract_ctoview(data)
+        return data_
+
     def uwStartUnitPathfinding(self, query: UwUnitPathfindingQuery) -> None:
         query_ = self._UwUnitPathfindingQuery_pytoc(query)
         self._api.uwStartUnitPathfinding(query_)
@@ -1209,8 +1364,15 @@ class Interop:
         data_ = self._UwUnitPathfindingResult_ctopy(data)
         return data_
 
+    def uwRetrieveUnitPathfindingView(self) -> Tuple[memoryview, UwPathStateEnum]:
+        data = self._ffi.new("UwUnitPathfindingResult *")
+        self._api.uwRetrieveUnitPathfinding(data)
+        path_ = self._UwIds_ctoview(data.path)
+        state_ = _UwPathStateEnum_lookup[data.state]
+        return path_, state_
+
     def _UwLogCallback_ctopy(self, val) -> UwLogCallback:
-        return UwLogCallback(self._str_ctopy(val.message), self._str_ctopy(val.component), UwSeverityEnum(val.severity))
+        return UwLogCallback(self._str_ctopy(val.message), self._str_ctopy(val.component), _UwSeverityEnum_lookup[val.severity])
 
     def _UwMyPlayer_ctopy(self, val) -> UwMyPlayer:
         return UwMyPlayer(int(val.playerEntityId), int(val.forceEntityId), bool(val.primaryController), bool(val.admin))
@@ -1229,7 +1391,7 @@ class Interop:
         return UwPerformanceStatistics(float(val.gameSpeed), float(val.mainThreadUtilization), float(val.ping), int(val.networkUp), int(val.networkDown))
 
     def _UwOrder_ctopy(self, val) -> UwOrder:
-        return UwOrder(int(val.entity), int(val.position), UwOrderTypeEnum(val.order), UwOrderPriorityFlags(val.priority))
+        return UwOrder(int(val.entity), int(val.position), _UwOrderTypeEnum_lookup[val.order], _UwOrderPriorityFlags_lookup[val.priority])
 
     def _UwOrder_pytoc(self, val: UwOrder):
         r = self._ffi.new("UwOrder *")
@@ -1243,7 +1405,10 @@ class Interop:
         return UwOrders(list[UwOrder]([self._UwOrder_ctopy(val.orders[i]) for i in range(val.count)]), int(val.count))
 
     def _UwIds_ctopy(self, val) -> UwIds:
-        return UwIds(list[int]([int(val.ids[i]) for i in range(val.count)]), int(val.count))
+        return UwIds(list[int](self._ffi.unpack(val.ids, val.count) if val.count else []), int(val.count))
+
+    def _UwIds_ctoview(self, val) -> memoryview:
+        return self._array_ctoview(val.ids, val.count)
 
     def _UwProtoComponent_ctopy(self, val) -> UwProtoComponent:
         return UwProtoComponent(int(val.proto))
@@ -1258,7 +1423,7 @@ class Interop:
         return UwPositionComponent(int(val.position), float(val.yaw))
 
     def _UwUnitComponent_ctopy(self, val) -> UwUnitComponent:
-        return UwUnitComponent(UwUnitStateFlags(val.state), int(val.killCount))
+        return UwUnitComponent(_UwUnitStateFlags_lookup[val.state], int(val.killCount))
 
     def _UwLifeComponent_ctopy(self, val) -> UwLifeComponent:
         return UwLifeComponent(int(val.life))
@@ -1282,7 +1447,7 @@ class Interop:
         return UwLogisticsTimestampComponent(int(val.timestamp))
 
     def _UwPriorityComponent_ctopy(self, val) -> UwPriorityComponent:
-        return UwPriorityComponent(UwPriorityEnum(val.priority))
+        return UwPriorityComponent(_UwPriorityEnum_lookup[val.priority])
 
     def _UwAmountComponent_ctopy(self, val) -> UwAmountComponent:
         return UwAmountComponent(int(val.amount))
@@ -1291,10 +1456,10 @@ class Interop:
         return UwAttachmentComponent(int(val.target))
 
     def _UwPingComponent_ctopy(self, val) -> UwPingComponent:
-        return UwPingComponent(UwPingEnum(val.ping))
+        return UwPingComponent(_UwPingEnum_lookup[val.ping])
 
     def _UwPlayerComponent_ctopy(self, val) -> UwPlayerComponent:
-        return UwPlayerComponent(self._str_ctopy(val.name), int(val.nameLength), int(val.steamUserId), int(val.force), float(val.progress), int(val.ping), UwPlayerStateFlags(val.state), UwPlayerConnectionClassEnum(val.playerConnectionClass))
+        return UwPlayerComponent(self._str_ctopy(val.name), int(val.nameLength), int(val.steamUserId), int(val.force), float(val.progress), int(val.ping), _UwPlayerStateFlags_lookup[val.state], _UwPlayerConnectionClassEnum_lookup[val.playerConnectionClass])
 
     def _UwPlayerAiConfigComponent_ctopy(self, val) -> UwPlayerAiConfigComponent:
         return UwPlayerAiConfigComponent(float(val.difficulty), float(val.aggressive), float(val.stretching), float(val.expansive))
@@ -1308,16 +1473,16 @@ class Interop:
         return r
 
     def _UwForceComponent_ctopy(self, val) -> UwForceComponent:
-        return UwForceComponent(list[float]([float(val.color[i]) for i in range(3)]), int(val.score), int(val.killCount), int(val.lossCount), int(val.finishTimestamp), int(val.intendedTeam), int(val.intendedRace), UwForceStateFlags(val.state))
+        return UwForceComponent(list[float]([float(val.color[i]) for i in range(3)]), int(val.score), int(val.killCount), int(val.lossCount), int(val.finishTimestamp), int(val.intendedTeam), int(val.intendedRace), _UwForceStateFlags_lookup[val.state])
 
     def _UwForceDetailsComponent_ctopy(self, val) -> UwForceDetailsComponent:
         return UwForceDetailsComponent(int(val.killValue), int(val.lossValue), int(val.startingPosition), int(val.race))
 
     def _UwForeignPolicyComponent_ctopy(self, val) -> UwForeignPolicyComponent:
-        return UwForeignPolicyComponent(list[int]([int(val.forces[i]) for i in range(2)]), UwForeignPolicyEnum(val.policy))
+        return UwForeignPolicyComponent(list[int]([int(val.forces[i]) for i in range(2)]), _UwForeignPolicyEnum_lookup[val.policy])
 
     def _UwDiplomacyProposalComponent_ctopy(self, val) -> UwDiplomacyProposalComponent:
-        return UwDiplomacyProposalComponent(int(val.offeror), int(val.offeree), UwForeignPolicyEnum(val.proposal))
+        return UwDiplomacyProposalComponent(int(val.offeror), int(val.offeree), _UwForeignPolicyEnum_lookup[val.proposal])
 
     def _UwGameConfig_ctopy(self, val) -> UwGameConfig:
         return UwGameConfig(bool(val.ranked), bool(val.diplomacy), bool(val.lockedSpeed), bool(val.cheats))
@@ -1369,7 +1534,10 @@ class Interop:
         return UwUnitUpgrades(float(val.damage), float(val.shootingRange), float(val.splashRadius), float(val.defense), float(val.regenSpeed), float(val.movementSpeed), float(val.processingSpeed))
 
     def _UwOverviewExtract_ctopy(self, val) -> UwOverviewExtract:
-        return UwOverviewExtract(list[UwOverviewFlags]([UwOverviewFlags(val.flags[i]) for i in range(val.count)]), int(val.count))
+        return UwOverviewExtract(list[UwOverviewFlags]([_UwOverviewFlags_lookup[val.flags[i]] for i in range(val.count)]), int(val.count))
+
+    def _UwOverviewExtract_ctoview(self, val) -> memoryview:
+        return self._array_ctoview(val.flags, val.count)
 
     def _UwUnitPathfindingQuery_ctopy(self, val) -> UwUnitPathfindingQuery:
         return UwUnitPathfindingQuery(int(val.taskUserData), int(val.startingPosition), int(val.goalPosition), int(val.unitPrototype), int(val.maxIterations), bool(val.allowNearbyPosition))
@@ -1385,7 +1553,7 @@ class Interop:
         return r
 
     def _UwUnitPathfindingResult_ctopy(self, val) -> UwUnitPathfindingResult:
-        return UwUnitPathfindingResult(self._UwIds_ctopy(val.path), UwPathStateEnum(val.state))
+        return UwUnitPathfindingResult(self._UwIds_ctopy(val.path), _UwPathStateEnum_lookup[val.state])
 
 
 
@@ -1,21 +1,35 @@
+import importlib
 import os
 import sys
+from typing import Any, Optional, Tuple
 from cffi import FFI
 from .interop import *
 from .events import uw_events
+from .instrumentation import uw_instrumentation
+from .dispatcher import uw_dispatcher
+from .cache import uw_geometry_cache
+from .replay import Recorder, Replay
 
 
 class UwapiLibrary:
     _instance = None
 
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, backend: Optional[Any] = None, record: Optional[str] = None):
+        # backend replaces the uw library, eg. Replay, it must provide bind(ffi) returning the api object
+        # record is a path to write recording of all library calls and callbacks into, see replay.py
+        record = record or os.environ.get("UNNATURAL_RECORD") or None
+        if backend is None and os.environ.get("UNNATURAL_REPLAY", "") != "":
+            backend = Replay(os.environ["UNNATURAL_REPLAY"])
         self._ffi = None
-        self._api = None
+        self._api: Any = None
+        self._backend = backend
+        self._record = record
+        self._recorder: Optional[Recorder] = None
 
     def __enter__(self):
         self.initialize()
@@ -25,25 +39,29 @@ class UwapiLibrary:
         self.dispose()
 
     def initialize(self) -> None:
-        api_def = open(
-            os.path.join(os.path.split(os.path.abspath(__file__))[0], "bots.h"), "r"
-        ).read()
-
-        steam_path = os.path.expanduser(self.library_path())
-        print("looking for uw library in: " + steam_path, flush=True)
-        os.chdir(steam_path)
-
-        self._ffi = FFI()
-        self._ffi.cdef(api_def)
-        self._api = self._ffi.dlopen(os.path.join(steam_path, self.library_name()))
+        if self._backend is None:
+            self._ffi, self._api = self._load_library()
+        else:
+            self._ffi = self._load_abi_cached() or self._parse_header()
+            self._api = self._backend.bind(self._ffi)
+        if self._record is not None:
+            self._recorder = Recorder(self._ffi, self._api, self._record)
+            self._api = self._recorder
 
         uw_interop.initialize(self._ffi, self._api)
+        uw_instrumentation._attach()
+        uw_dispatcher._attach()
         uw_interop.uwInitialize(self._api.UW_VERSION)  # type: ignore
         uw_interop.uwInitializeConsoleLogger()
         uw_events.initialize()
 
     def dispose(self) -> None:
+        uw_geometry_cache._save()  # the process may be terminated below, without unloading the map
         uw_interop.uwDeinitialize()
+        if self._recorder is not None:
+            self._recorder.close()
+        if self._backend is not None:
+            return
 
         # attempting graceful closing causes the process to hung somewhere in steam shutdown code
         # we will instead terminate the process, skipping most of python's clean-up code
@@ -55,6 +73,50 @@ class UwapiLibrary:
         # self._api = None
         # uw_interop.initialize(self._ffi, self._api)
 
+    def _load_library(self) -> Tuple[Any, Any]:
+        steam_path = os.path.expanduser(self.library_path())
+        print("looking for uw library in: " + steam_path, flush=True)
+        os.chdir(steam_path)
+
+        loaded = None
+        if os.environ.get("UNNATURAL_COMPILED", "1") != "0":
+            loaded = self._load_compiled()
+        if loaded is None:
+            loaded = self._load_abi(steam_path)
+        return loaded
+
+    def _load_compiled(self) -> Optional[Tuple[Any, Any]]:
+        # prebuilt api mode module, see compile_uwapi.py
+        try:
+            module = importlib.import_module(self.compiled_module())
+        except ImportError:
+            return None
+        print("using compiled uw library module", flush=True)
+        return module.ffi, module.lib
+
+    def _load_abi(self, steam_path: str, cached: bool = True) -> Tuple[Any, Any]:
+        ffi = self._load_abi_cached() if cached else None
+        if ffi is None:
+            ffi = self._parse_header()
+        return ffi, ffi.dlopen(os.path.join(steam_path, self.library_name()))
+
+    def _parse_header(self) -> Any:
+        api_def = open(
+            os.path.join(os.path.split(os.path.abspath(__file__))[0], "bots.h"),
+            "r",
+        ).read()
+        ffi = FFI()
+        ffi.cdef(api_def)
+        return ffi
+
+    def _load_abi_cached(self) -> Optional[Any]:
+        # prebuilt out-of-line abi mode module (parsed bots.h), see compile_uwapi.py
+        try:
+            from ._uwapi_abi import ffi  # type: ignore
+        except ImportError:
+            return None
+        return ffi
+
     def library_path(self) -> str:
         steam_path = os.environ.get("UNNATURAL_ROOT", "")
         if steam_path != "":
@@ -63,9 +125,12 @@ class UwapiLibrary:
             return "C:/Program Files (x86)/Steam/steamapps/common/Unnatural Worlds/bin"
         return "~/.steam/steam/steamapps/common/Unnatural Worlds/bin"
 
-    def library_name(self) -> str:
+    def library_name(self, hard: bool = __debug__) -> str:
         return "{}unnatural-uwapi{}.{}".format(
             "" if sys.platform == "win32" else "lib",
-            "-hard" if __debug__ else "",
+            "-hard" if hard else "",
             "dll" if sys.platform == "win32" else "so",
         )
+
+    def compiled_module(self, hard: bool = __debug__) -> str:
+        return "uwapi._uwapi_hard" if hard else "uwapi._uwapi"
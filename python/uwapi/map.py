@@ -1,16 +1,79 @@
 import math
 from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+import numpy as np
 from .interop import *
 from .events import uw_events
+from .cache import uw_geometry_cache
 
 
-@dataclass
+@dataclass(slots=True)
 class Vector3:
     x: float = 0
     y: float = 0
     z: float = 0
 
 
+class _Vectors(Sequence[Vector3]):
+    # rows of an (n, 3) array, as Vector3 made on access
+    def __init__(self, array: np.ndarray):
+        self._array = array
+
+    def __len__(self) -> int:
+        return len(self._array)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        x, y, z = self._array[index].tolist()
+        return Vector3(x, y, z)
+
+
+class _Adjacency(Sequence[List[int]]):
+    # lists of neighbors, stored as offsets into one array of indices (compressed sparse rows)
+    def __init__(self, offsets: np.ndarray, indices: np.ndarray):
+        self._offsets = offsets
+        self._indices = indices
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self._indices[self._offsets[index] : self._offsets[index + 1]].tolist()
+
+
+def _empty(dtype: type, *shape: int) -> np.ndarray:
+    a: np.ndarray = np.zeros(shape, dtype=dtype)
+    a.flags.writeable = False
+    return a
+
+
+def _records(ctype: str, fields: Sequence[tuple[str, type, int]], data: bytearray) -> np.ndarray:
+    # array of c structs, with the fields that hold values (not pointers)
+    ffi = uw_interop._ffi
+    dtype = np.dtype(
+        {
+            "names": [name for name, _, _ in fields],
+            "formats": [(t, (n,)) if n > 1 else t for _, t, n in fields],
+            "offsets": [ffi.offsetof(ctype, name) for name, _, _ in fields],
+            "itemsize": ffi.sizeof(ctype),
+        }
+    )
+    return np.frombuffer(data, dtype=dtype)
+
+
+def _csr(counts: np.ndarray, chunks: List[bytes]) -> tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(counts) + 1, dtype=np.uint32)
+    np.cumsum(counts, out=offsets[1:])
+    indices = np.frombuffer(b"".join(chunks), dtype=np.uint32)
+    offsets.flags.writeable = False
+    return offsets, indices
+
+
 class Map:
     _instance = None
     _name: str = ""
@@ -18,18 +81,26 @@ class Map:
     _path: str = ""
     _max_players: int = 0
     _starting_positions: List[UwMapStartingPosition] = []
-    _positions: List[Vector3] = []
-    _ups: List[Vector3] = []
-    _neighbors: List[List[int]] = []
-    _terrains: List[int] = []
-    _map_tile_to_cluster: List[int] = []
-    _map_cluster_to_tile: List[int] = []
-    _clusters_neighbors: List[List[int]] = []
+    # tiles
+    _positions: np.ndarray = _empty(np.float32, 0, 3)
+    _positions_flat: memoryview = _positions.reshape(-1).data  # fast access to single coordinates
+    _ups: np.ndarray = _empty(np.float32, 0, 3)
+    _neighbors_offsets: np.ndarray = _empty(np.uint32, 1)
+    _neighbors: np.ndarray = _empty(np.uint32, 0)
+    _terrains: np.ndarray = _empty(np.uint8, 0)
+    _map_tile_to_cluster: np.ndarray = _empty(np.uint32, 0)
+    # clusters
+    _map_cluster_to_tile: np.ndarray = _empty(np.uint32, 0)
+    _clusters_neighbors_offsets: np.ndarray = _empty(np.uint32, 1)
+    _clusters_neighbors: np.ndarray = _empty(np.uint32, 0)
+    _clusters_radii: List[float] = []
+    _clusters_spheres: Optional[tuple[memoryview, memoryview]] = None  # centers (flat) and radii, fast access to single values
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             uw_events.on_map_state(cls._instance._map_state)
+            uw_events.on_game_state(cls._instance._game_state)
         return cls._instance
 
     def name(self) -> str:
@@ -47,44 +118,76 @@ class Map:
     def starting_positions(self) -> List[UwMapStartingPosition]:
         return self._starting_positions
 
-    def positions(self) -> List[Vector3]:
+    # the arrays are read-only, the sequences of Vector3 and of neighbors lists are views over them
+
+    def tiles_count(self) -> int:
+        return len(self._positions)
+
+    def positions(self) -> Sequence[Vector3]:
+        return _Vectors(self._positions)
+
+    def positions_array(self) -> np.ndarray:
+        # one row of x, y, z per tile
         return self._positions
 
     def position(self, position: int) -> Vector3:
-        return self._positions[position]
+        x, y, z = self._positions[position].tolist()
+        return Vector3(x, y, z)
+
+    def ups(self) -> Sequence[Vector3]:
+        return _Vectors(self._ups)
 
-    def ups(self) -> List[Vector3]:
+    def ups_array(self) -> np.ndarray:
         return self._ups
 
     def up(self, position: int) -> Vector3:
-        return self._ups[position]
+        x, y, z = self._ups[position].tolist()
+        return Vector3(x, y, z)
 
-    def neighbors_all(self) -> List[List[int]]:
-        return self._neighbors
+    def neighbors_all(self) -> Sequence[List[int]]:
+        return _Adjacency(self._neighbors_offsets, self._neighbors)
+
+    def neighbors_csr(self) -> tuple[np.ndarray, np.ndarray]:
+        # neighbors of tile i are indices[offsets[i]:offsets[i + 1]]
+        return self._neighbors_offsets, self._neighbors
 
     def neighbors(self, position: int) -> List[int]:
-        return self._neighbors[position]
+        return self._neighbors[self._neighbors_offsets[position] : self._neighbors_offsets[position + 1]].tolist()
 
-    def terrains(self) -> List[int]:
+    def terrains(self) -> np.ndarray:
         return self._terrains
 
     def terrain(self, position: int) -> int:
-        return self._terrains[position]
+        return int(self._terrains[position])
+
+    # queries that depend on the map geometry only go through uw_geometry_cache
 
     def area_range(self, point: Vector3, radius: float) -> List[int]:
-        return uw_interop.uwAreaRange(point.x, point.y, point.z, radius).ids
+        return uw_geometry_cache.ids("area_range", uw_interop.uwAreaRangeView, point.x, point.y, point.z, radius).tolist()
 
     def area_connected(self, position: int, radius: float) -> List[int]:
-        return uw_interop.uwAreaConnected(position, radius).ids
+        return uw_geometry_cache.ids("area_connected", uw_interop.uwAreaConnectedView, position, radius).tolist()
 
     def area_neighborhood(self, position: int, radius: float) -> List[int]:
-        return uw_interop.uwAreaNeighborhood(position, radius).ids
+        return uw_geometry_cache.ids("area_neighborhood", uw_interop.uwAreaNeighborhoodView, position, radius).tolist()
 
     def area_extended(self, position: int, radius: float) -> List[int]:
-        return uw_interop.uwAreaExtended(position, radius).ids
+        return uw_geometry_cache.ids("area_extended", uw_interop.uwAreaExtendedView, position, radius).tolist()
+
+    def area_range_view(self, point: Vector3, radius: float) -> memoryview:
+        return memoryview(uw_geometry_cache.ids("area_range", uw_interop.uwAreaRangeView, point.x, point.y, point.z, radius)).toreadonly()
+
+    def area_connected_view(self, position: int, radius: float) -> memoryview:
+        return memoryview(uw_geometry_cache.ids("area_connected", uw_interop.uwAreaConnectedView, position, radius)).toreadonly()
+
+    def area_neighborhood_view(self, position: int, radius: float) -> memoryview:
+        return memoryview(uw_geometry_cache.ids("area_neighborhood", uw_interop.uwAreaNeighborhoodView, position, radius)).toreadonly()
+
+    def area_extended_view(self, position: int, radius: float) -> memoryview:
+        return memoryview(uw_geometry_cache.ids("area_extended", uw_interop.uwAreaExtendedView, position, radius)).toreadonly()
 
     def test_visible(self, a: Vector3, b: Vector3) -> bool:
-        return uw_interop.uwTestVisible(a.x, a.y, a.z, b.x, b.y, b.z)
+        return uw_geometry_cache.cached("test_visible", uw_interop.uwTestVisible, a.x, a.y, a.z, b.x, b.y, b.z)
 
     def test_shooting(
         self,
@@ -103,36 +206,55 @@ class Map:
         )
 
     def distance_line(self, a: int, b: int) -> float:
-        a3 = self._positions[a]
-        b3 = self._positions[b]
-        dx = a3.x - b3.x
-        dy = a3.y - b3.y
-        dz = a3.z - b3.z
+        p = self._positions_flat
+        a *= 3
+        b *= 3
+        dx = p[a] - p[b]
+        dy = p[a + 1] - p[b + 1]
+        dz = p[a + 2] - p[b + 2]
         return math.sqrt(dx * dx + dy * dy + dz * dz)
 
     def distance_estimate(self, position_a: int, position_b: int) -> float:
-        return uw_interop.uwDistanceEstimate(position_a, position_b)
+        return uw_geometry_cache.cached("distance_estimate", uw_interop.uwDistanceEstimate, position_a, position_b)
 
     def yaw(self, start_position: int, goal_position: int) -> float:
-        return uw_interop.uwYaw(start_position, goal_position)
+        return uw_geometry_cache.cached("yaw", uw_interop.uwYaw, start_position, goal_position)
+
+    def clusters_count(self) -> int:
+        return len(self._map_cluster_to_tile)
 
-    def tile_to_cluster_map(self) -> List[int]:
+    def tile_to_cluster_map(self) -> np.ndarray:
         return self._map_tile_to_cluster
 
-    def cluster_to_tile_map(self) -> List[int]:
+    def cluster_to_tile_map(self) -> np.ndarray:
         return self._map_cluster_to_tile
 
     def tile_to_cluster(self, tile: int) -> int:
-        return self._map_tile_to_cluster[tile]
+        return int(self._map_tile_to_cluster[tile])
 
     def cluster_to_tile(self, cluster: int) -> int:
-        return self._map_cluster_to_tile[cluster]
+        return int(self._map_cluster_to_tile[cluster])
+
+    def clusters_neighbors_all(self) -> Sequence[List[int]]:
+        return _Adjacency(self._clusters_neighbors_offsets, self._clusters_neighbors)
 
-    def clusters_neighbors_all(self) -> List[List[int]]:
-        return self._clusters_neighbors
+    def clusters_neighbors_csr(self) -> tuple[np.ndarray, np.ndarray]:
+        return self._clusters_neighbors_offsets, self._clusters_neighbors
 
     def clusters_neighbors(self, cluster: int) -> List[int]:
-        return self._clusters_neighbors[cluster]
+        offsets = self._clusters_neighbors_offsets
+        return self._clusters_neighbors[offsets[cluster] : offsets[cluster + 1]].tolist()
+
+    def clusters_radii(self) -> List[float]:
+        # largest straight line distance of a tile from the center tile of its cluster
+        if not self._clusters_radii and len(self._map_cluster_to_tile):
+            positions = self._positions.astype(np.float64)
+            clusters = self._map_tile_to_cluster.astype(np.intp)
+            centers = positions[self._map_cluster_to_tile.astype(np.intp)[clusters]]
+            radii = np.zeros(len(self._map_cluster_to_tile))
+            np.maximum.at(radii, clusters, np.linalg.norm(positions - centers, axis=1))
+            self._clusters_radii = radii.tolist()
+        return self._clusters_radii
 
     def clusters_distances(
         self,
@@ -144,6 +266,31 @@ class Map:
         def fin():
             callback(uw_interop.uwRetrieveClustersDistances())
 
+        self._start_clusters_distances(
+            fin, starting_cluster, unit_prototype, allow_impassable_terrain
+        )
+
+    def clusters_distances_view(
+        self,
+        callback: Callable,
+        starting_cluster: int,
+        unit_prototype: int,
+        allow_impassable_terrain: bool = False,
+    ) -> None:
+        def fin():
+            callback(uw_interop.uwRetrieveClustersDistancesView())
+
+        self._start_clusters_distances(
+            fin, starting_cluster, unit_prototype, allow_impassable_terrain
+        )
+
+    def _start_clusters_distances(
+        self,
+        fin: Callable,
+        starting_cluster: int,
+        unit_prototype: int,
+        allow_impassable_terrain: bool,
+    ) -> None:
         q = UwClustersDistancesQuery(
             uw_events._insert_task(fin),
             starting_cluster,
@@ -158,13 +305,31 @@ class Map:
         self._path: str = ""
         self._max_players: int = 0
         self._starting_positions: List[UwMapStartingPosition] = []
-        self._positions: List[Vector3] = []
-        self._ups: List[Vector3] = []
-        self._neighbors: List[List[int]] = []
-        self._terrains: List[int] = []
-        self._map_tile_to_cluster: List[int] = []
-        self._map_cluster_to_tile: List[int] = []
-        self._clusters_neighbors: List[List[int]] = []
+        self._set_tiles(_empty(np.float32, 0, 3), _empty(np.float32, 0, 3), _empty(np.uint8, 0), _empty(np.uint32, 0))
+        self._neighbors_offsets = _empty(np.uint32, 1)
+        self._neighbors = _empty(np.uint32, 0)
+        self._map_cluster_to_tile = _empty(np.uint32, 0)
+        self._clusters_neighbors_offsets = _empty(np.uint32, 1)
+        self._clusters_neighbors = _empty(np.uint32, 0)
+        self._clusters_radii: List[float] = []
+        self._clusters_spheres = None
+
+    def _clusters_spheres_flat(self) -> tuple[memoryview, memoryview]:
+        # positions of the center tiles of the clusters (x, y, z of each cluster in turn) and the radii of the clusters
+        if self._clusters_spheres is None:
+            centers = self._positions[self._map_cluster_to_tile.astype(np.intp)].astype(np.float64)
+            radii = np.array(self.clusters_radii(), dtype=np.float64)
+            self._clusters_spheres = (centers.reshape(-1).data, radii.data)
+        return self._clusters_spheres
+
+    def _set_tiles(self, positions: np.ndarray, ups: np.ndarray, terrains: np.ndarray, clusters: np.ndarray) -> None:
+        for a in (positions, ups, terrains, clusters):
+            a.flags.writeable = False
+        self._positions = positions
+        self._positions_flat = positions.reshape(-1).data
+        self._ups = ups
+        self._terrains = terrains
+        self._map_tile_to_cluster = clusters
 
     def _load_info(self) -> None:
         info = uw_interop.uwMapInfo()
@@ -175,23 +340,57 @@ class Map:
             self._max_players = info[1].maxPlayers
 
     def _load_tiles(self) -> None:
+        # raw structs copied into one buffer, and read as arrays, without python objects per tile
         count = uw_interop.uwTilesCount()
+        ffi = uw_interop._ffi
+        fetch = uw_interop._api.uwTile
+        tile = ffi.new("UwTile *")
+        raw = ffi.buffer(tile)
+        size = len(raw)
+        data = bytearray(size * count)
+        neighbors = []
         for i in range(count):
-            tile = uw_interop.uwTile(i)
-            self._positions.append(
-                Vector3(tile.position[0], tile.position[1], tile.position[2])
-            )
-            self._ups.append(Vector3(tile.up[0], tile.up[1], tile.up[2]))
-            self._neighbors.append(tile.neighborsIndices)
-            self._terrains.append(tile.terrain)
-            self._map_tile_to_cluster.append(tile.clusterIndex)
+            fetch(i, tile)
+            data[i * size : (i + 1) * size] = raw
+            n = tile.neighborsCount
+            neighbors.append(ffi.buffer(tile.neighborsIndices, n * 4)[:] if n else b"")
+        records = _records(
+            "UwTile",
+            [
+                ("position", np.float32, 3),
+                ("up", np.float32, 3),
+                ("neighborsCount", np.uint32, 1),
+                ("clusterIndex", np.uint32, 1),
+                ("terrain", np.uint8, 1),
+            ],
+            data,
+        )
+        self._set_tiles(
+            np.ascontiguousarray(records["position"]),
+            np.ascontiguousarray(records["up"]),
+            np.ascontiguousarray(records["terrain"]),
+            np.ascontiguousarray(records["clusterIndex"]),
+        )
+        self._neighbors_offsets, self._neighbors = _csr(records["neighborsCount"], neighbors)
 
     def _load_clusters(self) -> None:
         count = uw_interop.uwClustersCount()
+        ffi = uw_interop._ffi
+        fetch = uw_interop._api.uwCluster
+        cluster = ffi.new("UwCluster *")
+        raw = ffi.buffer(cluster)
+        size = len(raw)
+        data = bytearray(size * count)
+        neighbors = []
         for i in range(count):
-            cluster = uw_interop.uwCluster(i)
-            self._clusters_neighbors.append(cluster.neighborsIndices)
-            self._map_cluster_to_tile.append(cluster.centerTileIndex)
+            fetch(i, cluster)
+            data[i * size : (i + 1) * size] = raw
+            n = cluster.neighborsCount
+            neighbors.append(ffi.buffer(cluster.neighborsIndices, n * 4)[:] if n else b"")
+        records = _records("UwCluster", [("neighborsCount", np.uint32, 1), ("centerTileIndex", np.uint32, 1)], data)
+        self._map_cluster_to_tile = np.ascontiguousarray(records["centerTileIndex"])
+        self._map_cluster_to_tile.flags.writeable = False
+        self._clusters_neighbors_offsets, self._clusters_neighbors = _csr(records["neighborsCount"], neighbors)
 
     def _load(self) -> None:
         uw_interop.uwLog(UwSeverityEnum.Info, "loading map")
@@ -205,6 +404,13 @@ class Map:
     def _map_state(self, state: UwMapStateEnum) -> None:
         if state == UwMapStateEnum.Loaded:
             self._load()
+            uw_geometry_cache._map_loaded(self._guid, uw_interop._api.UW_VERSION)
+        else:
+            uw_geometry_cache._map_unloaded()
+
+    def _game_state(self, state: UwGameStateEnum) -> None:
+        if state == UwGameStateEnum.Finish:
+            uw_geometry_cache._save()
 
 
 uw_map = Map()
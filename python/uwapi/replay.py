@@ -0,0 +1,511 @@
+import gzip
+import struct
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+# Recording of the traffic between python and the uw library, and its replay without the library.
+#
+# The file is gzipped, a magic line followed by length prefixed batches of events, encoded as data only (see _pack),
+# so that replaying a recording from elsewhere cannot run any code:
+#   ("H", header)                       - first event, library constants
+#   ("C", name, result, outs)           - a completed call, with contents of its struct pointer arguments
+#   ("S", name)                         - start of a call that invokes callbacks, completed by its ("C", name, ...)
+#   ("B", setter, args) ... ("E",)      - a callback, with all calls made from within it
+#
+# Replay serves calls in the recorded order, by name, within each callback.
+# Calls that do not match the recording (eg. after changes in the bot logic) repeat the last recorded result of the same function.
+
+_BATCH = 4096
+_MAGIC = b"uwapi recording 1\n"
+_LENGTH = struct.Struct("<I")
+_NAME = struct.Struct("<H")
+_OUT = struct.Struct("<BI")
+_INT = struct.Struct("<q")
+_UINT = struct.Struct("<Q")
+_FLOAT = struct.Struct("<d")
+_NONE = 0xFFFFFFFF
+_CONSTANTS = {b"N": None, b"T": True, b"F": False}
+
+
+def _pack(value: Any, out: bytearray) -> None:
+    # one byte tag, followed by the value, little endian, sequences and dicts by count of their items
+    if value is None:
+        out += b"N"
+    elif value is True:
+        out += b"T"
+    elif value is False:
+        out += b"F"
+    elif isinstance(value, int):
+        if value < 0:
+            out += b"q"
+            out += _INT.pack(value)
+        else:
+            out += b"Q"
+            out += _UINT.pack(value)
+    elif isinstance(value, float):
+        out += b"d"
+        out += _FLOAT.pack(value)
+    elif isinstance(value, (bytes, str)):
+        data = value.encode() if isinstance(value, str) else value
+        out += b"s" if isinstance(value, str) else b"b"
+        out += _LENGTH.pack(len(data))
+        out += data
+    elif isinstance(value, (tuple, list)):
+        out += b"t" if isinstance(value, tuple) else b"l"
+        out += _LENGTH.pack(len(value))
+        for v in value:
+            _pack(v, out)
+    elif isinstance(value, dict):
+        out += b"m"
+        out += _LENGTH.pack(len(value))
+        for k, v in value.items():
+            _pack(k, out)
+            _pack(v, out)
+    else:
+        raise Exception(f"cannot record value of type {type(value).__name__}")
+
+
+def _unpack(data: bytes, offset: int) -> Tuple[Any, int]:
+    # the value at the offset, and the offset past it
+    tag = data[offset : offset + 1]
+    offset += 1
+    if tag in _CONSTANTS:
+        return _CONSTANTS[tag], offset
+    if tag == b"q":
+        return _INT.unpack_from(data, offset)[0], offset + 8
+    if tag == b"Q":
+        return _UINT.unpack_from(data, offset)[0], offset + 8
+    if tag == b"d":
+        return _FLOAT.unpack_from(data, offset)[0], offset + 8
+    if tag in (b"b", b"s"):
+        length = _LENGTH.unpack_from(data, offset)[0]
+        offset += 4
+        raw = data[offset : offset + length]
+        return (raw.decode() if tag == b"s" else raw), offset + length
+    if tag in (b"t", b"l", b"m"):
+        count = _LENGTH.unpack_from(data, offset)[0]
+        offset += 4
+        items = []
+        for _ in range(count * 2 if tag == b"m" else count):
+            item, offset = _unpack(data, offset)
+            items.append(item)
+        if tag == b"m":
+            return dict(zip(items[::2], items[1::2])), offset
+        return (tuple(items) if tag == b"t" else items), offset
+    raise Exception(f"corrupted recording, unknown tag {tag!r}")
+
+
+def _pack_event(event: Tuple, out: bytearray, names: Dict[str, int]) -> None:
+    # calls, which are nearly all of the events, have a fixed layout, with the function names numbered in order of their first use
+    if event[0] != "C":
+        out += b"V"
+        _pack(event, out)
+        return
+    _, name, result, outs = event
+    out += b"C"
+    index = names.get(name)
+    if index is None:
+        index = names[name] = len(names)
+        data = name.encode()
+        out += _NAME.pack(index)
+        out += _NAME.pack(len(data))
+        out += data
+    else:
+        out += _NAME.pack(index)
+    _pack(result, out)
+    out.append(len(outs))
+    for i, raw, extras in outs:
+        out += _OUT.pack(i, len(raw))
+        out += raw
+        out += _NAME.pack(len(extras))
+        for data in extras:
+            if data is None:
+                out += _LENGTH.pack(_NONE)
+            else:
+                out += _LENGTH.pack(len(data))
+                out += data
+
+
+def _unpack_event(data: bytes, offset: int, names: List[str]) -> Tuple[Tuple, int]:
+    if data[offset : offset + 1] != b"C":
+        return _unpack(data, offset + 1)
+    index = _NAME.unpack_from(data, offset + 1)[0]
+    offset += 3
+    if index == len(names):
+        length = _NAME.unpack_from(data, offset)[0]
+        offset += 2
+        names.append(data[offset : offset + length].decode())
+        offset += length
+    tag = data[offset : offset + 1]
+    if tag in _CONSTANTS:
+        result = _CONSTANTS[tag]
+        offset += 1
+    else:
+        result, offset = _unpack(data, offset)
+    outs = []
+    count = data[offset]
+    offset += 1
+    for _ in range(count):
+        i, length = _OUT.unpack_from(data, offset)
+        offset += 5
+        raw = data[offset : offset + length]
+        offset += length
+        extras: List[Optional[bytes]] = []
+        count = _NAME.unpack_from(data, offset)[0]
+        offset += 2
+        for _ in range(count):
+            length = _LENGTH.unpack_from(data, offset)[0]
+            offset += 4
+            if length == _NONE:
+                extras.append(None)
+            else:
+                extras.append(data[offset : offset + length])
+                offset += length
+        outs.append((i, raw, extras))
+    return ("C", names[index], result, tuple(outs)), offset
+
+
+class _Codec:
+    def __init__(self, ffi):
+        self._ffi = ffi
+        self._structs: Dict[Any, Optional[List[Tuple[Tuple[str, ...], str, Optional[str], Any]]]] = {}
+
+    def _pointer_fields(self, ctype, prefix: Tuple[str, ...] = ()) -> List[Tuple[Tuple[str, ...], str, Optional[str], Any]]:
+        # pointers inside structs are followed by their count, except for strings
+        result = []
+        fields = ctype.fields
+        for i, (name, f) in enumerate(fields):
+            if f.type.kind == "struct":
+                result += self._pointer_fields(f.type, prefix + (name,))
+            elif f.type.kind == "pointer":
+                count = None if f.type.item.cname == "char" else fields[i + 1][0]
+                result.append((prefix, name, count, f.type))
+        return result
+
+    def struct(self, value) -> Optional[List[Tuple[Tuple[str, ...], str, Optional[str], Any]]]:
+        # pointer fields of the pointed-to struct, or None if value is not a pointer to a complete struct
+        if not isinstance(value, self._ffi.CData):
+            return None
+        ctype = self._ffi.typeof(value)
+        try:
+            return self._structs[ctype]
+        except KeyError:
+            pass
+        fields = None
+        if ctype.kind == "pointer" and ctype.item.kind == "struct" and ctype.item.fields is not None:
+            fields = self._pointer_fields(ctype.item)
+        self._structs[ctype] = fields
+        return fields
+
+    def save_struct(self, p, fields) -> Tuple[str, bytes, List[Optional[bytes]]]:
+        ffi = self._ffi
+        extras: List[Optional[bytes]] = []
+        for prefix, name, count, ftype in fields:
+            s = p
+            for k in prefix:
+                s = getattr(s, k)
+            ptr = getattr(s, name)
+            if ptr == ffi.NULL:
+                extras.append(None)
+            elif count is None:
+                extras.append(ffi.string(ptr))
+            else:
+                extras.append(bytes(ffi.buffer(ptr, getattr(s, count) * ffi.sizeof(ftype.item))))
+        return ffi.typeof(p).item.cname, bytes(ffi.buffer(p)), extras
+
+    def load_struct(self, p, raw: bytes, extras: List[Optional[bytes]], keep: List[Any]) -> None:
+        ffi = self._ffi
+        ffi.memmove(p, raw, len(raw))
+        if not extras:
+            return
+        fields = self.struct(p)
+        assert fields is not None
+        for (prefix, name, count, ftype), data in zip(fields, extras):
+            s = p
+            for k in prefix:
+                s = getattr(s, k)
+            if data is None:
+                setattr(s, name, ffi.NULL)
+                continue
+            buffer = ffi.new("char[]", data) if count is None else ffi.from_buffer(data)
+            keep.append(buffer)
+            setattr(s, name, ffi.cast(ftype, buffer))
+
+    def save_value(self, value) -> Any:
+        if not isinstance(value, self._ffi.CData):
+            return value
+        ffi = self._ffi
+        ctype = ffi.typeof(value)
+        if ctype.kind in ("pointer", "array") and ctype.item.cname == "char":
+            return ("s", None if value == ffi.NULL else ffi.string(value))
+        fields = self.struct(value)
+        if fields is not None:
+            return ("t",) + self.save_struct(value, fields)
+        return ("p", ctype.cname, int(ffi.cast("uintptr_t", value)))
+
+    def load_value(self, value, keep: List[Any]) -> Any:
+        if not isinstance(value, tuple):
+            return value
+        ffi = self._ffi
+        if value[0] == "s":
+            if value[1] is None:
+                return ffi.NULL
+            s = ffi.new("char[]", value[1])
+            keep.append(s)
+            return s
+        if value[0] == "t":
+            p = ffi.new(value[1] + " *")
+            keep.append(p)
+            self.load_struct(p, value[2], value[3], keep)
+            return p
+        return ffi.cast(value[1], value[2])
+
+
+def _is_callback_setter(name: str) -> bool:
+    return name.startswith("uwSet") and name.endswith("Callback")
+
+
+class Recorder:
+    # stands in place of the cffi library object, passing everything through and recording it
+
+    def __init__(self, ffi, api, path: str):
+        self._ffi = ffi
+        self._api = api
+        self._codec = _Codec(ffi)
+        self._file: Any = gzip.open(path, "wb", compresslevel=6)
+        self._file.write(_MAGIC)
+        self._events: List[Tuple] = []
+        self._names: Dict[str, int] = {}
+        self._active: List[List[Any]] = []  # [name, started] of calls in progress
+        self._callbacks: Dict[str, Any] = {}
+        self.UW_VERSION = api.UW_VERSION
+        self._emit(("H", {"UW_VERSION": api.UW_VERSION}))
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self._flush()
+        self._file.close()
+        self._file = None
+
+    def _emit(self, event: Tuple) -> None:
+        self._events.append(event)
+        if len(self._events) >= _BATCH:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._events and self._file is not None:
+            data = bytearray()
+            for event in self._events:
+                _pack_event(event, data, self._names)
+            self._file.write(_LENGTH.pack(len(data)))
+            self._file.write(data)
+        self._events = []
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._api, name)
+        if name.startswith("uw") and callable(value):
+            if _is_callback_setter(name):
+                value = self._wrap_setter(name, value)
+            else:
+                value = self._wrap(name, value)
+        setattr(self, name, value)  # resolve each name once
+        return value
+
+    def _wrap(self, name: str, function: Callable) -> Callable:
+        codec = self._codec
+        active = self._active
+        emit = self._emit
+
+        def recorded(*args):
+            active.append([name, False])
+            try:
+                result = function(*args)
+            finally:
+                active.pop()
+            outs = []
+            for i, a in enumerate(args):
+                fields = codec.struct(a)
+                if fields is not None:
+                    outs.append((i,) + codec.save_struct(a, fields)[1:])
+            emit(("C", name, codec.save_value(result), tuple(outs)))
+            return result
+
+        return recorded
+
+    def _wrap_setter(self, name: str, function: Callable) -> Callable:
+        def recorded(callback):
+            def invoked(*args):
+                if self._active and not self._active[-1][1]:
+                    self._emit(("S", self._active[-1][0]))
+                    self._active[-1][1] = True
+                self._emit(("B", name, tuple(self._codec.save_value(a) for a in args)))
+                try:
+                    return callback(*args)
+                finally:
+                    self._emit(("E",))
+
+            wrapper = self._ffi.callback(self._ffi.typeof(callback), invoked)
+            self._callbacks[name] = wrapper  # keep alive
+            function(wrapper)
+            self._emit(("C", name, None, ()))
+
+        return recorded
+
+
+class Replay:
+    # stands in place of the cffi library object, feeding a recording back to python, without the uw library
+    # use as UwapiLibrary(backend=Replay(path)) and run the bot as usual
+
+    def __init__(self, path: str):
+        self._path = path
+        self._ffi: Any = None
+        self._codec: Any = None
+        self._stream: Any = None
+        self._batch: List[Tuple] = []
+        self._index = 0
+        self._levels: List[Dict[str, Deque[Tuple]]] = [{}]  # unmatched calls per callback depth
+        self._last: Dict[str, Tuple] = {}
+        self._keep: Dict[str, List[Any]] = {}
+        self._callbacks: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses: Dict[str, int] = {}
+        self.UW_VERSION = 0
+
+    def bind(self, ffi) -> "Replay":
+        self._ffi = ffi
+        self._codec = _Codec(ffi)
+        self._stream = self._read()
+        header = self._next()
+        assert header is not None and header[0] == "H", "not a uwapi recording"
+        self.UW_VERSION = header[1]["UW_VERSION"]
+        return self
+
+    def _read(self):
+        names: List[str] = []
+        with gzip.open(self._path, "rb") as f:
+            assert f.read(len(_MAGIC)) == _MAGIC, "not a uwapi recording"
+            while True:
+                length = f.read(4)
+                if len(length) < 4:
+                    return
+                data = f.read(_LENGTH.unpack(length)[0])
+                batch = []
+                offset = 0
+                while offset < len(data):
+                    event, offset = _unpack_event(data, offset, names)
+                    batch.append(event)
+                yield batch
+
+    def _peek(self) -> Optional[Tuple]:
+        while self._index >= len(self._batch):
+            batch = next(self._stream, None)
+            if batch is None:
+                return None
+            self._batch = batch
+            self._index = 0
+        return self._batch[self._index]
+
+    def _next(self) -> Optional[Tuple]:
+        e = self._peek()
+        if e is not None:
+            self._index += 1
+        return e
+
+    def run(self) -> None:
+        # dispatches all remaining callbacks, for use without a blocking connect call from the bot
+        while True:
+            e = self._next()
+            if e is None:
+                return
+            if e[0] == "B":
+                self._dispatch(e)
+
+    def __getattr__(self, name: str) -> Any:
+        if not name.startswith("uw"):
+            raise AttributeError(name)
+        function = self._setter(name) if _is_callback_setter(name) else self._caller(name)
+        setattr(self, name, function)
+        return function
+
+    def _setter(self, name: str) -> Callable:
+        def function(callback):
+            self._callbacks[name] = callback
+            self._call(name, ())
+
+        return function
+
+    def _caller(self, name: str) -> Callable:
+        def function(*args):
+            return self._call(name, args)
+
+        return function
+
+    def _call(self, name: str, args: Tuple) -> Any:
+        record = self._match(name)
+        if record is None:
+            self.misses[name] = self.misses.get(name, 0) + 1
+            record = self._last.get(name)
+            if record is None:
+                return 0
+        else:
+            self.hits += 1
+            self._last[name] = record
+        keep: List[Any] = []
+        for i, raw, extras in record[3]:
+            self._codec.load_struct(args[i], raw, extras, keep)
+        result = record[2]
+        if isinstance(result, tuple):
+            result = self._codec.load_value(result, keep)
+        if keep:
+            self._keep[name] = keep
+        return result
+
+    def _match(self, name: str) -> Optional[Tuple]:
+        level = self._levels[-1]
+        queue = level.get(name)
+        if queue:
+            return queue.popleft()
+        while True:
+            e = self._peek()
+            if e is None or e[0] == "E":
+                return None
+            if e[0] == "C":
+                self._next()
+                if e[1] == name:
+                    return e
+                level.setdefault(e[1], deque()).append(e)
+            elif e[0] == "S":
+                if e[1] != name:
+                    return None  # the stream waits for the bot to make that call
+                self._next()
+                while True:
+                    e = self._next()
+                    if e is None:
+                        return None
+                    if e[0] == "B":
+                        self._dispatch(e)
+                    elif e[0] == "C":
+                        return e
+            else:
+                self._next()
+                self._dispatch(e)
+
+    def _dispatch(self, event: Tuple) -> None:
+        callback = self._callbacks.get(event[1])
+        self._levels.append({})
+        try:
+            if callback is not None:
+                keep: List[Any] = []
+                callback(*[self._codec.load_value(a, keep) for a in event[2]])
+        finally:
+            self._levels.pop()
+        depth = 1
+        while depth > 0:
+            e = self._next()
+            if e is None:
+                return
+            if e[0] == "B":
+                depth += 1
+            elif e[0] == "E":
+                depth -= 1
@@ -0,0 +1,302 @@
+import atexit
+import multiprocessing
+import os
+import queue
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Deque, Optional
+import numpy as np
+from .interop import *
+from .events import uw_events
+from .map import uw_map
+
+# Immutable copies of the world state in shared memory, for analysis in worker processes, away from the uw library.
+# Each snapshot is a new segment with increasing version, the last few are kept before they are unlinked.
+# Segments of snapshots submitted to workers are unlinked only after the tasks are drained, see SnapshotWorkers.
+# The map arrays do not change during a game, and are published once per map, in a segment of their own.
+# Workers read the arrays in place, and return their results to the main thread, which turns them into commands.
+
+_ALIGNMENT = 64
+
+
+@dataclass(frozen=True, slots=True)
+class _Segment:
+    name: str
+    arrays: tuple[tuple[str, str, tuple[int, ...], int], ...]  # name, dtype, shape, offset
+
+
+@dataclass(frozen=True, slots=True)
+class SnapshotRef:
+    # picklable reference to a published snapshot
+    version: int
+    update_index: int
+    data: _Segment
+    map: _Segment
+
+
+def _publish(name: str, arrays: dict[str, np.ndarray]) -> tuple[SharedMemory, _Segment]:
+    layout = []
+    offset = 0
+    for key, a in arrays.items():
+        offset = (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+        layout.append((key, a.dtype.str, a.shape, offset))
+        offset += a.nbytes
+    size = (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+    shm = SharedMemory(name=name, create=True, size=max(size, _ALIGNMENT))
+    for (_, dtype, shape, offset), a in zip(layout, arrays.values()):
+        np.ndarray(shape, dtype, shm.buf, offset)[...] = a
+    return shm, _Segment(shm.name, tuple(layout))
+
+
+def _views(shm: SharedMemory, segment: _Segment) -> dict[str, np.ndarray]:
+    result = {}
+    for key, dtype, shape, offset in segment.arrays:
+        a: np.ndarray = np.ndarray(shape, dtype, shm.buf, offset)
+        a.flags.writeable = False
+        result[key] = a
+    return result
+
+
+def _close(shm: SharedMemory) -> None:
+    try:
+        shm.close()
+    except BufferError:
+        pass  # arrays still referenced, the mapping is released with them
+
+
+class Snapshot:
+    # read-only view of a published snapshot, in a worker process
+    # arrays: ids, protos, forces, positions, lives, unit_states, components (rows of the entity columns), overview (per tile)
+    # map arrays: tiles_positions, tiles_clusters, tiles_terrains, tiles_neighbors_offsets, tiles_neighbors
+    # the arrays are valid only while the function given to SnapshotWorkers runs
+
+    _map_opened: Optional[tuple[SharedMemory, dict[str, np.ndarray]]] = None  # per process
+
+    def __init__(self, ref: SnapshotRef):
+        self.version = ref.version
+        self.update_index = ref.update_index
+        self._shm = SharedMemory(name=ref.data.name)
+        self._arrays = _views(self._shm, ref.data)
+        opened = Snapshot._map_opened
+        if opened is None or opened[0].name != ref.map.name:
+            if opened is not None:
+                _close(opened[0])
+            shm = SharedMemory(name=ref.map.name)
+            opened = Snapshot._map_opened = (shm, _views(shm, ref.map))
+        self._map_arrays = opened[1]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        a = self._arrays.get(name)
+        return a if a is not None else self._map_arrays[name]
+
+    def names(self) -> list[str]:
+        return list(self._arrays) + list(self._map_arrays)
+
+    def neighbors(self, tile: int) -> np.ndarray:
+        offsets = self._map_arrays["tiles_neighbors_offsets"]
+        return self._map_arrays["tiles_neighbors"][offsets[tile] : offsets[tile + 1]]
+
+    def _close(self) -> None:
+        self._arrays = {}
+        _close(self._shm)
+
+
+def _run(ref: SnapshotRef, function: Callable[..., Any], args: tuple) -> Any:
+    snapshot = Snapshot(ref)
+    try:
+        return function(snapshot, *args)
+    finally:
+        snapshot._close()
+
+
+class Snapshots:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            uw_events.on_game_state(cls._instance._game_state)
+        return cls._instance
+
+    def __init__(self):
+        self._every = 0  # 0 when disabled
+        self._keep = 4
+        self._version = 0
+        self._published: Deque[SharedMemory] = deque()
+        self._map: Optional[tuple[SharedMemory, _Segment]] = None
+        self._map_key: Optional[tuple[str, int]] = None  # guid and tiles count of the published map
+        self._latest: Optional[SnapshotRef] = None
+        self._readers: dict[str, int] = {}  # segment name -> submitted tasks not drained yet
+        self._retired: dict[str, SharedMemory] = {}  # segments no longer kept, but still read
+        self._exit_registered = False
+
+    def enabled(self) -> bool:
+        return self._every > 0
+
+    def enable(self, every: int = 10, keep: int = 4) -> None:
+        # publishes a snapshot every given number of ticks, keeping the latest snapshots for the workers still reading them
+        self._every = every
+        self._keep = max(keep, 1)
+        if not self._exit_registered:
+            atexit.register(self._release)
+            self._exit_registered = True
+
+    def disable(self) -> None:
+        self._every = 0
+        self._release()
+
+    def latest(self) -> Optional[SnapshotRef]:
+        return self._latest
+
+    def publish(self) -> SnapshotRef:
+        from .world import uw_world
+
+        columns = uw_world.columns()
+        self._version += 1
+        shm, segment = _publish(
+            f"uw{os.getpid()}_{self._version}",
+            {
+                "ids": columns.ids(),
+                "protos": columns.protos(),
+                "forces": columns.forces(),
+                "positions": columns.positions(),
+                "lives": columns.lives(),
+                "unit_states": columns.unit_states(),
+                "components": columns.components(),
+                "overview": uw_world.overview_flags_all(),
+            },
+        )
+        self._published.append(shm)
+        while len(self._published) > self._keep:
+            self._retire(self._published.popleft())
+        self._latest = SnapshotRef(self._version, uw_world.update_index(), segment, self._publish_map()[1])
+        return self._latest
+
+    def _publish_map(self) -> tuple[SharedMemory, _Segment]:
+        tiles = uw_map.tiles_count()
+        if self._map is None or self._map_key != (uw_map.guid(), tiles):
+            if self._map is not None:
+                self._retire(self._map[0])
+            offsets, neighbors = uw_map.neighbors_csr()
+            self._map = _publish(
+                f"uw{os.getpid()}_map_{self._version}",
+                {
+                    "tiles_positions": uw_map.positions_array(),
+                    "tiles_clusters": uw_map.tile_to_cluster_map(),
+                    "tiles_terrains": uw_map.terrains(),
+                    "tiles_neighbors_offsets": offsets,
+                    "tiles_neighbors": neighbors,
+                },
+            )
+            self._map_key = (uw_map.guid(), tiles)
+        return self._map
+
+    def _update(self, update_index: int) -> None:
+        if update_index % self._every == 0:
+            self.publish()
+
+    def _acquire(self, ref: SnapshotRef) -> None:
+        for name in (ref.data.name, ref.map.name):
+            self._readers[name] = self._readers.get(name, 0) + 1
+
+    def _release_ref(self, ref: SnapshotRef) -> None:
+        for name in (ref.data.name, ref.map.name):
+            count = self._readers.pop(name) - 1
+            if count:
+                self._readers[name] = count
+            elif name in self._retired:
+                self._unlink(self._retired.pop(name))
+
+    def _retire(self, shm: SharedMemory) -> None:
+        if shm.name in self._readers:
+            self._retired[shm.name] = shm
+        else:
+            self._unlink(shm)
+
+    def _unlink(self, shm: SharedMemory) -> None:
+        # readers that have it opened keep their mapping
+        _close(shm)
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _retire_all(self) -> None:
+        while self._published:
+            self._retire(self._published.popleft())
+        if self._map is not None:
+            self._retire(self._map[0])
+            self._map = None
+        self._map_key = None
+        self._latest = None
+
+    def _release(self) -> None:
+        # tasks still pending fail to open their segments
+        self._retire_all()
+        for shm in self._retired.values():
+            self._unlink(shm)
+        self._retired.clear()
+
+    def _game_state(self, state: UwGameStateEnum) -> None:
+        if state == UwGameStateEnum.Finish:
+            self._retire_all()
+
+
+class SnapshotWorkers:
+    # pool of processes that run functions on the latest snapshot, function(snapshot, *args)
+    # the functions must be importable by the workers (defined at module level), as the workers are spawned
+    # results are collected on the main thread with drain, eg. in an update listener
+    # the snapshot of a task is kept until the task is drained, drain regularly
+
+    def __init__(self, processes: Optional[int] = None):
+        self._executor = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn"))
+        self._done: queue.SimpleQueue[tuple[Future, SnapshotRef]] = queue.SimpleQueue()
+        self._pending = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.drain()  # releases the snapshots of the cancelled tasks
+
+    def submit(self, function: Callable[..., Any], *args: Any) -> bool:
+        # false when no snapshot was published yet
+        ref = uw_snapshots.latest()
+        if ref is None:
+            return False
+        uw_snapshots._acquire(ref)
+        future = self._executor.submit(_run, ref, function, args)
+        self._pending += 1
+        future.add_done_callback(lambda f: self._done.put((f, ref)))
+        return True
+
+    def pending(self) -> int:
+        return self._pending
+
+    def drain(self) -> tuple[list[Any], list[BaseException]]:
+        # results of the finished functions, and exceptions of the failed ones, does not wait
+        results: list[Any] = []
+        errors: list[BaseException] = []
+        while True:
+            try:
+                future, ref = self._done.get_nowait()
+            except queue.Empty:
+                return results, errors
+            self._pending -= 1
+            uw_snapshots._release_ref(ref)
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                errors.append(error)
+            else:
+                results.append(future.result())
+
+
+uw_snapshots = Snapshots()
@@ -0,0 +1,678 @@
+import json
+import math
+import os
+import random
+import re
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+_COMPONENTS = [
+    "Proto",
+    "Owner",
+    "Controller",
+    "Position",
+    "Unit",
+    "Life",
+    "Mana",
+    "Move",
+    "Aim",
+    "Recipe",
+    "RecipeStatistics",
+    "LogisticsTimestamp",
+    "Priority",
+    "Amount",
+    "Attachment",
+    "Ping",
+    "Player",
+    "PlayerAiConfig",
+    "Force",
+    "ForceDetails",
+    "ForeignPolicy",
+    "DiplomacyProposal",
+]
+
+# prototype types, as in UwPrototypeTypeEnum
+_RESOURCE = 1
+_RECIPE = 2
+_CONSTRUCTION = 3
+_UNIT = 4
+_RACE = 6
+
+# overview flags, as in UwOverviewFlags
+_OVERVIEW_RESOURCE = 1 << 0
+_OVERVIEW_CONSTRUCTION = 1 << 1
+_OVERVIEW_MOBILE_UNIT = 1 << 2
+_OVERVIEW_STATIC_UNIT = 1 << 3
+
+_PROTOTYPES: List[Dict[str, Any]] = [
+    {"id": 100, "type": _RACE, "name": "synthetic", "constructions": [300], "units": [400, 401, 402]},
+    {"id": 200, "type": _RESOURCE, "name": "metal"},
+    {"id": 250, "type": _RECIPE, "name": "metal", "inputs": {}, "outputs": {"200": 1}},
+    {"id": 300, "type": _CONSTRUCTION, "name": "factory", "output": 402},
+    {"id": 400, "type": _UNIT, "name": "tank", "dps": 10, "life": 100, "speed": 5},
+    {"id": 401, "type": _UNIT, "name": "truck", "dps": 0, "life": 50, "speed": 7},
+    {"id": 402, "type": _UNIT, "name": "factory", "dps": 0, "life": 500, "speed": 0, "recipes": [250]},
+]
+
+
+def _uw_version() -> int:
+    header = os.path.join(os.path.split(os.path.abspath(__file__))[0], "bots.h")
+    m = re.search(r"UW_VERSION\s*=\s*(\d+)", open(header, "r").read())
+    return int(m.group(1)) if m else 0
+
+
+class SyntheticLibrary:
+    # procedurally generated stand-in for the uw library, implementing the bots.h functions in python
+    # use as UwapiLibrary(backend=SyntheticLibrary(...)) to profile the python layer at any scale without the game
+    # the game starts with any connect call and runs for the given number of ticks
+
+    UW_VERSION = _uw_version()
+
+    def __init__(
+        self,
+        tiles: int = 10000,
+        cluster_size: int = 8,
+        entities: int = 1000,
+        forces: int = 2,
+        ticks: int = 100,
+        moving: float = 0.2,
+        damaged: float = 0.02,
+        churn: float = 0.002,
+        seed: int = 0,
+    ):
+        self.tiles = tiles
+        self.cluster_size = cluster_size
+        self.entities = entities
+        self.forces = forces
+        self.ticks = ticks
+        self.moving = moving
+        self.damaged = damaged
+        self.churn = churn
+        self.seed = seed
+        self._ffi: Any = None
+
+    def bind(self, ffi) -> "SyntheticLibrary":
+        self._ffi = ffi
+        self._random = random.Random(self.seed)
+        self._callbacks: Dict[str, Any] = {}
+        self._keep: Dict[str, Any] = {}
+        self._connection_state = 0
+        self._game_state = 0
+        self._map_state = 0
+        self._tick = 0
+        self._running = False
+        self._overview_tick = -1
+        self._generate_map()
+        self._generate_prototypes()
+        self._generate_entities()
+        return self
+
+    def __getattr__(self, name: str):
+        # functions without meaningful synthetic behavior (admin, chat, commands, ...)
+        if name.startswith("uw"):
+            return _noop
+        raise AttributeError(name)
+
+    # ---------------------
+    # generation
+
+    def _generate_map(self) -> None:
+        w = max(int(math.sqrt(self.tiles)), 2)
+        h = max(self.tiles // w, 2)
+        n = w * h
+        self._width = w
+        self._height = h
+        xs = np.arange(n, dtype=np.int64) % w
+        ys = np.arange(n, dtype=np.int64) // w
+        self._positions = np.zeros((n, 3), dtype=np.float32)
+        self._positions[:, 0] = xs * 10
+        self._positions[:, 1] = ys * 10
+        self._terrains = np.array([self._random.randrange(4) for _ in range(n)], dtype=np.uint8)
+
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        neighbors = []
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                if dx == 0 and dy == 0:
+                    continue
+                nx = xs + dx
+                ny = ys + dy
+                valid = (nx >= 0) & (nx < w) & (ny >= 0) & (ny < h)
+                neighbors.append(np.where(valid, nx + ny * w, -1))
+        table = np.stack(neighbors, axis=1)
+        valid = table >= 0
+        offsets[1:] = np.cumsum(valid.sum(axis=1))
+        self._neighbors_offsets = offsets
+        self._neighbors = np.ascontiguousarray(table[valid], dtype=np.uint32)
+        self._c_neighbors = self._ffi.from_buffer("uint32_t[]", self._neighbors)
+        self._borders = valid.sum(axis=1) < 8
+
+        cs = self.cluster_size
+        cw = (w + cs - 1) // cs
+        ch = (h + cs - 1) // cs
+        self._tile_clusters = ((xs // cs) + (ys // cs) * cw).astype(np.uint32)
+        cxs = np.arange(cw * ch) % cw
+        cys = np.arange(cw * ch) // cw
+        centers_x = np.minimum(cxs * cs + cs // 2, w - 1)
+        centers_y = np.minimum(cys * cs + cs // 2, h - 1)
+        self._cluster_centers = (centers_x + centers_y * w).astype(np.uint32)
+        self._clusters_neighbors: List[Any] = []
+        for c in range(cw * ch):
+            cx = c % cw
+            cy = c // cw
+            ns = [
+                (cx + dx) + (cy + dy) * cw
+                for dy in (-1, 0, 1)
+                for dx in (-1, 0, 1)
+                if (dx or dy) and 0 <= cx + dx < cw and 0 <= cy + dy < ch
+            ]
+            self._clusters_neighbors.append(self._ffi.new("uint32_t[]", ns))
+        self._guid = self._ffi.new("char[]", f"synthetic-{w}x{h}-{cs}-{self.seed}".encode())
+        self._name = self._ffi.new("char[]", b"synthetic")
+        self._path = self._ffi.new("char[]", b"synthetic/synthetic.uwmap")
+
+    def _generate_prototypes(self) -> None:
+        self._prototypes = {p["id"]: p for p in _PROTOTYPES}
+        self._prototypes_json = {
+            p["id"]: self._ffi.new("char[]", json.dumps(p).encode()) for p in _PROTOTYPES
+        }
+        self._definitions_json = self._ffi.new(
+            "char[]", json.dumps({"tagsNames": []}).encode()
+        )
+
+    def _generate_entities(self) -> None:
+        self._entities: Dict[int, Dict[str, Any]] = {}
+        self._ids = np.zeros(max(self.entities * 2, 64), dtype=np.uint32)
+        self._slots: Dict[int, int] = {}
+        self._count = 0
+        self._units: List[int] = []
+        self._modified: set = set()
+        self._orders: Dict[int, List[Any]] = {}
+        self._next_id = 1
+
+        self._force_ids = []
+        for i in range(self.forces):
+            fid = self._create({})
+            self._force_ids.append(fid)
+            self._set(fid, "Force", intendedRace=100)
+            self._set(fid, "ForceDetails", startingPosition=self._random_tile(), race=100)
+        self._my_force = self._force_ids[0]
+        self._my_player = self._create({})
+        self._set(
+            self._my_player, "Player", name=b"synthetic", nameLength=9, force=self._my_force
+        )
+        for fid in self._force_ids[1:]:
+            e = self._create({})
+            self._set(e, "ForeignPolicy", forces=[self._my_force, fid], policy=4)
+        for _ in range(self.entities):
+            self._create_unit()
+
+    def _random_tile(self) -> int:
+        return self._random.randrange(len(self._positions))
+
+    def _create(self, components: Dict[str, Any]) -> int:
+        eid = self._next_id
+        self._next_id += 1
+        if self._count == len(self._ids):
+            self._ids = np.concatenate([self._ids, np.zeros_like(self._ids)])
+        self._ids[self._count] = eid
+        self._slots[eid] = self._count
+        self._count += 1
+        self._entities[eid] = components
+        self._modified.add(eid)
+        return eid
+
+    def _create_unit(self) -> int:
+        proto = self._random.choice([200, 300, 400, 400, 401, 402])
+        p = self._prototypes[proto]
+        eid = self._create({})
+        self._set(eid, "Proto", proto=proto)
+        self._set(eid, "Position", position=self._random_tile(), yaw=0)
+        if p["type"] == _RESOURCE:
+            self._set(eid, "Amount", amount=self._random.randrange(1, 100))
+            return eid
+        self._set(eid, "Owner", force=self._random.choice(self._force_ids))
+        self._set(eid, "Life", life=p.get("life", 100))
+        if p["type"] == _UNIT:
+            self._set(eid, "Unit", state=0, killCount=0)
+            self._set(eid, "Priority", priority=1)
+            if p.get("speed", 0) > 0:
+                self._set(eid, "Move", timestamp=0)
+                self._units.append(eid)
+            if p.get("recipes"):
+                self._set(eid, "Recipe", recipe=p["recipes"][0])
+        return eid
+
+    def _destroy(self, eid: int) -> None:
+        self._entities.pop(eid)
+        slot = self._slots.pop(eid)
+        self._count -= 1
+        last = int(self._ids[self._count])
+        if last != eid:
+            self._ids[slot] = last
+            self._slots[last] = slot
+        # destroyed entities are reported among the modified ids
+        self._modified.add(eid)
+        self._orders.pop(eid, None)
+
+    def _set(self, eid: int, component: str, **values) -> None:
+        c = self._entities[eid].get(component)
+        if c is None:
+            c = self._ffi.new("Uw" + component + "Component *")
+            self._entities[eid][component] = c
+        for k, v in values.items():
+            setattr(c, k, v)
+        self._modified.add(eid)
+
+    # ---------------------
+    # simulation
+
+    def _step(self) -> None:
+        self._tick += 1
+        self._modified.clear()
+        r = self._random
+        entities = self._entities
+
+        self._units = [u for u in self._units if u in entities]
+        for eid in r.sample(self._units, int(len(self._units) * self.moving)):
+            c = entities[eid]
+            position = c["Position"]
+            begin = self._neighbors_offsets[position.position]
+            end = self._neighbors_offsets[position.position + 1]
+            position.position = int(self._neighbors[r.randrange(begin, end)])
+            c["Move"].timestamp = self._tick
+            self._modified.add(eid)
+
+        ids = self._ids[: self._count]
+        for i in r.sample(range(self._count), int(self._count * self.damaged)):
+            eid = int(ids[i])
+            life = entities[eid].get("Life")
+            if life is None:
+                continue
+            life.life -= r.randrange(1, 20)
+            unit = entities[eid].get("Unit")
+            if unit is not None:
+                unit.state = 1 << 4 if life.life * 2 < 100 else 1
+            self._modified.add(eid)
+
+        dead = [
+            eid for eid in self._modified if "Life" in entities[eid] and entities[eid]["Life"].life <= 0
+        ]
+        protected = set(self._force_ids)
+        protected.add(self._my_player)
+        ids = self._ids[: self._count]
+        for i in r.sample(range(self._count), int(self._count * self.churn)):
+            eid = int(ids[i])
+            if eid not in protected and "Proto" in entities[eid]:
+                dead.append(eid)
+        for eid in set(dead):
+            self._destroy(eid)
+        while self._count - len(protected) < self.entities + len(self._force_ids) - 1:
+            self._create_unit()
+
+    def _run(self) -> None:
+        self._running = True
+        self._set_connection_state(1)
+        self._set_connection_state(2)
+        self._set_game_state(1)
+        self._set_map_state(1)
+        self._set_map_state(2)
+        self._set_map_state(3)
+        self._set_game_state(4)
+        self._update(False)
+        for _ in range(self.ticks):
+            if not self._running:
+                break
+            self._step()
+            self._update(True)
+        self._set_game_state(8)
+        self._set_map_state(4)
+        self._set_map_state(0)
+        self._set_game_state(0)
+        self._set_connection_state(0)
+        self._running = False
+
+    def _callback(self, name: str, *args) -> None:
+        cb = self._callbacks.get(name)
+        if cb is not None:
+            cb(*args)
+
+    def _set_connection_state(self, state: int) -> None:
+        self._connection_state = state
+        self._callback("ConnectionState", state)
+
+    def _set_game_state(self, state: int) -> None:
+        self._game_state = state
+        self._callback("GameState", state)
+
+    def _set_map_state(self, state: int) -> None:
+        self._map_state = state
+        self._callback("MapState", state)
+
+    def _update(self, stepping: bool) -> None:
+        self._callback("Update", stepping)
+        tasks = self._keep.pop("tasks", [])
+        for task in tasks:
+            self._callback("TaskCompleted", *task)
+
+    def _write_ids(self, key: str, data, ids) -> None:
+        arr = np.ascontiguousarray(ids, dtype=np.uint32)
+        self._keep[key] = arr
+        if len(arr) == 0:
+            data.ids = self._ffi.NULL
+            data.count = 0
+            return
+        data.ids = self._ffi.from_buffer("uint32_t[]", arr)
+        data.count = len(arr)
+
+    def _distance(self, a: int, b: int) -> float:
+        d = self._positions[a] - self._positions[b]
+        return float(math.sqrt(float(d[0]) ** 2 + float(d[1]) ** 2 + float(d[2]) ** 2))
+
+    def _tiles_in_range(self, x: float, y: float, z: float, radius: float):
+        d = self._positions - np.array([x, y, z], dtype=np.float32)
+        return np.flatnonzero((d * d).sum(axis=1) <= radius * radius)
+
+    # ---------------------
+    # bots.h
+
+    def uwInitialize(self, version: int) -> None:
+        pass
+
+    def uwDeinitialize(self) -> None:
+        pass
+
+    def uwSetExceptionCallback(self, callback) -> None:
+        self._callbacks["Exception"] = callback
+
+    def uwSetLogCallback(self, callback) -> None:
+        self._callbacks["Log"] = callback
+
+    def uwSetConnectionStateCallback(self, callback) -> None:
+        self._callbacks["ConnectionState"] = callback
+
+    def uwSetGameStateCallback(self, callback) -> None:
+        self._callbacks["GameState"] = callback
+
+    def uwSetMapStateCallback(self, callback) -> None:
+        self._callbacks["MapState"] = callback
+
+    def uwSetUpdateCallback(self, callback) -> None:
+        self._callbacks["Update"] = callback
+
+    def uwSetShootingsCallback(self, callback) -> None:
+        self._callbacks["Shootings"] = callback
+
+    def uwSetForceEliminatedCallback(self, callback) -> None:
+        self._callbacks["ForceEliminated"] = callback
+
+    def uwSetChatCallback(self, callback) -> None:
+        self._callbacks["Chat"] = callback
+
+    def uwSetTaskCompletedCallback(self, callback) -> None:
+        self._callbacks["TaskCompleted"] = callback
+
+    def uwConnectionState(self) -> int:
+        return self._connection_state
+
+    def uwConnectFindLan(self, timeoutMicroseconds: int) -> bool:
+        self._run()
+        return True
+
+    def uwConnectDirect(self, address, port: int) -> None:
+        self._run()
+
+    def uwConnectLobbyId(self, lobbyId: int) -> None:
+        self._run()
+
+    def uwConnectEnvironment(self) -> bool:
+        self._run()
+        return True
+
+    def uwConnectNewServer(self, visibility: int, name, extraCmdParams) -> None:
+        self._run()
+
+    def uwTryReconnect(self) -> bool:
+        return False
+
+    def uwDisconnect(self) -> None:
+        self._running = False
+
+    def uwGameState(self) -> int:
+        return self._game_state
+
+    def uwGameTick(self) -> int:
+        return self._tick
+
+    def uwMapState(self) -> int:
+        return self._map_state
+
+    def uwMyPlayer(self, data) -> bool:
+        data.playerEntityId = self._my_player
+        data.forceEntityId = self._my_force
+        data.primaryController = True
+        data.admin = True
+        return True
+
+    def uwMyForceStatistics(self, data) -> None:
+        data.closestDangerPosition = 0xFFFFFFFF
+
+    def uwPerformanceStatistics(self, data) -> None:
+        data.gameSpeed = 1
+
+    def uwEntityPointer(self, id: int):
+        # the entity id doubles as its opaque pointer
+        return self._ffi.cast("UwEntityPtr", id if id in self._entities else 0)
+
+    def uwEntityId(self, entity) -> int:
+        return int(self._ffi.cast("uintptr_t", entity))
+
+    def uwEntityExists(self, id: int) -> bool:
+        return id in self._entities
+
+    def uwModifiedEntities(self, data) -> None:
+        self._write_ids("uwModifiedEntities", data, sorted(self._modified))
+
+    def uwAllEntities(self, data) -> None:
+        self._keep["uwAllEntities"] = self._ids
+        data.ids = self._ffi.from_buffer("uint32_t[]", self._ids)
+        data.count = self._count
+
+    def uwMapInfo(self, data) -> bool:
+        data.name = self._name
+        data.guid = self._guid
+        data.path = self._path
+        data.maxPlayers = self.forces
+        return True
+
+    def uwMapStartingPositions(self, data) -> None:
+        arr = self._ffi.new("UwMapStartingPosition[]", self.forces)
+        for i in range(self.forces):
+            arr[i].position = self._random_tile()
+            arr[i].minForces = 1
+            arr[i].maxForces = 1
+        self._keep["uwMapStartingPositions"] = arr
+        data.data = arr
+        data.count = self.forces
+
+    def uwTilesCount(self) -> int:
+        return len(self._positions)
+
+    def uwTile(self, index: int, data) -> None:
+        p = self._positions[index]
+        data.position = [float(p[0]), float(p[1]), float(p[2])]
+        data.up = [0.0, 0.0, 1.0]
+        begin = int(self._neighbors_offsets[index])
+        data.neighborsIndices = self._c_neighbors + begin
+        data.neighborsCount = int(self._neighbors_offsets[index + 1]) - begin
+        data.clusterIndex = int(self._tile_clusters[index])
+        data.terrain = int(self._terrains[index])
+        data.border = bool(self._borders[index])
+
+    def uwClustersCount(self) -> int:
+        return len(self._cluster_centers)
+
+    def uwCluster(self, index: int, data) -> None:
+        ns = self._clusters_neighbors[index]
+        data.neighborsIndices = ns
+        data.neighborsCount = len(ns)
+        data.centerTileIndex = int(self._cluster_centers[index])
+
+    def uwAreaRange(self, x: float, y: float, z: float, radius: float, data) -> None:
+        self._write_ids("uwAreaRange", data, self._tiles_in_range(x, y, z, radius))
+
+    def _area(self, key: str, position: int, radius: float, data) -> None:
+        p = self._positions[position]
+        self._write_ids(key, data, self._tiles_in_range(p[0], p[1], p[2], radius))
+
+    def uwAreaConnected(self, position: int, radius: float, data) -> None:
+        self._area("uwAreaConnected", position, radius, data)
+
+    def uwAreaNeighborhood(self, position: int, radius: float, data) -> None:
+        self._area("uwAreaNeighborhood", position, radius, data)
+
+    def uwAreaExtended(self, position: int, radius: float, data) -> None:
+        self._area("uwAreaExtended", position, radius, data)
+
+    def uwTestVisible(self, x1, y1, z1, x2, y2, z2) -> bool:
+        return True
+
+    def uwTestShooting(self, shooterPosition, shooterProto, shootingRangeUpgrade, targetPosition, targetProto) -> bool:
+        return self._distance(shooterPosition, targetPosition) <= 50 + shootingRangeUpgrade
+
+    def uwDistanceLine(self, x1, y1, z1, x2, y2, z2) -> float:
+        return math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2 + (z1 - z2) ** 2)
+
+    def uwDistanceEstimate(self, positionA: int, positionB: int) -> float:
+        return self._distance(positionA, positionB) * 1.1
+
+    def uwYaw(self, startPosition: int, goalPosition: int) -> float:
+        d = self._positions[goalPosition] - self._positions[startPosition]
+        return math.atan2(float(d[1]), float(d[0]))
+
+    def uwStartClustersDistances(self, query) -> None:
+        start = self._positions[self._cluster_centers[query.startingCluster]]
+        d = self._positions[self._cluster_centers] - start
+        self._keep["clustersDistances"] = np.sqrt((d * d).sum(axis=1)).astype(np.uint32)
+        self._keep.setdefault("tasks", []).append((query.taskUserData, 2))
+
+    def uwRetrieveClustersDistances(self, data) -> None:
+        self._write_ids("uwRetrieveClustersDistances", data.distances, self._keep.get("clustersDistances", []))
+
+    def uwStartUnitPathfinding(self, query) -> None:
+        self._keep["unitPathfinding"] = [query.startingPosition, query.goalPosition]
+        self._keep.setdefault("tasks", []).append((query.taskUserData, 1))
+
+    def uwRetrieveUnitPathfinding(self, data) -> None:
+        self._write_ids("uwRetrieveUnitPathfinding", data.path, self._keep.get("unitPathfinding", []))
+        data.state = 5
+
+    def uwAllPrototypes(self, data) -> None:
+        self._write_ids("uwAllPrototypes", data, sorted(self._prototypes))
+
+    def uwPrototypeType(self, prototypeId: int) -> int:
+        p = self._prototypes.get(prototypeId)
+        return p["type"] if p is not None else 0
+
+    def uwPrototypeJson(self, prototypeId: int):
+        return self._prototypes_json[prototypeId]
+
+    def uwDefinitionsJson(self):
+        return self._definitions_json
+
+    def uwHashString(self, str) -> int:
+        h = 2166136261
+        for b in self._ffi.string(str):
+            h = ((h ^ b) * 16777619) & 0xFFFFFFFF
+        return h
+
+    def uwUnitPathState(self, unitId: int) -> int:
+        return 0
+
+    def uwUnitUpgrades(self, unit: int, data) -> None:
+        pass
+
+    def uwTestShootingEntities(self, shooterId: int, targetId: int) -> bool:
+        a = self._entities.get(shooterId, {}).get("Position")
+        b = self._entities.get(targetId, {}).get("Position")
+        return a is not None and b is not None and self._distance(a.position, b.position) <= 50
+
+    def uwTestConstructionPlacement(self, constructionProto: int, position: int, recipeProto: int) -> bool:
+        return True
+
+    def uwFindConstructionPlacement(self, constructionProto: int, position: int, recipeProto: int) -> int:
+        return position
+
+    def uwOrder(self, unit: int, data) -> None:
+        o = self._ffi.new("UwOrder *")
+        o[0] = data[0]
+        self._orders.setdefault(unit, []).append(o)
+
+    def uwOrders(self, unit: int, data) -> None:
+        orders = self._orders.get(unit, [])
+        arr = self._ffi.new("UwOrder[]", max(len(orders), 1))
+        for i, o in enumerate(orders):
+            arr[i] = o[0]
+        self._keep["uwOrders"] = arr
+        data.orders = arr
+        data.count = len(orders)
+
+    def uwOverviewFlags(self, position: int) -> int:
+        return int(self._overview()[position])
+
+    def uwOverviewIds(self, position: int, data) -> None:
+        ids = [
+            eid
+            for eid, c in self._entities.items()
+            if "Position" in c and c["Position"].position == position
+        ]
+        self._write_ids("uwOverviewIds", data, ids)
+
+    def uwOverviewExtract(self, data) -> None:
+        flags = self._overview()
+        self._keep["uwOverviewExtract"] = flags
+        data.flags = self._ffi.cast("UwOverviewFlags *", self._ffi.from_buffer(flags))
+        data.count = len(flags)
+
+    def _overview(self):
+        if self._overview_tick == self._tick:
+            return self._overview_flags
+        flags = np.zeros(len(self._positions), dtype=np.uint32)
+        for c in self._entities.values():
+            position = c.get("Position")
+            if position is None:
+                continue
+            if "Amount" in c:
+                flags[position.position] |= _OVERVIEW_RESOURCE
+            elif "Move" in c:
+                flags[position.position] |= _OVERVIEW_MOBILE_UNIT
+            elif "Unit" in c:
+                flags[position.position] |= _OVERVIEW_STATIC_UNIT
+            else:
+                flags[position.position] |= _OVERVIEW_CONSTRUCTION
+        self._overview_flags = flags
+        self._overview_tick = self._tick
+        return flags
+
+
+def _noop(*args) -> int:
+    return 0
+
+
+def _make_fetch(component: str):
+    def fetch(self, entity, data) -> bool:
+        e = self._entities.get(int(self._ffi.cast("uintptr_t", entity)))
+        if e is None:
+            return False
+        c = e.get(component)
+        if c is None:
+            return False
+        data[0] = c[0]
+        return True
+
+    fetch.__name__ = "uwFetch" + component + "Component"
+    return fetch
+
+
+for _component in _COMPONENTS:
+    setattr(SyntheticLibrary, "uwFetch" + _component + "Component", _make_fetch(_component))
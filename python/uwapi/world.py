@@ -1,7 +1,45 @@
+import heapq
+import itertools
+import math
+import threading
+from typing import AbstractSet, Any, Callable, Iterable, Iterator, Optional
+import numpy as np
 from .interop import *
+from .interop import _UwOverviewFlags_lookup
 from .events import uw_events
-from .entity import Entity
-from .entity_update_components import entity_update_components
+from .entity import Entity, LazyEntity
+from .prototypes import uw_prototypes
+from .map import uw_map
+from .history import uw_history
+from .snapshot import uw_snapshots
+from .cache import uw_tick_cache
+from .dispatcher import uw_dispatcher
+from .columns import EntityColumns, COMPONENTS, COMPONENT_BITS, _UPDATED
+from .entity_update_components import entities_update_components
+
+
+_EMPTY_SET: frozenset[int] = frozenset()
+
+
+def _discard(index: dict[Any, set[int]], key: Any, eid: int) -> None:
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(eid)
+
+
+class _ComponentsSelection(dict[int, int]):
+    # proto id (0 for entities without proto) -> bitmask of components to synchronize
+    def __init__(self):
+        super().__init__()
+        self.by_type: dict[UwPrototypeTypeEnum, int] = {}
+        self.default = -1
+        self.required = COMPONENT_BITS["Proto"] | COMPONENT_BITS["ForeignPolicy"]  # the world needs them itself
+
+    def __missing__(self, proto: int) -> int:
+        type = uw_prototypes.type(proto) if proto else UwPrototypeTypeEnum.Nothing
+        mask = self.by_type.get(type, self.default) | self.required
+        self[proto] = mask
+        return mask
 
 
 def _make_empty_UwMyForceStatistics() -> UwMyForceStatistics:
@@ -17,8 +55,34 @@ class World:
     _my_player = _make_empty_UwMyPlayer()
     _my_force_statistics = _make_empty_UwMyForceStatistics()
     _entities: dict[int, Entity] = {}
+    _destroyed: list[Entity] = []  # entities among the modified ids that no longer exist, removed in _update_removed
+    _columns = EntityColumns(_entities)
+    _fresh: list[Entity] = []
+    _selection: Optional[_ComponentsSelection] = None
+    _synchronized: Optional[_ComponentsSelection] = None  # the selection of the previous synchronization
+    _resync: bool = False  # synchronize all entities in the next update
+    _lazy: bool = False
+    _update_index: int = 0
+    _index_force: dict[int, set[int]] = {}
+    _index_proto: dict[int, set[int]] = {}
+    _index_type: dict[UwPrototypeTypeEnum, set[int]] = {}
+    _index_force_proto: dict[tuple[int, int], set[int]] = {}
+    _index_force_type: dict[tuple[int, UwPrototypeTypeEnum], set[int]] = {}
+    _index_types: dict[int, UwPrototypeTypeEnum] = {}  # entity id -> type it is indexed under
+    _index_tile: dict[int, set[int]] = {}
+    _index_cluster: dict[int, set[int]] = {}
+    _index_force_cluster: dict[tuple[int, int], set[int]] = {}
     _policies: dict[int, UwForeignPolicyEnum] = {}
-    _overview: list[UwOverviewFlags] = []
+    _policies_forces: dict[UwForeignPolicyEnum, set[int]] = {}
+    _policies_sources: dict[int, int] = {}  # foreign policy entity id -> force id it sets the policy for
+    _policies_my_force: int = 0
+    _overview: np.ndarray = np.zeros(0, dtype=np.uint8)
+    _overview_changed: np.ndarray = np.zeros(0, dtype=np.intp)
+    _created_listeners: list[Callable[[Entity], None]] = []
+    _destroyed_listeners: list[Callable[[Entity], None]] = []
+    _component_listeners: dict[int, list[Callable[[Entity, Any, Any], None]]] = {}  # by component index
+    _watched: int = 0  # bitmask of components with listeners
+    _changes: list[tuple[Entity, int, Any]] = []  # (entity, component index, previous value) in this update
 
     def __new__(cls):
         if cls._instance is None:
@@ -42,13 +106,14 @@ class World:
         return self._my_force_statistics
 
     def unit_path_state(self, unit_id: int) -> UwPathStateEnum:
-        return uw_interop.uwUnitPathState(unit_id)
+        return uw_tick_cache.cached("unit_path_state", uw_interop.uwUnitPathState, unit_id)
 
     def unit_upgrades(self, unit_id: int) -> UwUnitUpgrades:
-        return uw_interop.uwUnitUpgrades(unit_id)
+        # do not modify the returned upgrades, they are shared until the next update
+        return uw_tick_cache.cached("unit_upgrades", uw_interop.uwUnitUpgrades, unit_id)
 
     def test_shooting(self, shooter_id: int, target_id: int) -> bool:
-        return uw_interop.uwTestShootingEntities(shooter_id, target_id)
+        return uw_tick_cache.cached("test_shooting", uw_interop.uwTestShootingEntities, shooter_id, target_id)
 
     def test_construction_placement(
         self, construction_proto: int, position: int, recipe_proto: int = 0
@@ -64,15 +129,23 @@ class World:
             construction_proto, position, recipe_proto
         )
 
-    def overview_flags_all(self) -> list[UwOverviewFlags]:
+    def overview_flags_all(self) -> np.ndarray:
+        # read-only uint8 array of UwOverviewFlags values, one per tile, replaced (not modified) on each update
+        # (it used to be a list of UwOverviewFlags, use overview_flags(position) for the enum of a single tile)
         return self._overview
 
     def overview_flags(self, position: int) -> UwOverviewFlags:
-        return self._overview[position]
+        return _UwOverviewFlags_lookup[int(self._overview[position])]
+
+    def overview_changed(self) -> np.ndarray:
+        return self._overview_changed
 
     def overview_entities(self, position: int) -> list[int]:
         return uw_interop.uwOverviewIds(position).ids
 
+    def overview_entities_view(self, position: int) -> memoryview:
+        return uw_interop.uwOverviewIdsView(position)
+
     def unit_pathfinding(
         self,
         callback: Callable,
@@ -85,6 +158,45 @@ class World:
         def fin():
             callback(uw_interop.uwRetrieveUnitPathfinding())
 
+        self._start_unit_pathfinding(
+            fin,
+            starting_position,
+            goal_position,
+            unit_prototype,
+            allow_nearby_position,
+            max_iterations,
+        )
+
+    def unit_pathfinding_view(
+        self,
+        callback: Callable,
+        starting_position: int,
+        goal_position: int,
+        unit_prototype: int,
+        allow_nearby_position: bool = False,
+        max_iterations: int = 0,
+    ) -> None:
+        def fin():
+            callback(*uw_interop.uwRetrieveUnitPathfindingView())
+
+        self._start_unit_pathfinding(
+            fin,
+            starting_position,
+            goal_position,
+            unit_prototype,
+            allow_nearby_position,
+            max_iterations,
+        )
+
+    def _start_unit_pathfinding(
+        self,
+        fin: Callable,
+        starting_position: int,
+        goal_position: int,
+        unit_prototype: int,
+        allow_nearby_position: bool,
+        max_iterations: int,
+    ) -> None:
         q = UwUnitPathfindingQuery(
             uw_events._insert_task(fin),
             starting_position,
@@ -98,67 +210,434 @@ class World:
     def entities(self) -> dict[int, Entity]:
         return self._entities
 
+    def columns(self) -> EntityColumns:
+        return self._columns
+
+    def select_components(
+        self,
+        components: Optional[Iterable[str]] = None,
+        type: Optional[UwPrototypeTypeEnum] = None,
+    ) -> None:
+        # components to synchronize for entities of the prototype type, or, without type, for all other entities
+        # None selects all components, Proto and ForeignPolicy are always synchronized, unselected components read None
+        # a new selection, the previous one is kept for the change events of the next update
+        selection = _ComponentsSelection()
+        if self._selection is not None:
+            selection.by_type = dict(self._selection.by_type)
+            selection.default = self._selection.default
+        mask = -1
+        if components is not None:
+            mask = 0
+            for c in components:
+                mask |= COMPONENT_BITS[c]
+        if type is None:
+            selection.default = mask
+        elif components is None:
+            selection.by_type.pop(type, None)
+        else:
+            selection.by_type[type] = mask
+        self._selection = None if selection.default == -1 and not selection.by_type else selection
+        self._resync = True
+
+    def set_lazy_components(self, lazy: bool = True) -> None:
+        # components not selected by select_components are fetched on their first read after each modification of the entity, instead of reading None
+        # the indexes and the columns hold only the synchronized components, select Owner and Position for them
+        # must be called before the entities are created, eg. before connecting
+        if self._entities:
+            raise Exception("lazy components must be set before the entities are created")
+        self._lazy = lazy
+
+    def lazy_components(self) -> bool:
+        return self._lazy
+
+    def fresh_entities(self) -> Iterator[Entity]:
+        # entities created in the latest update
+        return iter(self._fresh)
+
+    # entity ids by owner force, proto and prototype type, do not modify the returned sets
+
+    def entities_of_force(self, force_id: int) -> AbstractSet[int]:
+        return self._index_force.get(force_id, _EMPTY_SET)
+
+    def entities_of_proto(self, proto_id: int, force_id: Optional[int] = None) -> AbstractSet[int]:
+        if force_id is None:
+            return self._index_proto.get(proto_id, _EMPTY_SET)
+        return self._index_force_proto.get((force_id, proto_id), _EMPTY_SET)
+
+    def entities_of_type(
+        self, type: UwPrototypeTypeEnum, force_id: Optional[int] = None
+    ) -> AbstractSet[int]:
+        if force_id is None:
+            return self._index_type.get(type, _EMPTY_SET)
+        return self._index_force_type.get((force_id, type), _EMPTY_SET)
+
+    def entities_on_tile(self, position: int) -> AbstractSet[int]:
+        # do not modify the returned set, it is valid until the next update
+        return self._index_tile.get(position, _EMPTY_SET)
+
+    def entities_in_cluster(self, cluster: int, force_id: Optional[int] = None) -> AbstractSet[int]:
+        # do not modify the returned set
+        if force_id is None:
+            return self._index_cluster.get(cluster, _EMPTY_SET)
+        return self._index_force_cluster.get((force_id, cluster), _EMPTY_SET)
+
+    def entities_nearest(
+        self,
+        position: int,
+        count: int = 1,
+        predicate: Optional[Callable[[Entity], bool]] = None,
+        forces: Optional[Iterable[int]] = None,
+        distance: Optional[Callable[[int, int], float]] = None,
+    ) -> list[Entity]:
+        # up to count entities nearest to the position, nearest first
+        # distance(position, entity position) defaults to the straight line distance, and must not be shorter than it
+        # forces limits the search to entities owned by them (0 for entities without owner), before the predicate is called
+        # searches clusters outwards through their neighbors (see _clusters_outwards), until none can contain a nearer entity
+        measure = uw_map.distance_line if distance is None else distance
+        entities = self._entities
+        found: list[tuple[float, int]] = []  # heap of (-distance, id) of the best entities so far
+        for bound, members in self._clusters_members(position, forces):
+            if len(found) == count and bound > -found[0][0]:
+                break
+            for eid in members:
+                e = entities[eid]
+                if predicate is not None and not predicate(e):
+                    continue
+                d = measure(position, e.pos())
+                if len(found) < count:
+                    heapq.heappush(found, (-d, eid))
+                elif d < -found[0][0]:
+                    heapq.heapreplace(found, (-d, eid))
+        found.sort(reverse=True)
+        return [entities[eid] for _, eid in found]
+
+    def entities_within(
+        self,
+        position: int,
+        radius: float,
+        predicate: Optional[Callable[[Entity], bool]] = None,
+        forces: Optional[Iterable[int]] = None,
+        distance: Optional[Callable[[int, int], float]] = None,
+    ) -> list[Entity]:
+        # entities within the distance from the position, in no particular order
+        # distance, forces and the search are as in entities_nearest
+        measure = uw_map.distance_line if distance is None else distance
+        entities = self._entities
+        result = []
+        for bound, members in self._clusters_members(position, forces):
+            if bound > radius:
+                break
+            for eid in members:
+                e = entities[eid]
+                if predicate is not None and not predicate(e):
+                    continue
+                if measure(position, e.pos()) <= radius:
+                    result.append(e)
+        return result
+
+    def _clusters_members(
+        self, position: int, forces: Optional[Iterable[int]]
+    ) -> Iterator[tuple[float, Iterable[int]]]:
+        if forces is None:
+            index = self._index_cluster
+            for bound, cluster in self._clusters_outwards(position):
+                yield bound, index.get(cluster, _EMPTY_SET)
+            return
+        index_force = self._index_force_cluster
+        forces = tuple(forces)
+        for bound, cluster in self._clusters_outwards(position):
+            yield bound, itertools.chain.from_iterable(index_force.get((f, cluster), _EMPTY_SET) for f in forces)
+
+    def _clusters_outwards(self, position: int) -> Iterator[tuple[float, int]]:
+        # clusters connected to the cluster of the position, expanded through their neighbors,
+        # in order of a lower bound of the distance of their tiles from the position along any path through the clusters:
+        # the largest lower bound of the straight line distance among the clusters on the path
+        # exact for distances along paths (eg. distance_estimate), the straight line distance may be shorter across obstacles,
+        # and entities in clusters not connected to the cluster of the position are not found
+        if position == INVALID or position >= uw_map.tiles_count():
+            return
+        centers, radii = uw_map._clusters_spheres_flat()
+        offsets = uw_map._clusters_neighbors_offsets.data
+        neighbors = uw_map._clusters_neighbors.data
+        p = uw_map._positions_flat
+        x, y, z = p[position * 3], p[position * 3 + 1], p[position * 3 + 2]
+        start = uw_map.tile_to_cluster(position)
+        heap = [(0.0, start)]
+        reached = {start}
+        while heap:
+            key, cluster = heapq.heappop(heap)
+            yield key, cluster
+            for n in neighbors[offsets[cluster] : offsets[cluster + 1]]:
+                if n in reached:
+                    continue
+                reached.add(n)
+                i = n * 3
+                dx = centers[i] - x
+                dy = centers[i + 1] - y
+                dz = centers[i + 2] - z
+                bound = math.sqrt(dx * dx + dy * dy + dz * dz) - radii[n]
+                heapq.heappush(heap, (bound if bound > key else key, n))
+
+    def update_index(self) -> int:
+        return self._update_index
+
     def entity(self, entity_id: int) -> Entity:
         return self._entities[entity_id]
 
     def policy(self, force_id: int) -> UwForeignPolicyEnum:
         return self._policies.get(force_id, UwForeignPolicyEnum.Nothing)
 
+    def forces_with_policy(self, policy: UwForeignPolicyEnum) -> AbstractSet[int]:
+        # do not modify the returned set
+        return self._policies_forces.get(policy, _EMPTY_SET)
+
     def offer_foreign_policy(self, force_id: int, policy: UwForeignPolicyEnum) -> None:
         uw_interop.uwOfferForeignPolicy(force_id, policy)
 
-    def _all_ids(self) -> list[int]:
-        return uw_interop.uwAllEntities().ids
+    # change events, dispatched at the end of each update, before the update listeners
 
-    def _modified_ids(self) -> list[int]:
-        return uw_interop.uwModifiedEntities().ids
+    def on_entity_created(self, listener: Callable[[Entity], None]) -> None:
+        self._created_listeners.append(listener)
 
-    def _update_removed(self) -> None:
-        all_ids = set(self._all_ids())
-        removed = [eid for eid in self._entities if eid not in all_ids]
-        for eid in removed:
-            self._entities[eid].destroyed = True
-            self._entities.pop(eid, None)
-
-    def _update_fresh(self) -> None:
-        for e in self._entities.values():
-            e.fresh = False
-
-    def _update_modified(self) -> None:
-        for eid in self._modified_ids():
-            if eid in self._entities:
-                entity_update_components(self._entities[eid])
-            else:
-                e = Entity(eid)
-                entity_update_components(e)
-                self._entities[eid] = e
+    def on_entity_destroyed(self, listener: Callable[[Entity], None]) -> None:
+        self._destroyed_listeners.append(listener)
 
-    def _update_policies(self) -> None:
-        self._policies.clear()
-        for e in self._entities.values():
-            if not e.ForeignPolicy:
+    def on_component_changed(
+        self, component: str, listener: Callable[[Entity, Any, Any], None]
+    ) -> None:
+        # listener(entity, previous value, new value), either value may be None
+        # not called for entities created in the same update
+        index = COMPONENTS.index(component)
+        self._component_listeners.setdefault(index, []).append(listener)
+        self._watched |= 1 << index
+
+    def _all_ids(self) -> memoryview:
+        return uw_interop.uwAllEntitiesView()
+
+    def _modified_ids(self) -> memoryview:
+        return uw_interop.uwModifiedEntitiesView()
+
+    def _update_removed(self) -> list[Entity]:
+        # destroyed entities are reported among the modified ids, without entity pointer, see _update_modified,
+        # entities created since last update are all among the modified ids too,
+        # therefore the number of all entities tells whether any other was removed,
+        # and the full comparison is needed only when some were (eg. after a desync)
+        removed = self._destroyed
+        self._destroyed = []
+        for e in removed:
+            del self._entities[e.id]
+        if len(self._entities) != uw_interop.uwAllEntitiesCount():
+            known = np.fromiter(self._entities.keys(), dtype=np.uint32, count=len(self._entities))
+            all_ids = np.frombuffer(self._all_ids(), dtype=np.uint32)
+            for eid in known[~np.isin(known, all_ids, assume_unique=True)].tolist():
+                removed.append(self._entities.pop(eid))
+        if removed:
+            for e in removed:
+                e.destroyed = True
+            # the indexes hold the synchronized values, which are in the columns, components of lazy entities may differ
+            indexed = self._columns._values(removed, "forces", "protos", "positions")
+            self._columns._remove(removed)
+            for e, force, proto, position in zip(removed, *indexed):
+                self._index_discard(e.id, force, proto)
+                self._spatial_discard(e.id, position, force)
+        return removed
+
+    def _update_modified(self) -> list[Entity]:
+        modified = []
+        for previous in self._fresh:
+            previous.fresh = False  # only the entities of the previous update hold the flag
+        self._fresh = []
+        ids = self._modified_ids()
+        if self._resync:
+            # all entities are synchronized again after changes in the selection of components
+            self._resync = False
+            ids = self._all_ids()
+        lazy = self._lazy
+        entity = LazyEntity if lazy else Entity
+        pointer = uw_interop._api.uwEntityPointer
+        pointers = []
+        for eid in ids:
+            e = self._entities.get(eid)
+            ptr = pointer(eid)
+            if not ptr:
+                # destroyed since last update
+                if e is not None:
+                    self._destroyed.append(e)
                 continue
+            if e is None:
+                e = entity(eid, created=self._update_index)
+                self._entities[eid] = e
+                self._fresh.append(e)
+            elif lazy:
+                e._loaded = -1  # type: ignore[attr-defined]  # the synchronization compares with the previous values
+            modified.append(e)
+            pointers.append(ptr)
+        columns = self._columns
+        columns._add(self._fresh)
+        selection = self._selection
+        table = entities_update_components(
+            modified, selection, self._watched, self._record_change, columns, pointers
+        )
+        self._synchronized = selection
+        if lazy:
+            LazyEntity._thread = threading.get_ident()
+            if selection is not None:
+                # components outside of the selection are fetched on read
+                for e, proto in zip(modified, table[:, _UPDATED.index("protos")].tolist()):
+                    e._loaded = selection[proto]  # type: ignore[attr-defined]
+        columns._update(modified, table)
+        for eid, previous_force, previous_proto, force, proto in self._columns._changed("forces", "protos"):
+            self._index_discard(eid, previous_force, previous_proto)
+            self._index_add(eid, force, proto)
+        for eid, previous_force, previous_position, force, position in self._columns._changed("forces", "positions"):
+            self._spatial_discard(eid, previous_position, previous_force)
+            self._spatial_add(eid, position, force)
+        return modified
+
+    def _record_change(self, e: Entity, component: int) -> None:
+        if e.created == self._update_index:
+            return
+        # only components synchronized in both updates are compared, others read None or are fetched on read
+        bit = 1 << component
+        proto = e.Proto.proto if e.Proto is not None else 0
+        for selection in (self._selection, self._synchronized):
+            if selection is not None and not selection[proto] & bit:
+                return
+        self._changes.append((e, component, getattr(e, COMPONENTS[component])))
+
+    def _dispatch_changes(self, removed: list[Entity]) -> None:
+        for created in self._created_listeners:
+            for e in self._fresh:
+                created(e)
+        changes = self._changes
+        self._changes = []
+        for e, component, old in changes:
+            new = getattr(e, COMPONENTS[component])
+            for changed in self._component_listeners[component]:
+                changed(e, old, new)
+        for destroyed in self._destroyed_listeners:
+            for e in removed:
+                destroyed(e)
+
+    def _index_add(self, eid: int, force: int, proto: int) -> None:
+        if force:
+            self._index_force.setdefault(force, set()).add(eid)
+        if proto:
+            type = self._index_types[eid] = uw_prototypes.type(proto)
+            self._index_proto.setdefault(proto, set()).add(eid)
+            self._index_type.setdefault(type, set()).add(eid)
+            if force:
+                self._index_force_proto.setdefault((force, proto), set()).add(eid)
+                self._index_force_type.setdefault((force, type), set()).add(eid)
+
+    def _index_discard(self, eid: int, force: int, proto: int) -> None:
+        if force:
+            _discard(self._index_force, force, eid)
+        if proto:
+            type = self._index_types.pop(eid, None)
+            _discard(self._index_proto, proto, eid)
+            if type is not None:
+                _discard(self._index_type, type, eid)
+            if force:
+                _discard(self._index_force_proto, (force, proto), eid)
+                if type is not None:
+                    _discard(self._index_force_type, (force, type), eid)
+
+    def _spatial_add(self, eid: int, position: int, force: int) -> None:
+        if position == INVALID:
+            return
+        self._index_tile.setdefault(position, set()).add(eid)
+        if position < uw_map.tiles_count():
+            cluster = uw_map.tile_to_cluster(position)
+            self._index_cluster.setdefault(cluster, set()).add(eid)
+            self._index_force_cluster.setdefault((force, cluster), set()).add(eid)
+
+    def _spatial_discard(self, eid: int, position: int, force: int) -> None:
+        if position == INVALID:
+            return
+        tile = self._index_tile.get(position)
+        if tile is not None:
+            tile.discard(eid)
+            if not tile:
+                del self._index_tile[position]  # tiles are many, keep only the occupied ones
+        if position < uw_map.tiles_count():
+            cluster = uw_map.tile_to_cluster(position)
+            _discard(self._index_cluster, cluster, eid)
+            _discard(self._index_force_cluster, (force, cluster), eid)
+
+    def _update_policies(self, modified: list[Entity], removed: list[Entity]) -> None:
+        if self._policies_my_force != self._my_player.forceEntityId:
+            self._policies_my_force = self._my_player.forceEntityId
+            self._policies.clear()
+            self._policies_forces.clear()
+            self._policies_sources.clear()
+            modified = list(self._entities.values())
+        sources = self._policies_sources
+        for e in removed:
+            if e.id in sources:
+                self._unset_policy(sources.pop(e.id))
+        my = self._policies_my_force
+        for e in modified:
             fp = e.ForeignPolicy
-            if fp.forces[0] == self._my_player.forceEntityId:
-                self._policies[fp.forces[1]] = fp.policy
-            if fp.forces[1] == self._my_player.forceEntityId:
-                self._policies[fp.forces[0]] = fp.policy
+            if fp is not None and fp.forces[0] == my:
+                force = fp.forces[1]
+            elif fp is not None and fp.forces[1] == my:
+                force = fp.forces[0]
+            else:
+                # no longer a policy of my force
+                if e.id in sources:
+                    self._unset_policy(sources.pop(e.id))
+                continue
+            previous = sources.get(e.id)
+            if previous is not None and previous != force:
+                self._unset_policy(previous)
+            sources[e.id] = force
+            self._set_policy(force, fp.policy)
+
+    def _set_policy(self, force: int, policy: UwForeignPolicyEnum) -> None:
+        previous = self._policies.get(force)
+        if previous == policy:
+            return
+        if previous is not None:
+            self._policies_forces[previous].discard(force)
+        self._policies[force] = policy
+        self._policies_forces.setdefault(policy, set()).add(force)
+
+    def _unset_policy(self, force: int) -> None:
+        previous = self._policies.pop(force, None)
+        if previous is not None:
+            self._policies_forces[previous].discard(force)
 
     def _update_overview(self, stepping: bool) -> None:
         if stepping:
-            self._overview = uw_interop.uwOverviewExtract().flags
+            # the item type comes from the format of the view, converted to uint8 in the single copy
+            flags = np.array(uw_interop.uwOverviewExtractView(), dtype=np.uint8)
+            flags.flags.writeable = False
+            if flags.shape == self._overview.shape:
+                self._overview_changed = np.flatnonzero(flags != self._overview)
+            else:
+                self._overview_changed = np.arange(len(flags))
+            self._overview = flags
         else:
-            self._overview = []
+            self._overview = np.zeros(0, dtype=np.uint8)
+            self._overview_changed = np.zeros(0, dtype=np.intp)
 
     def _update(self, stepping: bool) -> None:
         tmp = uw_interop.uwMyPlayer()
         self._my_player = tmp[1] if tmp[0] else _make_empty_UwMyPlayer()
         self._my_force_statistics = uw_interop.uwMyForceStatistics()
-        self._update_removed()
-        self._update_fresh()
-        self._update_modified()
-        self._update_policies()
+        self._update_index += 1
+        modified = self._update_modified()
+        removed = self._update_removed()
+        self._update_policies(modified, removed)
         self._update_overview(stepping)
+        if stepping and uw_history.enabled():
+            uw_history._record()
+        if stepping and uw_snapshots.enabled():
+            uw_snapshots._update(self._update_index)
+        # calls from other threads see the state of this update
+        uw_dispatcher._update(stepping)
+        self._dispatch_changes(removed)
 
 
 uw_world = World()